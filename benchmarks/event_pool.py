@@ -0,0 +1,110 @@
+#    SimQN: a discrete-event simulator for the quantum networks
+#    Copyright (C) 2021-2022 Lutong Chen, Jian Li, Kaiping Xue
+#    University of Science and Technology of China, USTC.
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Compare the event pool implements with the classic "hold" model:
+the pool is filled with ``size`` pending events, then each step pops the
+earliest event and inserts a new one at ``tc + increment``.
+
+The increments follow distributions seen in real simulations:
+    exponential: Poisson traffic, e.g., random sending applications
+    uniform: jittered channel delays
+    bimodal: short channel delays mixed with long memory or retry timers
+    periodic: many nodes that work at the same time slots
+
+It also measures the event throughput of ``Simulator.run`` with each event pool.
+"""
+
+import time
+import numpy as np
+
+from qns.simulator.event import Event
+from qns.simulator.pool import event_pools
+from qns.simulator.simulator import Simulator
+from qns.simulator.ts import Time
+
+accuracy = 1000000
+end_slot = 2 ** 62
+
+
+class NopEvent(Event):
+    def invoke(self) -> None:
+        pass
+
+
+def increments(dist: str, n: int, rng: np.random.Generator) -> np.ndarray:
+    if dist == "exponential":
+        inc = rng.exponential(1000, n)
+    elif dist == "uniform":
+        inc = rng.uniform(0, 2000, n)
+    elif dist == "bimodal":
+        inc = np.where(rng.random(n) < 0.9, rng.uniform(0, 100, n), rng.uniform(90000, 110000, n))
+    elif dist == "periodic":
+        inc = np.full(n, 1000)
+    else:
+        raise ValueError(dist)
+    return inc.astype(np.int64)
+
+
+def hold(pool_name: str, dist: str, size: int, steps: int, seed: int = 0) -> float:
+    rng = np.random.default_rng(seed)
+    pool = event_pools[pool_name](Time(0, accuracy=accuracy), Time(end_slot, accuracy=accuracy))
+    for inc in increments(dist, size, rng):
+        pool.add_event(NopEvent(t=Time(time_slot=int(inc), accuracy=accuracy)))
+    incs = [int(i) for i in increments(dist, steps, rng)]
+
+    start = time.perf_counter()
+    for inc in incs:
+        event = pool.next_event()
+        pool.add_event(NopEvent(t=Time(time_slot=event.t.time_slot + inc, accuracy=accuracy)))
+    return (time.perf_counter() - start) / steps
+
+
+class ChainEvent(Event):
+    def __init__(self, t: Time, simulator: Simulator, inc: int):
+        super().__init__(t=t)
+        self.simulator = simulator
+        self.inc = inc
+
+    def invoke(self) -> None:
+        t = self.simulator.time(time_slot=self.t.time_slot + self.inc)
+        self.simulator.add_event(ChainEvent(t, self.simulator, self.inc))
+
+
+def throughput(pool_name: str, chains: int, sim_second: float = 1) -> float:
+    s = Simulator(0, sim_second, accuracy, event_pool=pool_name)
+    for i in range(chains):
+        s.add_event(ChainEvent(s.time(time_slot=i), s, chains))
+    s.run()
+    return s.total_events / s.time_spend
+
+
+if __name__ == "__main__":
+    steps = 100000
+    pools = [name for name in event_pools.keys() if name != "default"]
+    print(f"per-operation cost of the hold model, {steps} steps")
+    print(f"{'distribution':>12} {'size':>8} " + " ".join(f"{name:>12}" for name in pools))
+    for dist in ["exponential", "uniform", "bimodal", "periodic"]:
+        for size in [1000, 100000, 1000000]:
+            result = [hold(name, dist, size, steps) for name in pools]
+            print(f"{dist:>12} {size:>8} " + " ".join(f"{r * 1e6:>10.3f}us" for r in result))
+
+    print("event throughput of Simulator.run")
+    print(f"{'chains':>21} " + " ".join(f"{name:>12}" for name in pools))
+    for chains in [10, 1000, 100000]:
+        result = [throughput(name, chains) for name in pools]
+        print(f"{chains:>21} " + " ".join(f"{r:>10.0f}/s" for r in result))
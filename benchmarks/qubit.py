@@ -0,0 +1,114 @@
+#    SimQN: a discrete-event simulator for the quantum networks
+#    Copyright (C) 2021-2022 Lutong Chen, Jian Li, Kaiping Xue
+#    University of Science and Technology of China, USTC.
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Compare the cost of the gates and the measurement on a GHZ state of n qubits.
+For the density matrix:
+    expand: the full operator by ``single_gate_expand`` and two dense matmuls, as the gates did before
+    H, CNOT: the gates in ``qns.models.qubit.gate``, which contract only the target axes of the density matrix
+    expand measure: the full measurement operators and four dense matmuls, as ``QState.measure`` did before
+    measure: ``QState.measure`` in the X basis, which projects only the measured axis
+For the state vector, which a pure state keeps until it becomes mixed:
+    H, CNOT, measure: as above
+For the stabilizer tableau of ``StabilizerQubit``:
+    GHZ: preparing the GHZ state, measure: measuring all qubits in the X basis
+"""
+
+import time
+import numpy as np
+
+from qns.models.qubit.const import OPERATOR_HADAMARD
+from qns.models.qubit.gate import CNOT, H
+from qns.models.qubit.qubit import QState, Qubit
+from qns.models.qubit.stabilizer import StabilizerQubit
+from qns.models.qubit.utils import kron, partial_trace, single_gate_expand
+
+
+def ghz(n: int, density_matrix: bool = False, qubit_class: type = Qubit):
+    qubits = [qubit_class(name=f"q{i}") for i in range(n)]
+    if density_matrix:
+        for q in qubits:
+            q.state.to_density_matrix()
+    H(qubits[0])
+    for i in range(1, n):
+        CNOT(qubits[0], qubits[i])
+    return qubits
+
+
+def per_call(func, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        func()
+    return (time.perf_counter() - start) / n
+
+
+def expand_h(qubit: Qubit):
+    qubit.state.operate(single_gate_expand(qubit, OPERATOR_HADAMARD))
+
+
+def expand_measure(rho: np.ndarray, idx: int, num: int) -> np.ndarray:
+    m_0 = np.array([[1]])
+    for i in range(num):
+        m_0 = kron(m_0, 1 / 2 * np.array([[1, 1], [1, 1]]) if i == idx else np.eye(2))
+    poss_0 = np.trace(np.dot(m_0.T.conjugate(), np.dot(m_0, rho)))
+    rho = np.dot(m_0, np.dot(rho, m_0.T.conjugate())) / poss_0
+    return partial_trace(rho, idx)
+
+
+def measure(idx: int, num: int, **kwargs) -> None:
+    qubits = [Qubit() for _ in range(num)]
+    state = QState(qubits, **kwargs)
+    state.measure(qubits[idx], "X")
+
+
+if __name__ == "__main__":
+    print("density matrix")
+    print(f"{'qubits':>6} {'expand':>12} {'H':>12} {'CNOT':>12} {'expand measure':>15} {'measure':>12}")
+    for num in [2, 4, 6, 8, 10]:
+        qubits = ghz(num, density_matrix=True)
+        n = max(1, 2000 // 4 ** (num // 2))
+        expand = per_call(lambda: expand_h(qubits[num // 2]), n)
+        h = per_call(lambda: H(qubits[num // 2]), n)
+        cnot = per_call(lambda: CNOT(qubits[num - 1], qubits[0]), n)
+        rho = qubits[0].state.rho
+        expand_m = per_call(lambda: expand_measure(rho, num // 2, num), n)
+        m = per_call(lambda: measure(num // 2, num, rho=rho), n)
+        print(f"{num:>6} {expand * 1e6:>10.1f}us {h * 1e6:>10.1f}us {cnot * 1e6:>10.1f}us "
+              f"{expand_m * 1e6:>13.1f}us {m * 1e6:>10.1f}us")
+
+    print("state vector")
+    print(f"{'qubits':>6} {'H':>12} {'CNOT':>12} {'measure':>12}")
+    for num in [2, 4, 6, 8, 10, 14, 18]:
+        qubits = ghz(num, density_matrix=False)
+        n = max(1, 20000 // 2 ** num)
+        h = per_call(lambda: H(qubits[num // 2]), n)
+        cnot = per_call(lambda: CNOT(qubits[num - 1], qubits[0]), n)
+        vector = qubits[0].state.vector
+        m = per_call(lambda: measure(num // 2, num, state=vector), n)
+        print(f"{num:>6} {h * 1e6:>10.1f}us {cnot * 1e6:>10.1f}us {m * 1e6:>10.1f}us")
+
+    print("stabilizer tableau")
+    print(f"{'qubits':>6} {'GHZ':>12} {'measure':>12}")
+    for num in [10, 100, 500]:
+        start = time.perf_counter()
+        qubits = ghz(num, qubit_class=StabilizerQubit)
+        prepare = time.perf_counter() - start
+        start = time.perf_counter()
+        for q in qubits:
+            q.measureX()
+        m = time.perf_counter() - start
+        print(f"{num:>6} {prepare * 1e3:>10.1f}ms {m * 1e3:>10.1f}ms")
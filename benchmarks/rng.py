@@ -0,0 +1,56 @@
+#    SimQN: a discrete-event simulator for the quantum networks
+#    Copyright (C) 2021-2022 Lutong Chen, Jian Li, Kaiping Xue
+#    University of Science and Technology of China, USTC.
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Compare the per-draw cost of the random functions in ``qns.utils.rnd``:
+    numpy: a scalar call into the global ``np.random`` for each draw, as ``get_rand`` did before buffering
+    buffered: ``get_rand``, ``get_randint``, ``get_choice`` and ``get_normal``, which hand out pre-drawn blocks
+    array: ``get_rand_array``, which draws all random numbers of a batch at once
+"""
+
+import time
+import numpy as np
+
+from qns.utils.rnd import get_choice, get_normal, get_rand, get_rand_array, get_randint, set_seed
+
+
+def per_draw(func, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        func()
+    return (time.perf_counter() - start) / n
+
+
+if __name__ == "__main__":
+    n = 1000000
+    set_seed(0)
+    choices = [0, 1]
+    cases = [
+        ("uniform", lambda: np.random.random(), get_rand),
+        ("integer", lambda: np.random.randint(0, 10), lambda: get_randint(0, 9)),
+        ("choice", lambda: choices[np.random.randint(0, 2)], lambda: get_choice(choices)),
+        ("normal", lambda: np.random.normal(0, 1), get_normal),
+    ]
+    print(f"per-draw cost, {n} draws")
+    print(f"{'distribution':>12} {'numpy':>12} {'buffered':>12}")
+    for name, numpy_func, buffered_func in cases:
+        print(f"{name:>12} {per_draw(numpy_func, n) * 1e9:>10.1f}ns {per_draw(buffered_func, n) * 1e9:>10.1f}ns")
+
+    print("per-draw cost of get_rand_array")
+    for size in [1, 10, 100, 10000]:
+        cost = per_draw(lambda: get_rand_array(size), n // size) / size
+        print(f"{size:>12} {cost * 1e9:>10.1f}ns")
@@ -26,7 +26,6 @@ from qns.simulator.event import Event
 import qns.utils.log as log
 from qns.entity.entity import Entity
 from qns.entity.node.node import QNode
-from qns.utils.rnd import get_rand
 
 
 class ClassicPacket(object):
@@ -128,32 +127,36 @@ class ClassicChannel(Entity):
         """
         if next_hop not in self.node_list:
             raise NextHopNotConnectionException
+        tc = self._simulator.current_time
+        accuracy = self._simulator.accuracy
         if self.bandwidth != 0:
-            if self._next_send_time <= self._simulator.current_time:
-                send_time = self._simulator.current_time
+            if self._next_send_time.time_slot <= tc.time_slot:
+                send_time = tc
             else:
                 send_time = self._next_send_time
 
-            if self.max_buffer_size != 0 and send_time > self._simulator.current_time\
-               + self._simulator.time(sec=self.max_buffer_size / self.bandwidth):
+            if self.max_buffer_size != 0 and send_time.time_slot > tc.time_slot\
+               + int(self.max_buffer_size / self.bandwidth * accuracy):
                 # buffer is overflow
-                log.debug(f"cchannel {self}: drop packet {packet} due to overflow")
+                log.debug("cchannel %s: drop packet %s due to overflow", self, packet)
                 return
 
-            self._next_send_time = send_time + \
-                self._simulator.time(sec=len(packet) / self.bandwidth)
+            self._next_send_time = send_time.add_slots(int(len(packet) / self.bandwidth * accuracy))
         else:
-            send_time = self._simulator.current_time
+            send_time = tc
 
         # random drop
-        if get_rand() < self.drop_rate:
-            log.debug(f"cchannel {self}: drop packet {packet} due to drop rate")
+        # each direction has its own random stream, so that the draws only depend on the sending node
+        rng = self.substream(str(next_hop.name))
+        if rng.random() < self.drop_rate:
+            log.debug("cchannel %s: drop packet %s due to drop rate", self, packet)
             return
+
         #  add delay
-        recv_time = send_time + self._simulator.time(sec=self.delay_model.calculate())
+        recv_time = send_time.add_slots(int(self.delay_model.calculate(rng=rng) * accuracy))
 
-        send_event = RecvClassicPacket(recv_time, name=None, by=self,
-                                       cchannel=self, packet=packet, dest=next_hop)
+        send_event = self._simulator.new_event(RecvClassicPacket, recv_time, name=None, by=self,
+                                               cchannel=self, packet=packet, dest=next_hop)
         self._simulator.add_event(send_event)
 
     def __repr__(self) -> str:
@@ -170,6 +173,10 @@ class RecvClassicPacket(Event):
     """
     The event for a QNode to receive a classic packet
     """
+
+    __slots__ = ("cchannel", "packet", "dest")
+    recyclable = True
+
     def __init__(self, t: Optional[Time] = None, name: Optional[str] = None,
                  cchannel: ClassicChannel = None, packet: ClassicPacket = None, dest: QNode = None,
                  by: Optional[Any] = None):
@@ -17,6 +17,7 @@
 
 from qns.simulator.simulator import Simulator
 from qns.simulator.event import Event
+from qns.utils.rnd import RandomStream, context_random, get_stream, spawn_stream
 
 
 class Entity(object):
@@ -24,6 +25,11 @@ class Entity(object):
     This is the basic entity class, including memories, channels and nodes.
     """
 
+    _rng = None
+    _substreams = None
+    # the root seed that the cached streams are created from
+    _rng_root = None
+
     def __init__(self, name: str = None):
         """
         Args:
@@ -33,6 +39,50 @@ class Entity(object):
         self._is_installed = False
         self._simulator = None
 
+    @property
+    def rng(self) -> RandomStream:
+        """
+        The random stream of this entity. It is created at the first use and keyed by the class and the name,
+        so that the random numbers of this entity do not depend on other entities.
+        It is created again after the random state is seeded or another simulator's random state is used.
+        """
+        self._check_streams()
+        if self._rng is None:
+            if self.name is None:
+                self._rng = spawn_stream()
+            else:
+                self._rng = get_stream(f"{self.__class__.__name__}/{self.name}")
+        return self._rng
+
+    def substream(self, key: str) -> RandomStream:
+        """
+        Get an independent random stream of a part of this entity, e.g., a direction of a channel.
+
+        Args:
+            key (str): the key of the part
+        Returns:
+            the random stream, which is the same for the same key
+        """
+        self._check_streams()
+        if self._substreams is None:
+            self._substreams = {}
+        stream = self._substreams.get(key)
+        if stream is None:
+            if self.name is None:
+                stream = spawn_stream()
+            else:
+                stream = get_stream(f"{self.__class__.__name__}/{self.name}/{key}")
+            self._substreams[key] = stream
+        return stream
+
+    def _check_streams(self) -> None:
+        # drop the cached streams if they are created from another random state
+        root = context_random.get().root
+        if self._rng_root is not root:
+            self._rng_root = root
+            self._rng = None
+            self._substreams = None
+
     def install(self, simulator: Simulator) -> None:
         '''
         ``install`` is called before ``simulator`` runs to initialize or set initial events
@@ -27,6 +27,9 @@ class MemoryReadRequestEvent(Event):
     """
     ``MemoryReadRequestEvent`` is the event that request a memory read
     """
+
+    __slots__ = ("memory", "key")
+
     def __init__(self, memory, key: Union[QuantumModel, str],
                  t: Optional[Time] = None, name: Optional[str] = None, by: Optional[Any] = None):
         super().__init__(t=t, name=name, by=by)
@@ -41,6 +44,10 @@ class MemoryReadResponseEvent(Event):
     """
     ``MemoryReadResponseEvent`` is the event that returns the memory read result
     """
+
+    __slots__ = ("node", "result", "request")
+    recyclable = True
+
     def __init__(self, node: QNode, result: Optional[QuantumModel] = None,
                  request: MemoryReadRequestEvent = None, t: Optional[Time] = None, name: Optional[str] = None,
                  by: Optional[Any] = None):
@@ -57,6 +64,9 @@ class MemoryWriteRequestEvent(Event):
     """
     ``MemoryWriteRequestEvent`` is the event that request a memory write
     """
+
+    __slots__ = ("memory", "qubit")
+
     def __init__(self, memory, qubit: QuantumModel,
                  t: Optional[Time] = None, name: Optional[str] = None, by: Optional[Any] = None):
         super().__init__(t=t, name=name, by=by)
@@ -71,6 +81,10 @@ class MemoryWriteResponseEvent(Event):
     """
     ``MemoryWriteResponseEvent`` is the event that returns the memory write result
     """
+
+    __slots__ = ("node", "result", "request")
+    recyclable = True
+
     def __init__(self, node: QNode, result: Optional[QuantumModel] = None,
                  request: MemoryReadRequestEvent = None, t: Optional[Time] = None, name: Optional[str] = None,
                  by: Optional[Any] = None):
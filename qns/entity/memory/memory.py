@@ -151,7 +151,8 @@ class QuantumMemory(Entity):
 
         t_now = self._simulator.current_time
         sec_diff = t_now.sec - store_time.sec
-        qubit.store_error_model(t=sec_diff, decoherence_rate=self.decoherence_rate, **self.store_error_model_args)
+        qubit.store_error_model(t=sec_diff, decoherence_rate=self.decoherence_rate, rng=self.rng,
+                                **self.store_error_model_args)
         return qubit
 
     def write(self, qm: QuantumModel) -> bool:
@@ -204,14 +205,18 @@ class QuantumMemory(Entity):
             # operate qubits and get measure results
             result = self.read(key)
 
-            t = self._simulator.tc + self._simulator.time(sec=self.delay_model.calculate())
-            response = MemoryReadResponseEvent(node=self.node, result=result, request=event, t=t, by=self)
+            delay = self.delay_model.calculate(rng=self.rng)
+            t = self._simulator.tc.add_slots(int(delay * self._simulator.accuracy))
+            response = self._simulator.new_event(MemoryReadResponseEvent, node=self.node, result=result,
+                                                 request=event, t=t, by=self)
             self._simulator.add_event(response)
         elif isinstance(event, MemoryWriteRequestEvent):
             qubit = event.qubit
             result = self.write(qubit)
-            t = self._simulator.tc + self._simulator.time(sec=self.delay_model.calculate())
-            response = MemoryWriteResponseEvent(node=self.node, result=result, request=event, t=t, by=self)
+            delay = self.delay_model.calculate(rng=self.rng)
+            t = self._simulator.tc.add_slots(int(delay * self._simulator.accuracy))
+            response = self._simulator.new_event(MemoryWriteResponseEvent, node=self.node, result=result,
+                                                 request=event, t=t, by=self)
             self._simulator.add_event(response)
 
     def __repr__(self) -> str:
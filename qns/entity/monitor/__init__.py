@@ -15,6 +15,6 @@
 #    You should have received a copy of the GNU General Public License
 #    along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from qns.entity.monitor.monitor import Monitor, MonitorEvent
+from qns.entity.monitor.monitor import Monitor, MonitorEvent, MonitorPeriodEvent
 
-__all__ = ["Monitor", "MonitorEvent"]
+__all__ = ["Monitor", "MonitorEvent", "MonitorPeriodEvent"]
@@ -16,9 +16,9 @@
 #    along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import pandas as pd
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Optional, Union
 from qns.entity.entity import Entity
-from qns.simulator.event import Event
+from qns.simulator.event import Event, PeriodicEvent
 from qns.simulator.simulator import Simulator
 from qns.simulator.ts import Time
 
@@ -36,6 +36,22 @@ class MonitorEvent(Event):
         self.monitor.handle(self)
 
 
+class MonitorPeriodEvent(PeriodicEvent):
+    """
+    the periodic event that notify the monitor to write down network status
+    """
+
+    __slots__ = ("monitor",)
+
+    def __init__(self, simulator: Simulator, t: Time, period: Union[Time, float], monitor,
+                 name: Optional[str] = None, by: Optional[Any] = None):
+        super().__init__(simulator, t=t, period=period, name=name, by=by)
+        self.monitor = monitor
+
+    def trigger(self) -> None:
+        self.monitor.handle(self)
+
+
 class Monitor(Entity):
     def __init__(self, name: Optional[str] = None, network=None) -> None:
         """
@@ -69,12 +85,10 @@ class Monitor(Entity):
             event = MonitorEvent(t=self._simulator.te, monitor=self, name="finish watch event", by=self)
             self._simulator.add_event(event)
         for p in self.watch_period:
-            tp = Time(sec=p)
-            t = self._simulator.ts
-            while t <= self._simulator.te:
-                t = t + tp
-                event = MonitorEvent(t=t, monitor=self, name=f"period watch event({p})", by=self)
-                self._simulator.add_event(event)
+            tp = self._simulator.time(sec=p)
+            event = MonitorPeriodEvent(self._simulator, t=self._simulator.ts + tp, period=tp, monitor=self,
+                                       name=f"period watch event({p})", by=self)
+            self._simulator.add_event(event)
 
         for event_type in self.watch_event:
             try:
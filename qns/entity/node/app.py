@@ -15,20 +15,27 @@
 #    You should have received a copy of the GNU General Public License
 #    along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from typing import Callable, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
 from qns.simulator.simulator import Simulator
 from qns.simulator import Event
+from qns.utils.rnd import RandomStream, context_random, get_stream, spawn_stream
 
 
 class Application(object):
     """
     Application can be deployed on the quantum nodes.
     """
+
+    _rng = None
+    # the root seed that the cached stream is created from
+    _rng_root = None
+
     def __init__(self):
         self._simulator = None
         self._node = None
         self._dispatch_dict: List[Tuple[List, List, Callable]] = []
+        self._dispatch_cache: Dict[type, List[Tuple[List, Callable]]] = {}
 
     def install(self, node, simulator: Simulator):
         """
@@ -55,29 +62,30 @@ class Application(object):
         return self._dispatch(node, event)
 
     def _dispatch(self, node, event: Event) -> Optional[bool]:
-        for elem in self._dispatch_dict:
-            eventTypeList = elem[0]
-            byList = elem[1]
-            handler = elem[2]
-
-            flag_et = False
-            flag_by = False
-            if len(eventTypeList) > 0:
-                for et in eventTypeList:
-                    if isinstance(event, et):
-                        flag_et = True
-            else:
-                flag_et = True
-
+        for byList, handler in self.get_handlers(event.__class__):
             if len(byList) == 0 or event.by in byList:
-                flag_by = True
-
-            if flag_et and flag_by:
                 skip = handler(node, event)
                 if skip is True:
                     return skip
         return False
 
+    def get_handlers(self, event_type: type) -> List[Tuple[List, Callable]]:
+        """
+        Get the handlers that match the event class ``event_type``, in the order that they were added.
+        The result is cached per event class until a new handler is added.
+
+        Args:
+            event_type: the class of the event
+        Returns:
+            a list of (ByList, handler)
+        """
+        handlers = self._dispatch_cache.get(event_type)
+        if handlers is None:
+            handlers = [(byList, handler) for eventTypeList, byList, handler in self._dispatch_dict
+                        if len(eventTypeList) == 0 or issubclass(event_type, tuple(eventTypeList))]
+            self._dispatch_cache[event_type] = handlers
+        return handlers
+
     def add_handler(self, handler, EventTypeList: List = [], ByList: List = []):
         """
         Add a handler function to the dispather.
@@ -91,6 +99,9 @@ class Application(object):
         """
         elem = (EventTypeList, ByList, handler)
         self._dispatch_dict.append(elem)
+        self._dispatch_cache.clear()
+        if self._node is not None:
+            self._node.clear_dispatch_cache()
 
     def get_node(self):
         """
@@ -109,3 +120,21 @@ class Application(object):
             the simulator
         """
         return self._simulator
+
+    @property
+    def rng(self) -> RandomStream:
+        """
+        The random stream of this application. It is keyed by the node, the class and the position in the node,
+        so that the random numbers of this application do not depend on other applications.
+        It is created again after the random state is seeded or another simulator's random state is used.
+        """
+        root = context_random.get().root
+        if self._rng is None or self._rng_root is not root:
+            self._rng_root = root
+            node = self._node
+            if node is None or node.name is None:
+                self._rng = spawn_stream()
+            else:
+                index = next((i for i, app in enumerate(node.apps) if app is self), 0)
+                self._rng = get_stream(f"{node.name}/{self.__class__.__name__}/{index}")
+        return self._rng
@@ -15,7 +15,7 @@
 #    You should have received a copy of the GNU General Public License
 #    along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from typing import List, Union
+from typing import Callable, Dict, List, Optional, Tuple, Union
 from qns.simulator import Simulator
 from qns.simulator import Event
 from qns.entity import Entity
@@ -46,6 +46,7 @@ class QNode(Entity):
             self.apps: List[Application] = []
         else:
             self.apps: List[Application] = apps
+        self._dispatch_cache: Dict[type, List[Tuple[Application, Optional[List], Callable]]] = {}
 
     def install(self, simulator: Simulator) -> None:
         super().install(simulator)
@@ -70,6 +71,7 @@ class QNode(Entity):
         # initiate applications
         for app in self.apps:
             app.install(self, simulator)
+        self.clear_dispatch_cache()
 
     def handle(self, event: Event) -> None:
         """
@@ -79,10 +81,38 @@ class QNode(Entity):
         Args:
             event (Event): the event that happens on this QNode
         """
+        entries = self._dispatch_cache.get(event.__class__)
+        if entries is None:
+            entries = self._build_dispatch(event.__class__)
+        for app, byList, handler in entries:
+            if byList is None:
+                if handler(self, event):
+                    break
+            elif len(byList) == 0 or event.by in byList:
+                if handler(self, event) is True:
+                    break
+
+    def _build_dispatch(self, event_type: type) -> List[Tuple[Application, Optional[List], Callable]]:
+        # flatten the handlers of all applications for this event class.
+        # Applications that override ``handle`` are called as a whole.
+        profiler = None if self._simulator is None else self._simulator.profiler
+        entries = []
         for app in self.apps:
-            skip = app.handle(self, event)
-            if skip:
-                break
+            if type(app).handle is not Application.handle:
+                handler = app.handle
+                entries.append((app, None, handler if profiler is None else profiler.wrap(handler)))
+                continue
+            for byList, handler in app.get_handlers(event_type):
+                entries.append((app, byList, handler if profiler is None else profiler.wrap(handler)))
+        self._dispatch_cache[event_type] = entries
+        return entries
+
+    def clear_dispatch_cache(self):
+        """
+        Clear the cached event dispatching table.
+        It should be called if applications or their handlers are changed.
+        """
+        self._dispatch_cache.clear()
 
     def add_apps(self, app: Application):
         """
@@ -92,6 +122,7 @@ class QNode(Entity):
             app (Application): the inserting application.
         """
         self.apps.append(app)
+        self.clear_dispatch_cache()
 
     def get_apps(self, app_type):
         """
@@ -26,6 +26,9 @@ class OperateRequestEvent(Event):
     """
     ``OperateRequestEvent`` is the event that request a operator to handle
     """
+
+    __slots__ = ("operator", "qubits")
+
     def __init__(self, operator, qubits: List[QuantumModel] = [],
                  t: Optional[Time] = None, name: Optional[str] = None, by: Optional[Any] = None):
         super().__init__(t=t, name=name, by=by)
@@ -41,6 +44,10 @@ class OperateResponseEvent(Event):
     """
     ``OperateResponseEvent`` is the event that returns the operating result
     """
+
+    __slots__ = ("node", "result", "request")
+    recyclable = True
+
     def __init__(self, node: QNode, result: Union[int, List[int]] = None,
                  request: OperateRequestEvent = None, t: Optional[Time] = None, name: Optional[str] = None,
                  by: Optional[Any] = None):
@@ -57,8 +57,10 @@ class QuantumOperator(Entity):
             # operate qubits and get measure results
             result = self.operate(*qubits)
 
-            t = self._simulator.tc + self._simulator.time(sec=self.delay_model.calculate())
-            response = OperateResponseEvent(node=self.node, result=result, request=event, t=t, by=self)
+            delay = self.delay_model.calculate(rng=self.rng)
+            t = self._simulator.tc.add_slots(int(delay * self._simulator.accuracy))
+            response = self._simulator.new_event(OperateResponseEvent, node=self.node, result=result,
+                                                 request=event, t=t, by=self)
             self._simulator.add_event(response)
 
     def set_own(self, node: QNode):
@@ -26,7 +26,6 @@ from qns.simulator.ts import Time
 from qns.simulator.event import Event
 from qns.models.core.backend import QuantumModel
 import qns.utils.log as log
-from qns.utils.rnd import get_rand
 
 
 class QuantumChannel(Entity):
@@ -87,35 +86,38 @@ class QuantumChannel(Entity):
         if next_hop not in self.node_list:
             raise NextHopNotConnectionException
 
+        tc = self._simulator.current_time
+        accuracy = self._simulator.accuracy
         if self.bandwidth != 0:
-
-            if self._next_send_time <= self._simulator.current_time:
-                send_time = self._simulator.current_time
+            if self._next_send_time.time_slot <= tc.time_slot:
+                send_time = tc
             else:
                 send_time = self._next_send_time
 
-            if self.max_buffer_size != 0 and send_time > self._simulator.current_time\
-               + self._simulator.time(sec=self.max_buffer_size / self.bandwidth):
+            if self.max_buffer_size != 0 and send_time.time_slot > tc.time_slot\
+               + int(self.max_buffer_size / self.bandwidth * accuracy):
                 # buffer is overflow
-                log.debug(f"qchannel {self}: drop qubit {qubit} due to overflow")
+                log.debug("qchannel %s: drop qubit %s due to overflow", self, qubit)
                 return
 
-            self._next_send_time = send_time + self._simulator.time(sec=1 / self.bandwidth)
+            self._next_send_time = send_time.add_slots(int(1 / self.bandwidth * accuracy))
         else:
-            send_time = self._simulator.current_time
+            send_time = tc
 
         # random drop
-        if get_rand() < self.drop_rate:
-            log.debug(f"qchannel {self}: drop qubit {qubit} due to drop rate")
+        # each direction has its own random stream, so that the draws only depend on the sending node
+        rng = self.substream(str(next_hop.name))
+        if rng.random() < self.drop_rate:
+            log.debug("qchannel %s: drop qubit %s due to drop rate", self, qubit)
             return
 
         #  add delay
-        recv_time = send_time + self._simulator.time(sec=self.delay_model.calculate())
+        recv_time = send_time.add_slots(int(self.delay_model.calculate(rng=rng) * accuracy))
 
         # operation on the qubit
-        qubit.transfer_error_model(self.length, self.decoherence_rate, **self.transfer_error_model_args)
-        send_event = RecvQubitPacket(recv_time, name=None, by=self, qchannel=self,
-                                     qubit=qubit, dest=next_hop)
+        qubit.transfer_error_model(self.length, self.decoherence_rate, rng=rng, **self.transfer_error_model_args)
+        send_event = self._simulator.new_event(RecvQubitPacket, recv_time, name=None, by=self, qchannel=self,
+                                               qubit=qubit, dest=next_hop)
         self._simulator.add_event(send_event)
 
     def __repr__(self) -> str:
@@ -132,6 +134,10 @@ class RecvQubitPacket(Event):
     """
     The event for a QNode to receive a classic packet
     """
+
+    __slots__ = ("qchannel", "qubit", "dest")
+    recyclable = True
+
     def __init__(self, t: Optional[Time] = None, qchannel: QuantumChannel = None,
                  qubit: QuantumModel = None, dest: QNode = None, name: Optional[str] = None, by: Optional[Any] = None):
         super().__init__(t=t, name=name, by=by)
@@ -15,6 +15,6 @@
 #    You should have received a copy of the GNU General Public License
 #    along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from qns.entity.timer.timer import Timer
+from qns.entity.timer.timer import Timer, TimerEvent
 
-__all__ = ["Timer"]
+__all__ = ["Timer", "TimerEvent"]
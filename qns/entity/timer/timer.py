@@ -15,9 +15,9 @@
 #    You should have received a copy of the GNU General Public License
 #    along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from typing import Any, Optional
+from typing import Any, Optional, Union
 from qns.simulator.simulator import Simulator
-from qns.simulator.event import Event
+from qns.simulator.event import PeriodicEvent
 from qns.simulator.ts import Time
 from qns.entity.entity import Entity
 
@@ -42,25 +42,21 @@ class Timer(Entity):
         self.end_time = end_time
         self.step_time = step_time
         self.trigger_func = trigger_func
+        self.event: Optional[TimerEvent] = None
 
     def install(self, simulator: Simulator) -> None:
 
         if not self._is_installed:
             self._simulator = simulator
 
-            time_list = []
+            t = self._simulator.time(sec=self.start_time)
             if self.end_time == 0:
-                time_list.append(Time(sec=self.start_time))
+                # trigger only once
+                end, period = t, self._simulator.time(time_slot=1)
             else:
-                t = self.start_time
-                while t <= self.end_time:
-                    time_list.append(t)
-                    t += self.step_time
-
-            for t in time_list:
-                time = self._simulator.time(sec=t)
-                event = TimerEvent(timer=self, t=time, by=self)
-                self._simulator.add_event(event)
+                end, period = self._simulator.time(sec=self.end_time), self.step_time
+            self.event = TimerEvent(timer=self, t=t, period=period, end=end, by=self)
+            self._simulator.add_event(self.event)
             self._is_installed = True
 
     def trigger(self):
@@ -69,14 +65,36 @@ class Timer(Entity):
         else:
             raise NotImplementedError
 
+    def cancel(self) -> None:
+        """
+        Stop the timer, the following trigger events are canceled
+        """
+        if self.event is not None:
+            self.event.cancel()
+
+    def set_step_time(self, step_time: float) -> None:
+        """
+        Change the period of the timer. A trigger event that is already scheduled is not moved.
+
+        Args:
+            step_time (float): the new period in second
+        """
+        self.step_time = step_time
+        if self.event is not None:
+            self.event.set_period(step_time)
 
-class TimerEvent(Event):
+
+class TimerEvent(PeriodicEvent):
     """
     TimerEvent is the event that triggers the Timer's `trigger_func`
     """
-    def __init__(self, timer: Timer, t: Optional[Time] = None, name: Optional[str] = None, by: Optional[Any] = None):
-        super().__init__(t=t, name=name, by=by)
+
+    __slots__ = ("timer",)
+
+    def __init__(self, timer: Timer, t: Time, period: Union[Time, float], end: Optional[Time] = None,
+                 name: Optional[str] = None, by: Optional[Any] = None):
+        super().__init__(timer._simulator, t=t, period=period, end=end, name=name, by=by)
         self.timer = timer
 
-    def invoke(self) -> None:
+    def trigger(self) -> None:
         self.timer.trigger()
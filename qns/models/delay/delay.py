@@ -17,12 +17,14 @@
 
 
 from typing import Optional
+from qns.utils.rnd import RandomStream
 
 
 class DelayModel():
     """
     The model for delay in storing, operating and transmitting qubits or eprs.
     """
+
     def __init__(self, name: Optional[str] = None) -> None:
         """
         Args:
@@ -30,9 +32,19 @@ class DelayModel():
         """
         self.name = name
 
-    def calculate(self) -> float:
+    def calculate(self, rng: Optional[RandomStream] = None) -> float:
         """
+        Args:
+            rng (Optional[RandomStream]): the random stream, e.g., the stream of the entity that uses this model,
+                so that a delay model can be shared by many entities. The global random generator is used if it is None.
         Return:
             the time delay in second, default is 0
         """
         return 0
+
+    def lower_bound(self) -> float:
+        """
+        Return:
+            the minimum time delay in second that ``calculate`` may return
+        """
+        return 0
@@ -17,7 +17,7 @@
 
 from typing import Optional
 from qns.models.delay.delay import DelayModel
-from qns.utils.rnd import get_normal
+from qns.utils.rnd import RandomStream, get_normal
 
 
 class NormalDelayModel(DelayModel):
@@ -34,5 +34,11 @@ class NormalDelayModel(DelayModel):
         self._mean_delay = mean_delay
         self._std = std
 
-    def calculate(self) -> float:
+    def calculate(self, rng: Optional[RandomStream] = None) -> float:
+        if rng is not None:
+            return rng.normal(self._mean_delay, self._std)
         return get_normal(self._mean_delay, self._std)
+
+    def lower_bound(self) -> float:
+        # the normal distribution is unbounded unless it is a constant
+        return self._mean_delay if self._std == 0 else 0
@@ -17,7 +17,7 @@
 
 from typing import Optional
 from qns.models.delay.delay import DelayModel
-from qns.utils.rnd import get_rand
+from qns.utils.rnd import RandomStream, get_rand
 
 
 class UniformDelayModel(DelayModel):
@@ -35,5 +35,10 @@ class UniformDelayModel(DelayModel):
         self._min_delay = min_delay
         self._max_delay = max_delay
 
-    def calculate(self) -> float:
+    def calculate(self, rng: Optional[RandomStream] = None) -> float:
+        if rng is not None:
+            return rng.uniform(self._min_delay, self._max_delay)
         return get_rand(self._min_delay, self._max_delay)
+
+    def lower_bound(self) -> float:
+        return self._min_delay
@@ -18,7 +18,7 @@
 from typing import Optional
 from qns.models.core.backend import QuantumModel
 from qns.models.epr.entanglement import BaseEntanglement
-from qns.utils.rnd import get_rand
+from qns.utils.rnd import RandomStream, get_rand
 
 
 class BellStateEntanglement(BaseEntanglement, QuantumModel):
@@ -30,13 +30,22 @@ class BellStateEntanglement(BaseEntanglement, QuantumModel):
         super().__init__(fidelity=1, name=name)
         self.p_swap = p_swap
 
-    def swapping(self, epr: "BellStateEntanglement"):
+    def swapping(self, epr: "BellStateEntanglement", rng: Optional[RandomStream] = None):
+        """
+        Use `self` and `epr` to perfrom swapping, which succeeds with the possibility ``p_swap``
+
+        Args:
+            epr (BellStateEntanglement): another entanglement
+            rng (RandomStream): the random stream of the swapping node, default is the global random stream
+        Returns:
+            the new distributed entanglement
+        """
         ne = BellStateEntanglement()
         if self.is_decoherenced or epr.is_decoherenced:
             ne.is_decoherenced = True
             ne.fidelity = 0
 
-        r = get_rand()
+        r = get_rand() if rng is None else rng.random()
         if r > min(self.p_swap, epr.p_swap):
             ne.is_decoherenced = True
             ne.fidelity = 0
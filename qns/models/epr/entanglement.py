@@ -21,6 +21,7 @@ import numpy as np
 from qns.models.qubit.qubit import Qubit, QState
 from qns.models.qubit.gate import H, X, Y, Z, CNOT, U
 from qns.models.qubit.const import OPERATOR_PAULI_I, QUBIT_STATE_0, QUBIT_STATE_P
+from qns.utils.rnd import RandomStream
 
 
 class BaseEntanglement(object):
@@ -83,20 +84,21 @@ class BaseEntanglement(object):
         self.is_decoherenced = True
         return [q0, q1]
 
-    def teleportion(self, qubit: Qubit) -> Qubit:
+    def teleportion(self, qubit: Qubit, rng: Optional[RandomStream] = None) -> Qubit:
         """
         Use `self` and `epr` to perfrom distillation and distribute a new entanglement
 
         Args:
             epr (BaseEntanglement): another entanglement
+            rng (RandomStream): the random stream of the measuring node, default is the global random stream
         Returns:
             the new distributed entanglement
         """
         q1, q2 = self.to_qubits()
         CNOT(qubit, q1)
         H(qubit)
-        c0 = qubit.measure()
-        c1 = q1.measure()
+        c0 = qubit.measure(rng=rng)
+        c1 = q1.measure(rng=rng)
         if c1 == 1 and c0 == 0:
             X(q2)
         elif c1 == 0 and c0 == 1:
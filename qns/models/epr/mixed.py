@@ -22,7 +22,7 @@ from qns.models.qubit.const import QUBIT_STATE_0, QUBIT_STATE_P
 from qns.models.qubit.qubit import QState, Qubit
 import numpy as np
 
-from qns.utils.rnd import get_rand
+from qns.utils.rnd import RandomStream, get_rand
 
 
 class MixedStateEntanglement(BaseEntanglement, QuantumModel):
@@ -94,7 +94,8 @@ class MixedStateEntanglement(BaseEntanglement, QuantumModel):
         ne.normalized()
         return ne
 
-    def distillation(self, epr: "MixedStateEntanglement", name: Optional[str] = None):
+    def distillation(self, epr: "MixedStateEntanglement", name: Optional[str] = None,
+                     rng: Optional[RandomStream] = None):
         """
         Use `self` and `epr` to perfrom distillation and distribute a new entanglement.
         Using BBPSSW protocol.
@@ -102,6 +103,7 @@ class MixedStateEntanglement(BaseEntanglement, QuantumModel):
         Args:
             epr (BaseEntanglement): another entanglement
             name (str): the name of the new entanglement
+            rng (RandomStream): the random stream of the distilling node, default is the global random stream
         Returns:
             the new distributed entanglement
         """
@@ -114,7 +116,8 @@ class MixedStateEntanglement(BaseEntanglement, QuantumModel):
         self.is_decoherenced = True
         p_succ = (self.a+self.d)*(epr.a+epr.d) + (self.b+self.c)*(epr.c + epr.b)
 
-        if get_rand() > p_succ:
+        r = get_rand() if rng is None else rng.random()
+        if r > p_succ:
             ne.is_decoherenced = True
             ne.fidelity = 0
             return
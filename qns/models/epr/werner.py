@@ -22,7 +22,7 @@ from qns.models.qubit.qubit import Qubit, QState
 from qns.models.qubit.const import QUBIT_STATE_0, QUBIT_STATE_P
 import numpy as np
 
-from qns.utils.rnd import get_rand
+from qns.utils.rnd import RandomStream, get_rand
 
 
 class WernerStateEntanglement(BaseEntanglement, QuantumModel):
@@ -68,7 +68,8 @@ class WernerStateEntanglement(BaseEntanglement, QuantumModel):
         ne.w = self.w * epr.w
         return ne
 
-    def distillation(self, epr: "WernerStateEntanglement", name: Optional[str] = None):
+    def distillation(self, epr: "WernerStateEntanglement", name: Optional[str] = None,
+                     rng: Optional[RandomStream] = None):
         """
         Use `self` and `epr` to perfrom distillation and distribute a new entanglement.
         Using Bennett 96 protocol and estimate lower bound.
@@ -76,6 +77,7 @@ class WernerStateEntanglement(BaseEntanglement, QuantumModel):
         Args:
             epr (WernerEntanglement): another entanglement
             name (str): the name of the new entanglement
+            rng (RandomStream): the random stream of the distilling node, default is the global random stream
         Returns:
             the new distributed entanglement
         """
@@ -88,7 +90,8 @@ class WernerStateEntanglement(BaseEntanglement, QuantumModel):
         self.is_decoherenced = True
         fmin = min(self.fidelity, epr.fidelity)
 
-        if get_rand() > (fmin ** 2 + 5 / 9 * (1 - fmin) ** 2 + 2 / 3 * fmin * (1 - fmin)):
+        r = get_rand() if rng is None else rng.random()
+        if r > (fmin ** 2 + 5 / 9 * (1 - fmin) ** 2 + 2 / 3 * fmin * (1 - fmin)):
             ne.is_decoherenced = True
             ne.fidelity = 0
             return
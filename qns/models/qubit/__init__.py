@@ -24,6 +24,7 @@ from qns.models.qubit.decoherence import PrefectMeasureErrorModel, PrefectOperat
     DephaseOperateErrorModel, DephaseStorageErrorModel, DephaseTransferErrorModel, \
     DepolarMeasureErrorModel, DepolarOperateErrorModel, DepolarStorageErrorModel, DepolarTransferErrorModel
 from qns.models.qubit.factory import QubitFactory
+from qns.models.qubit.stabilizer import StabilizerQubit, StabilizerState
 
 __all__ = ["Qubit", "QState", "X", "Y", "Z", "H", "S",
            "T", "R", "I", "CNOT", "joint", "RX", "RY", "RZ", "U", "CX", "CY",
@@ -32,4 +33,4 @@ __all__ = ["Qubit", "QState", "X", "Y", "Z", "H", "S",
            "PrefectStorageErrorModel", "PrefectTransferErrorModel", "DephaseMeasureErrorModel",
            "DephaseOperateErrorModel", "DephaseStorageErrorModel", "DephaseTransferErrorModel",
            "DepolarMeasureErrorModel", "DepolarOperateErrorModel", "DepolarStorageErrorModel",
-           "DepolarTransferErrorModel", "QubitFactory"]
+           "DepolarTransferErrorModel", "QubitFactory", "StabilizerQubit", "StabilizerState"]
@@ -20,8 +20,7 @@ from typing import Optional
 from qns.models.qubit.const import QUBIT_STATE_0
 from qns.models.qubit.gate import I, X, Y, Z
 import numpy as np
-from qns.models.qubit.qubit import QState
-from qns.utils.rnd import get_rand
+from qns.utils.rnd import RandomStream, get_rand
 
 
 def PrefectError(self, p: Optional[float] = 0, **kwargs):
@@ -34,20 +33,21 @@ def PrefectError(self, p: Optional[float] = 0, **kwargs):
     pass
 
 
-def DephaseError(self, p: Optional[float] = 0, **kwargs):
+def DephaseError(self, p: Optional[float] = 0, rng: Optional[RandomStream] = None, **kwargs):
     """
     The dephase error model.
     A random Z gate will be operate on the qubit with possibility p.
 
     Args:
         p (float): the error possibility
+        rng (RandomStream): the random stream of the entity that causes the error, e.g., a memory
     """
     if p < 0 or p > 1:
         raise Exception("Error decoherence rate, should be in [0, 1]")
-    self.stochastic_operate([I, Z], [1-p, p])
+    self.stochastic_operate([I, Z], [1-p, p], rng=rng)
 
 
-def DepolarError(self, p: Optional[float] = 0, **kwargs):
+def DepolarError(self, p: Optional[float] = 0, rng: Optional[RandomStream] = None, **kwargs):
     """
     The depolarizing error model.
 
@@ -55,43 +55,46 @@ def DepolarError(self, p: Optional[float] = 0, **kwargs):
 
     Args:
         p (float): the error possibility
+        rng (RandomStream): the random stream of the entity that causes the error, e.g., a memory
         kwargs: other parameters
     """
     if p < 0 or p > 1:
         raise Exception("Error decoherence rate, should be in [0, 1]")
     if 1-3*p > 0:
-        self.stochastic_operate([I, X, Y, Z], [1-3*p, p, p, p])
+        self.stochastic_operate([I, X, Y, Z], [1-3*p, p, p, p], rng=rng)
     else:
-        self.stochastic_operate([X, Y, Z], [1/3, 1/3, 1/3])
+        self.stochastic_operate([X, Y, Z], [1/3, 1/3, 1/3], rng=rng)
 
 
-def BitFlipError(self, p: Optional[float] = 0, **kwargs):
+def BitFlipError(self, p: Optional[float] = 0, rng: Optional[RandomStream] = None, **kwargs):
     """
     The bit flip error model.
 
     Args:
         p (float): the error possibility, [0, 1]
+        rng (RandomStream): the random stream of the entity that causes the error, e.g., a memory
         kwargs: other parameters
     """
     if p < 0 or p > 1:
         raise Exception("Error decoherence rate, should be in [0, 1]")
-    self.stochastic_operate([I, X], [1-p, p])
+    self.stochastic_operate([I, X], [1-p, p], rng=rng)
 
 
-def DissipationError(self, p: Optional[float] = 0, **kwargs):
+def DissipationError(self, p: Optional[float] = 0, rng: Optional[RandomStream] = None, **kwargs):
     """
     The dissipation error model.
 
     Args:
         p (float): the error possibility, [0, 1]
+        rng (RandomStream): the random stream of the entity that causes the error, e.g., a memory
         kwargs: other parameters
     """
     if p < 0 or p > 1:
         raise Exception("Error decoherence rate, should be in [0, 1]")
-    real_p = get_rand()
+    real_p = get_rand() if rng is None else rng.random()
     if real_p < p:
-        self.measure()
-        self.state = QState([self], state=QUBIT_STATE_0)
+        self.measure(rng=rng)
+        self.state = self.state_class([self], state=QUBIT_STATE_0)
 
 
 def ErrorWithTime(ErrorModel):
@@ -103,6 +106,7 @@ def ErrorWithTime(ErrorModel):
         Args:
             t (float): the during time in second.
             decoherence_rate (float): the decoherence rate.
+            kwargs: other parameters of the error model, e.g., ``rng``
         """
         p = 1 - np.exp(-decoherence_rate * t)
         ErrorModel(self, p, **kwargs)
@@ -118,6 +122,7 @@ def ErrorWithLength(ErrorModel):
         Args:
             length (float): the transmission length in meter.
             decoherence_rate (float): the decoherence rate.
+            kwargs: other parameters of the error model, e.g., ``rng``
         """
         p = 1 - np.exp(-decoherence_rate * length)
         ErrorModel(self, p, **kwargs)
@@ -26,6 +26,13 @@ class QStateQubitNotInStateError(Exception):
     pass
 
 
+class QStateNotStabilizerError(Exception):
+    """
+    This error happens when a stabilizer state can not present the state, e.g., a mixed state
+    """
+    pass
+
+
 class OperatorNotMatchError(Exception):
     """
     This error happens when the size of state vector or matrix mismatch occurs
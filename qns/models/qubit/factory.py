@@ -31,7 +31,8 @@ class QubitFactory():
     """
     def __init__(self, operate_decoherence_rate: float = 0, measure_decoherence_rate: float = 0,
                  store_error_model=PrefectStorageErrorModel, transfer_error_model=PrefectTransferErrorModel,
-                 operate_error_model=PrefectOperateErrorModel, measure_error_model=PrefectMeasureErrorModel) -> None:
+                 operate_error_model=PrefectOperateErrorModel, measure_error_model=PrefectMeasureErrorModel,
+                 qubit_class: type = Qubit) -> None:
         """
         Args:
             operate_decoherence_rate (float): the operate decoherence rate
@@ -40,6 +41,7 @@ class QubitFactory():
             transfer_error_model: a callable function for handing errors in quantum channel
             operate_error_model: a callable function for handing errors in operating quantum gates
             measure_error_model: a callable function for handing errors in measuing the status
+            qubit_class (type): the class of the qubits, e.g., ``StabilizerQubit`` for Clifford-only simulations
         """
         self.operate_decoherence_rate = operate_decoherence_rate
         self.measure_decoherence_rate = measure_decoherence_rate
@@ -47,6 +49,7 @@ class QubitFactory():
         self.transfer_error_model = transfer_error_model
         self.operate_error_model = operate_error_model
         self.measure_error_model = measure_error_model
+        self.qubit_class = qubit_class
 
     def __call__(self, state=QUBIT_STATE_0, rho: np.ndarray = None,
                  operate_decoherence_rate: Optional[float] = None, measure_decoherence_rate: Optional[float] = None,
@@ -62,8 +65,8 @@ class QubitFactory():
             operate_decoherence_rate = self.operate_decoherence_rate
         if measure_decoherence_rate is None:
             measure_decoherence_rate = self.measure_decoherence_rate
-        qubit = Qubit(state=state, rho=rho, operate_decoherence_rate=operate_decoherence_rate,
-                      measure_decoherence_rate=measure_decoherence_rate, name=name)
+        qubit = self.qubit_class(state=state, rho=rho, operate_decoherence_rate=operate_decoherence_rate,
+                                 measure_decoherence_rate=measure_decoherence_rate, name=name)
         qubit.store_error_model = MethodType(self.store_error_model, qubit)
         qubit.transfer_error_model = MethodType(self.transfer_error_model, qubit)
         qubit.operate_error_model = MethodType(self.operate_error_model, qubit)
@@ -15,7 +15,7 @@
 #    You should have received a copy of the GNU General Public License
 #    along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from typing import Any, Optional
+from typing import Any, List, Optional
 import numpy as np
 from qns.models.qubit.const import OPERATOR_HADAMARD, OPERATOR_PAULI_I, \
                                    OPERATOR_PAULI_X, OPERATOR_PAULI_Y, \
@@ -23,8 +23,8 @@ from qns.models.qubit.const import OPERATOR_HADAMARD, OPERATOR_PAULI_I, \
                                    OPERATOR_RX, OPERATOR_RY, OPERATOR_RZ, \
                                    OPERATOR_S, OPERATOR_T
 from qns.models.qubit.qubit import Qubit
-from qns.models.qubit.utils import kron, joint
-from qns.models.qubit.errors import QGateOperatorNotMatchError, QGateQubitNotInStateError
+from qns.models.qubit.utils import controlled_operator, joint
+from qns.models.qubit.errors import QGateOperatorNotMatchError, QGateQubitNotInStateError, QStateQubitNotInStateError
 
 
 class Gate():
@@ -117,6 +117,35 @@ class SingleQubitArbitraryGate(SingleQubitGate):
 U = SingleQubitArbitraryGate(name="U", operator=None, _docs="Arbitrary single qubit operation gate")
 
 
+def controlled_operate(controls: List[Qubit], target: Qubit, operator: np.ndarray) -> None:
+    """
+    Apply a controlled operator on the target qubit. The states are only merged with the controls
+    that are not in a known |0> or |1> state, and nothing is done if a control is |0>.
+
+    Args:
+        controls (List[Qubit]): the controlling qubits
+        target (Qubit): the operating qubit
+        operator (np.ndarray): the 2x2 operator on the target qubit
+
+    Raises:
+        QGateQubitNotInStateError
+        QGateStateJointError
+    """
+    active = []
+    for qubit in controls:
+        value = qubit.state.basis_value()
+        if value == 0:
+            return
+        if value is None:
+            active.append(qubit)
+    for qubit in active:
+        joint(qubit, target)
+    try:
+        target.state.operate(controlled_operator(operator, controls=len(active)), active + [target])
+    except QStateQubitNotInStateError:
+        raise QGateQubitNotInStateError
+
+
 class DoubleQubitsControlledGate(Gate):
     """
     The double qubits gates operate on two qubits, including a controlled qubit and a operating qubit.
@@ -156,30 +185,7 @@ class DoubleQubitsControlledGate(Gate):
 
         if qubit1 == qubit2:
             return
-        joint(qubit1, qubit2)
-        state = qubit1.state
-
-        try:
-            idx1 = state.qubits.index(qubit1)
-            idx2 = state.qubits.index(qubit2)
-        except ValueError:
-            raise QGateQubitNotInStateError
-
-        full_operator_part_0 = np.array([1])  # |0> <0|
-        full_operator_part_1 = np.array([1])  # |1> <1|
-
-        for i in range(state.num):
-            if i == idx1:
-                full_operator_part_0 = kron(full_operator_part_0, np.array([[1, 0], [0, 0]]))
-                full_operator_part_1 = kron(full_operator_part_1, np.array([[0, 0], [0, 1]]))
-            elif i == idx2:
-                full_operator_part_0 = kron(full_operator_part_0, OPERATOR_PAULI_I)
-                full_operator_part_1 = kron(full_operator_part_1, operator)
-            else:
-                full_operator_part_0 = kron(full_operator_part_0, OPERATOR_PAULI_I)
-                full_operator_part_1 = kron(full_operator_part_1, OPERATOR_PAULI_I)
-        full_operator = full_operator_part_0 + full_operator_part_1
-        qubit1.state.operate(full_operator)
+        controlled_operate([qubit1], qubit2, operator)
 
 
 ControlledGate = DoubleQubitsControlledGate(name="Controlled Gate",
@@ -219,17 +225,16 @@ class SwapGate(Gate):
         """
         if qubit1 == qubit2:
             return
-        joint(qubit1, qubit2)
-
-        state = qubit1.state
-        # single qubit operate
+        state1, state2 = qubit1.state, qubit2.state
         try:
-            idx1 = state.qubits.index(qubit1)
-            idx2 = state.qubits.index(qubit2)
+            idx1 = state1.qubits.index(qubit1)
+            idx2 = state2.qubits.index(qubit2)
         except ValueError:
             raise QGateQubitNotInStateError
 
-        state.qubits[idx1], state.qubits[idx2] = state.qubits[idx2], state.qubits[idx1]
+        # exchange the positions of the qubits, so that the states are not merged
+        state1.qubits[idx1], state2.qubits[idx2] = qubit2, qubit1
+        qubit1.state, qubit2.state = state2, state1
 
 
 Swap = SwapGate(name="Swap Gate", _docs="swap the states of qubit1 and qubit2")
@@ -261,47 +266,7 @@ class ThreeQubitsGate(Gate):
 
         if qubit1 == qubit2 or qubit1 == qubit3 or qubit2 == qubit3:
             return
-        joint(qubit1, qubit2)
-        joint(qubit2, qubit3)
-
-        state = qubit1.state
-
-        # single qubit operate
-        try:
-            idx1 = state.qubits.index(qubit1)
-            idx2 = state.qubits.index(qubit2)
-            idx3 = state.qubits.index(qubit3)
-        except ValueError:
-            raise QGateQubitNotInStateError
-
-        full_operator_part_00 = np.array([1])  # |0> <0|
-        full_operator_part_01 = np.array([1])  # |1> <1|
-        full_operator_part_10 = np.array([1])  # |0> <0|
-        full_operator_part_11 = np.array([1])  # |1> <1|
-
-        for i in range(state.num):
-            if i == idx1:
-                full_operator_part_00 = kron(full_operator_part_00, np.array([[1, 0], [0, 0]]))
-                full_operator_part_01 = kron(full_operator_part_01, np.array([[1, 0], [0, 0]]))
-                full_operator_part_10 = kron(full_operator_part_10, np.array([[0, 0], [0, 1]]))
-                full_operator_part_11 = kron(full_operator_part_11, np.array([[0, 0], [0, 1]]))
-            elif i == idx2:
-                full_operator_part_00 = kron(full_operator_part_00, np.array([[1, 0], [0, 0]]))
-                full_operator_part_10 = kron(full_operator_part_10, np.array([[1, 0], [0, 0]]))
-                full_operator_part_01 = kron(full_operator_part_01, np.array([[0, 0], [0, 1]]))
-                full_operator_part_11 = kron(full_operator_part_11, np.array([[0, 0], [0, 1]]))
-            elif i == idx3:
-                full_operator_part_00 = kron(full_operator_part_00, OPERATOR_PAULI_I)
-                full_operator_part_01 = kron(full_operator_part_01, OPERATOR_PAULI_I)
-                full_operator_part_10 = kron(full_operator_part_10, OPERATOR_PAULI_I)
-                full_operator_part_11 = kron(full_operator_part_11, operator)
-            else:
-                full_operator_part_00 = kron(full_operator_part_00, OPERATOR_PAULI_I)
-                full_operator_part_01 = kron(full_operator_part_01, OPERATOR_PAULI_I)
-                full_operator_part_10 = kron(full_operator_part_10, OPERATOR_PAULI_I)
-                full_operator_part_11 = kron(full_operator_part_11, OPERATOR_PAULI_I)
-        full_operator = full_operator_part_00 + full_operator_part_01 + full_operator_part_10 + full_operator_part_11
-        qubit1.state.operate(full_operator)
+        controlled_operate([qubit1, qubit2], qubit3, operator)
 
 
 Toffoli = ThreeQubitsGate(name="Toffoli Gate",
@@ -15,22 +15,31 @@
 #    You should have received a copy of the GNU General Public License
 #    along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from typing import Any, List, Optional
+from typing import Any, List, Optional, Tuple
 import numpy as np
 
 from qns.models.qubit.const import QUBIT_STATE_0, QUBIT_STATE_1, \
         QUBIT_STATE_P, QUBIT_STATE_N, QUBIT_STATE_L, QUBIT_STATE_R
-from qns.models.qubit.utils import single_gate_expand, partial_trace, kron
+from qns.models.qubit.utils import apply_operator, apply_vector_operator, kron
 from qns.models.core.backend import QuantumModel
 from qns.models.qubit.errors import QStateBaseError, QStateQubitNotInStateError, \
-                                    QStateSizeNotMatchError, OperatorNotMatchError
-from qns.utils.rnd import get_rand
+                                    QStateSizeNotMatchError, OperatorNotMatchError, OperatorError
+from qns.utils.rnd import RandomStream, get_rand
 
 
 class QState(object):
     """
-    QState is the state of one (or multiple) qubits
+    QState is the state of one (or multiple) qubits.
+    A pure state is kept as a state vector while only unitary operations and measurements are applied,
+    and it is turned into a density matrix when a stochastic operation makes it mixed or ``rho`` is set.
+
+    The states of different qubits are only merged when a gate couples them, and the qubits that are
+    no longer entangled with the others are split into their own states after a measurement (see ``factorize``).
     """
+
+    # whether to split the product states after measurements
+    auto_factorize = True
+
     def __init__(self, qubits: List["Qubit"] = [], state: Optional[np.ndarray] = QUBIT_STATE_0,
                  rho: Optional[np.ndarray] = None, name: Optional[str] = None):
         """
@@ -43,116 +52,180 @@ class QState(object):
         self.num = len(qubits)
         self.name = name
         self.qubits = qubits
-        self.rho = None
+        # the state vector of a pure state, or None if the state is a density matrix
+        self.vector: Optional[np.ndarray] = None
+        self._rho: Optional[np.ndarray] = None
 
         if rho is None:
             if len(state) != 2**self.num:
                 raise QStateSizeNotMatchError
-            self.rho = np.dot(state, state.T.conjugate())
+            self.vector = np.asarray(state, dtype=complex).reshape(2**self.num)
         else:
             if self.num != np.log2(rho.shape[0]) or self.num != np.log2(rho.shape[1]):
                 raise QStateSizeNotMatchError
             if abs(1 - rho.trace()) > 0.0000000001:
                 # trace = 1
                 raise QStateSizeNotMatchError
-            self.rho = rho
+            self._rho = rho
+
+    @property
+    def rho(self) -> np.ndarray:
+        """
+        The density matrix. It is calculated from the state vector if the state is pure.
+        """
+        if self._rho is None:
+            return np.outer(self.vector, self.vector.conjugate())
+        return self._rho
+
+    @rho.setter
+    def rho(self, rho: np.ndarray) -> None:
+        self._rho = rho
+        self.vector = None
+
+    def to_density_matrix(self) -> None:
+        """
+        Turn a state vector into a density matrix, e.g., before a stochastic operation
+        """
+        if self._rho is None:
+            self.rho = self.rho
 
-    def measure(self, qubit: "Qubit" = None, base: str = "Z") -> int:
+    def measure(self, qubit: "Qubit" = None, base: str = "Z", rng: Optional[RandomStream] = None) -> int:
         """
         Measure this qubit using Z basis
         Args:
             qubit (Qubit): the measuring qubit
             base: the measure base, "Z", "X" or "Y"
+            rng (RandomStream): the random stream of the measuring entity, default is the global random stream
 
         Returns:
             0: QUBIT_STATE_0 state
             1: QUBIT_STATE_1 state
         """
-        M_0 = None
-        M_1 = None
-        S_0 = None
-        S_1 = None
         if base == "Z":
-            M_0 = np.array([[1, 0], [0, 0]])
-            M_1 = np.array([[0, 0], [0, 1]])
-            S_0 = QUBIT_STATE_0
-            S_1 = QUBIT_STATE_1
+            S_0, S_1 = QUBIT_STATE_0, QUBIT_STATE_1
         elif base == "X":
-            M_0 = 1/2 * np.array([[1, 1], [1, 1]])
-            M_1 = 1/2 * np.array([[1, -1], [-1, 1]])
-            S_0 = QUBIT_STATE_P
-            S_1 = QUBIT_STATE_N
+            S_0, S_1 = QUBIT_STATE_P, QUBIT_STATE_N
         elif base == "Y":
-            M_0 = 1/2 * np.array([[1, -1j], [1j, 1]])
-            M_1 = 1/2 * np.array([[1, 1j], [-1j, 1]])
-            S_0 = QUBIT_STATE_R
-            S_1 = QUBIT_STATE_L
+            S_0, S_1 = QUBIT_STATE_R, QUBIT_STATE_L
         else:
             raise QStateBaseError
 
         try:
             idx = self.qubits.index(qubit)
-            shift = self.num - idx - 1
-            assert (shift >= 0)
-        except AssertionError:
+        except ValueError:
             raise QStateQubitNotInStateError
 
-        Full_M_0 = np.array([[1]])
-        Full_M_1 = np.array([[1]])
-        for i in range(self.num):
-            if i == idx:
-                Full_M_0 = kron(Full_M_0, M_0)
-                Full_M_1 = kron(Full_M_1, M_1)
-            else:
-                Full_M_0 = kron(Full_M_0, np.array([[1, 0], [0, 1]]))
-                Full_M_1 = kron(Full_M_1, np.array([[1, 0], [0, 1]]))
-
-        poss_0 = np.trace(np.dot(Full_M_0.T.conjugate(), np.dot(Full_M_0, self.rho)))
-        rn = get_rand()
-
-        if rn < poss_0:
-            ret = 0
-            ret_s = S_0
-            self.rho = np.dot(Full_M_0, np.dot(self.rho, Full_M_0.T.conjugate())) / poss_0
+        rn = get_rand() if rng is None else rng.random()
+        if self.vector is not None:
+            ret, ret_s = self._measure_vector(idx, S_0, S_1, rn)
         else:
-            ret = 1
-            ret_s = S_1
-            self.rho = np.dot(Full_M_1, np.dot(self.rho, Full_M_1.T.conjugate())) / (1-poss_0)
-
-        self.rho = partial_trace(self.rho, idx)
+            ret, ret_s = self._measure_rho(idx, S_0, S_1, rn)
         self.num -= 1
         self.qubits.remove(qubit)
 
         ns = QState([qubit], state=ret_s)
         qubit.state = ns
+        if self.auto_factorize:
+            self.factorize()
         return ret
 
-    def operate(self, operator: np.ndarray):
+    def _measure_vector(self, idx: int, S_0: np.ndarray, S_1: np.ndarray, rn: float) -> Tuple[int, np.ndarray]:
+        # the axes of the state vector are (left, measured, right)
+        size = self.vector.shape[0]
+        tensor = self.vector.reshape(2 ** idx, 2, -1)
+        # the amplitudes of the other qubits if the outcome is |s>, i.e., <s|psi> on the measured axis
+        amp_0 = np.tensordot(S_0.conjugate().reshape(2), tensor, axes=(0, 1))
+        poss_0 = np.vdot(amp_0, amp_0).real
+
+        if rn < poss_0:
+            ret, ret_s, amp, poss = 0, S_0, amp_0, poss_0
+        else:
+            ret, ret_s, poss = 1, S_1, 1 - poss_0
+            amp = np.tensordot(S_1.conjugate().reshape(2), tensor, axes=(0, 1))
+        self.vector = (amp / np.sqrt(poss)).reshape(size // 2)
+        return ret, ret_s
+
+    def _measure_rho(self, idx: int, S_0: np.ndarray, S_1: np.ndarray, rn: float) -> Tuple[int, np.ndarray]:
+        # the axes of the density matrix are (left, measured, right) for both rows and columns
+        size = self._rho.shape[0]
+        left = 2 ** idx
+        right = size // left // 2
+        tensor = self._rho.reshape(left, 2, right, left, 2, right)
+        # the reduced density matrix of the measured qubit
+        reduced = np.einsum("larlbr->ab", tensor)
+        poss_0 = np.real(np.dot(S_0.T.conjugate(), np.dot(reduced, S_0))[0, 0])
+
+        if rn < poss_0:
+            ret, ret_s, poss = 0, S_0, poss_0
+        else:
+            ret, ret_s, poss = 1, S_1, 1 - poss_0
+
+        # project to the outcome basis state and trace it out, i.e., <s| rho |s> on the measured axis
+        coef = np.dot(ret_s.conjugate(), ret_s.T)
+        rho = None
+        for a in range(2):
+            for b in range(2):
+                if coef[a, b] != 0:
+                    block = coef[a, b] / poss * tensor[:, a, :, :, b, :]
+                    rho = block if rho is None else rho + block
+        self._rho = rho.reshape(size // 2, size // 2)
+        return ret, ret_s
+
+    def _index(self, qubits: Optional[List["Qubit"]]) -> Optional[List[int]]:
+        if qubits is None:
+            return None
+        try:
+            return [self.qubits.index(q) for q in qubits]
+        except ValueError:
+            raise QStateQubitNotInStateError
+
+    def _check(self, operator: np.ndarray, idx: Optional[List[int]]) -> bool:
+        # whether the operator is on all qubits in order
+        full = idx is None or len(idx) == self.num and idx == list(range(self.num))
+        k = self.num if full else len(idx)
+        if operator.shape != (2**k, 2**k):
+            raise OperatorNotMatchError
+        return full
+
+    def _apply(self, rho: np.ndarray, operator: np.ndarray, idx: Optional[List[int]]) -> np.ndarray:
+        if self._check(operator, idx):
+            return np.dot(operator, np.dot(rho, operator.T.conjugate()))
+        return apply_operator(rho, operator, idx)
+
+    def operate(self, operator: np.ndarray, qubits: Optional[List["Qubit"]] = None):
         """
         transform using `operator`
 
         Args:
-            operator (np.ndarray): the operator
+            operator (np.ndarray): the operator on all qubits, or on ``qubits`` if it is given
+            qubits (List[Qubit]): the operating qubits in the order of the operator. Only their axes of the
+                density matrix are transformed, so that the full operator is not needed.
         Raises:
             OperatorNotMatchError
+            QStateQubitNotInStateError
         """
-        operator_size = operator.shape
-        if operator_size == (2**self.num, 2**self.num):
-            # joint qubit operate
-            full_operator = operator
+        idx = self._index(qubits)
+        if self.vector is None:
+            self._rho = self._apply(self._rho, operator, idx)
+        elif self._check(operator, idx):
+            self.vector = np.dot(operator, self.vector)
         else:
-            raise OperatorNotMatchError
-        self.rho = np.dot(full_operator, np.dot(self.rho, full_operator.T.conjugate()))
+            self.vector = apply_vector_operator(self.vector, operator, idx)
 
-    def stochastic_operate(self, list_operators: List[np.ndarray] = [], list_p: List[float] = []):
+    def stochastic_operate(self, list_operators: List[np.ndarray] = [], list_p: List[float] = [],
+                           qubits: Optional[List["Qubit"]] = None, rng: Optional[RandomStream] = None):
         """
         A stochastic operate progess. It usually turns a pure state into a mixed state.
 
         Args:
-            list_operators (List[np.ndarray]): a list of operators
+            list_operators (List[np.ndarray]): a list of operators on all qubits, or on ``qubits`` if it is given
             list_p (List[float]): a list of possibility
+            qubits (List[Qubit]): the operating qubits in the order of the operators
+            rng (RandomStream): the random stream for the states that sample one operator,
+                e.g., ``StabilizerState``. The density matrix does not draw random numbers.
         Raises:
             OperatorNotMatchError
+            QStateQubitNotInStateError
         """
         new_state = np.zeros((2**self.num, 2**self.num), dtype=complex)
 
@@ -168,14 +241,127 @@ class QState(object):
         if abs(1-sum) >= 1e-6:
             raise OperatorNotMatchError("Probabilities are not normalized")
 
-        for idx, operator in enumerate(list_operators):
-            operator_size = operator.shape
-            if operator_size == (2**self.num, 2**self.num):
-                full_operator = operator
+        branches = [operator for operator, p in zip(list_operators, list_p) if p > 0]
+        if len(branches) == 1:
+            # the mixture is trivial, e.g., a noise model with zero probability, so a state vector stays pure
+            self.operate(branches[0], qubits)
+            return
+
+        idx = self._index(qubits)
+        self.to_density_matrix()
+        for operator, p in zip(list_operators, list_p):
+            new_state += p * self._apply(self._rho, operator, idx)
+        self._rho = new_state
+
+    def merge(self, other: "QState") -> "QState":
+        """
+        The joint state of the qubits in this state and ``other``, i.e., their tensor product
+
+        Args:
+            other (QState): the other state
+        Returns:
+            the joint state
+        """
+        if self.vector is not None and other.vector is not None:
+            return QState(self.qubits + other.qubits, state=np.kron(self.vector, other.vector))
+        return QState(self.qubits + other.qubits, rho=kron(self.rho, other.rho))
+
+    def factorize(self, eps: float = 1e-9) -> List["QState"]:
+        """
+        Split the qubits that are not entangled with the other qubits into their own states,
+        i.e., if this state is ``rho_q`` (x) ``rho_rest`` for a qubit ``q``, ``q`` gets the state ``rho_q``.
+        Only single qubit factors are detected, and the rest of the state stays in this state.
+
+        Args:
+            eps (float): the accuracy
+        Returns:
+            the new single qubit states
+        """
+        states = []
+        idx = 0
+        while self.num > 1 and idx < self.num:
+            if self.vector is not None:
+                ns = self._split_vector(idx, eps)
             else:
-                raise OperatorNotMatchError
-            new_state += list_p[idx] * np.dot(full_operator, np.dot(self.rho, full_operator.T.conjugate()))
-        self.rho = new_state
+                ns = self._split_rho(idx, eps)
+            if ns is None:
+                idx += 1
+                continue
+            self.num -= 1
+            qubit = self.qubits.pop(idx)
+            qubit.state = ns
+            states.append(ns)
+        return states
+
+    def _split_vector(self, idx: int, eps: float) -> Optional["QState"]:
+        # the state is |phi> (x) |rest> iff the amplitudes of |0> and |1> on the axis are parallel
+        tensor = self.vector.reshape(2 ** idx, 2, -1)
+        # check a few amplitudes first, which rejects most entangled states cheaply
+        sample = tensor[::max(tensor.shape[0] // 7, 1), :, ::max(tensor.shape[2] // 7, 1)]
+        if not self._parallel(sample[:, 0, :].ravel(), sample[:, 1, :].ravel(), eps)[0]:
+            return None
+        amp_0, amp_1 = tensor[:, 0, :].ravel(), tensor[:, 1, :].ravel()
+        parallel, norm_0, norm_1 = self._parallel(amp_0, amp_1, eps)
+        if not parallel:
+            return None
+        if norm_0 >= norm_1:
+            rest = amp_0 / np.sqrt(norm_0)
+            phi = [np.sqrt(norm_0), np.vdot(rest, amp_1)]
+        else:
+            rest = amp_1 / np.sqrt(norm_1)
+            phi = [np.vdot(rest, amp_0), np.sqrt(norm_1)]
+        self.vector = rest
+        return QState([self.qubits[idx]], state=np.array(phi, dtype=complex))
+
+    @staticmethod
+    def _parallel(amp_0: np.ndarray, amp_1: np.ndarray, eps: float) -> Tuple[bool, float, float]:
+        norm_0, norm_1 = np.vdot(amp_0, amp_0).real, np.vdot(amp_1, amp_1).real
+        return abs(abs(np.vdot(amp_0, amp_1)) ** 2 - norm_0 * norm_1) <= eps, norm_0, norm_1
+
+    def _split_rho(self, idx: int, eps: float) -> Optional["QState"]:
+        # the state is rho_q (x) rho_rest iff every block <a| rho |b> on the axis is rho_q[a, b] * rho_rest
+        size = self._rho.shape[0]
+        left = 2 ** idx
+        right = size // left // 2
+        # check the diagonal first, which rejects most entangled states cheaply
+        diagonal = np.diagonal(self._rho).reshape(left, 2, right)
+        reduced_diagonal = np.sum(diagonal, axis=(0, 2))
+        rest_diagonal = diagonal[:, 0, :] + diagonal[:, 1, :]
+        if np.max(np.abs(diagonal - reduced_diagonal[:, None] * rest_diagonal[:, None, :])) > eps:
+            return None
+        tensor = self._rho.reshape(left, 2, right, left, 2, right)
+        reduced = np.einsum("larlbr->ab", tensor)
+        # then a few blocks of the density matrix, and all of it at last
+        step_left, step_right = max(left // 7, 1), max(right // 7, 1)
+        sample = tensor[::step_left, :, ::step_right, ::step_left, :, ::step_right]
+        for part in [sample, tensor]:
+            rest = part[:, 0, :, :, 0, :] + part[:, 1, :, :, 1, :]
+            product = reduced[None, :, None, None, :, None] * rest[:, None, :, :, None, :]
+            if np.max(np.abs(part - product)) > eps:
+                return None
+        self._rho = rest.reshape(size // 2, size // 2)
+        return QState([self.qubits[idx]], rho=reduced)
+
+    def basis_value(self, eps: float = 1e-9) -> Optional[int]:
+        """
+        The value of a single qubit state in the Z basis, which lets a controlled gate skip merging the states
+
+        Args:
+            eps (float): the accuracy
+        Returns:
+            0 or 1 if this is a single qubit state |0> or |1>, otherwise None
+        """
+        if self.num != 1:
+            return None
+        if self.vector is not None:
+            poss_1 = abs(self.vector[1]) ** 2
+        else:
+            poss_1 = self._rho[1, 1].real
+        if poss_1 < eps:
+            return 0
+        if poss_1 > 1 - eps:
+            return 1
+        return None
 
     def equal(self, other_state: "QState") -> bool:
         """
@@ -194,6 +380,8 @@ class QState(object):
         Returns:
             bool, if the state is a pure state
         """
+        if self.vector is not None:
+            return True
         return abs(np.trace(np.dot(self.rho, self.rho)) - 1) <= eps
 
     def state(self) -> np.ndarray:
@@ -203,6 +391,8 @@ class QState(object):
         Returns:
             The pure state vector
         """
+        if self.vector is not None:
+            return self.vector.reshape((2**self.num, 1))
         if not self.is_pure_state():
             print(self.rho.T.conjugate() * self.rho)
             return None
@@ -224,6 +414,9 @@ class Qubit(QuantumModel):
     Represent a qubit
     """
 
+    # the class of the quantum states of this kind of qubits
+    state_class = QState
+
     def __init__(self, state=QUBIT_STATE_0, rho: np.ndarray = None,
                  operate_decoherence_rate: float = 0, measure_decoherence_rate: float = 0,
                  name: Optional[str] = None):
@@ -236,54 +429,70 @@ class Qubit(QuantumModel):
         """
 
         self.name = name
-        self.state = QState([self], state=state, rho=rho)
+        self.state = self.state_class([self], state=state, rho=rho)
         self.operate_decoherence_rate = operate_decoherence_rate
         self.measure_decoherence_rate = measure_decoherence_rate
 
-    def measure(self):
+    def _measure(self, base: str, rng: Optional[RandomStream]) -> int:
+        if rng is None:
+            self.measure_error_model(decoherence_rate=self.measure_decoherence_rate)
+        else:
+            self.measure_error_model(decoherence_rate=self.measure_decoherence_rate, rng=rng)
+        return self.state.measure(self, base, rng=rng)
+
+    def measure(self, rng: Optional[RandomStream] = None):
         """
         Measure this qubit using Z basis
 
+        Args:
+            rng (RandomStream): the random stream of the measuring entity, e.g., ``app.rng``.
+                Default is the global random stream.
         Returns:
             0: QUBIT_STATE_0 state
             1: QUBIT_STATE_1 state
         """
-        self.measure_error_model(decoherence_rate=self.measure_decoherence_rate)
-        return self.state.measure(self)
+        return self._measure("Z", rng)
 
-    def measureX(self):
+    def measureX(self, rng: Optional[RandomStream] = None):
         """
         Measure this qubit using X basis.
 
+        Args:
+            rng (RandomStream): the random stream of the measuring entity, default is the global random stream
         Returns:
             0: QUBIT_STATE_P state
             1: QUBIT_STATE_N state
         """
-        self.measure_error_model(self.measure_decoherence_rate)
-        return self.state.measure(self, "X")
+        return self._measure("X", rng)
 
-    def measureY(self):
+    def measureY(self, rng: Optional[RandomStream] = None):
         """
         Measure this qubit using Y basis.
         Only for not entangled qubits.
 
+        Args:
+            rng (RandomStream): the random stream of the measuring entity, default is the global random stream
         Returns:
             0: QUBIT_STATE_R state
             1: QUBIT_STATE_L state
         """
-        self.measure_error_model(self.measure_decoherence_rate)
-        return self.state.measure(self, "Y")
+        return self._measure("Y", rng)
 
-    def measureZ(self):
+    def measureZ(self, rng: Optional[RandomStream] = None):
         """
         Measure this qubit using Z basis
 
+        Args:
+            rng (RandomStream): the random stream of the measuring entity, default is the global random stream
         Returns:
             0: QUBIT_STATE_0 state
             1: QUBIT_STATE_1 state
         """
-        self.measure_error_model(self.measure_decoherence_rate)
-        return self.measure()
+        if rng is None:
+            self.measure_error_model(self.measure_decoherence_rate)
+        else:
+            self.measure_error_model(self.measure_decoherence_rate, rng=rng)
+        return self.measure(rng=rng)
 
     def operate(self, operator: Any) -> None:
         """
@@ -297,8 +506,12 @@ class Qubit(QuantumModel):
         if isinstance(operator, SingleQubitGate):
             operator(self)
             return
-        full_operator = single_gate_expand(self, operator)
-        self.state.operate(full_operator)
+        self._operate(operator)
+
+    def _operate(self, operator: np.ndarray) -> None:
+        if operator.shape != (2, 2):
+            raise OperatorError
+        self.state.operate(operator, [self])
 
     def _operate_without_error(self, operator: Any) -> None:
         """
@@ -311,27 +524,29 @@ class Qubit(QuantumModel):
         if isinstance(operator, SingleQubitGate):
             operator(self)
             return
-        full_operator = single_gate_expand(self, operator)
-        self.state.operate(full_operator)
+        self._operate(operator)
 
-    def stochastic_operate(self, list_operators: List[np.ndarray] = [], list_p: List[float] = []):
+    def stochastic_operate(self, list_operators: List[np.ndarray] = [], list_p: List[float] = [],
+                           rng: Optional[RandomStream] = None):
         """
         A stochastic operate on this qubit. It usually turns a pure state into a mixed state.
 
         Args:
             list_operators (List[np.ndarray]): a list of operators
             list_p (List[float]): a list of possibility
+            rng (RandomStream): the random stream of the entity that causes the operation, e.g., a memory
         Raises:
             OperatorNotMatchError
         """
         from qns.models.qubit.gate import SingleQubitGate
-        full_operators_list = []
+        operators_list = []
         for operator in list_operators:
             if isinstance(operator, SingleQubitGate):
-                full_operators_list.append(single_gate_expand(self, operator._operator))
-            else:
-                full_operators_list.append(single_gate_expand(self, operator))
-        self.state.stochastic_operate(full_operators_list, list_p)
+                operator = operator._operator
+            if operator.shape != (2, 2):
+                raise OperatorError
+            operators_list.append(operator)
+        self.state.stochastic_operate(operators_list, list_p, [self], rng=rng)
 
     def __repr__(self) -> str:
         if self.name is not None:
@@ -0,0 +1,413 @@
+#    SimQN: a discrete-event simulator for the quantum networks
+#    Copyright (C) 2021-2022 Lutong Chen, Jian Li, Kaiping Xue
+#    University of Science and Technology of China, USTC.
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import itertools
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from qns.models.qubit.const import OPERATOR_HADAMARD, OPERATOR_PAULI_I, OPERATOR_PAULI_X, \
+    OPERATOR_PAULI_Y, OPERATOR_PAULI_Z, OPERATOR_S, QUBIT_STATE_0
+from qns.models.qubit.errors import OperatorNotMatchError, QStateBaseError, QStateNotStabilizerError, \
+    QStateQubitNotInStateError
+from qns.models.qubit.qubit import QState, Qubit
+from qns.models.qubit.utils import kron
+from qns.utils.rnd import RandomStream, get_rand
+
+# the Pauli matrix of the bits (x, z), where (1, 1) is Y
+PAULI_MATRICES = {(0, 0): OPERATOR_PAULI_I, (1, 0): OPERATOR_PAULI_X,
+                  (1, 1): OPERATOR_PAULI_Y, (0, 1): OPERATOR_PAULI_Z}
+
+# the stabilizer (x, z, sign) of the basis states of the measurement outcomes 0 and 1
+BASIS_STABILIZERS = {"Z": [(0, 1, 0), (0, 1, 1)], "X": [(1, 0, 0), (1, 0, 1)], "Y": [(1, 1, 0), (1, 1, 1)]}
+
+OPERATOR_S_DAGGER = OPERATOR_S.T.conjugate()
+
+# the Clifford tables of the operators, see ``clifford_table``
+_clifford_tables: Dict[tuple, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+
+def clifford_table(operator: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    The action of a Clifford operator on the Pauli operators, i.e., ``U P U^dagger = (-1)^s P'``.
+    The tables are cached for every operator.
+
+    Args:
+        operator (np.ndarray): the operator on k qubits
+    Returns:
+        the x bits (4^k, k), the z bits (4^k, k) and the sign (4^k) of ``P'``, indexed by the code of ``P``,
+        where the code is the base-4 number of ``2x+z`` of the qubits, and the first qubit is the most significant
+    Raises:
+        OperatorNotMatchError: the operator is not a Clifford operator
+    """
+    key = (operator.shape, operator.tobytes(), operator.dtype.str)
+    table = _clifford_tables.get(key)
+    if table is not None:
+        return table
+
+    size = operator.shape[0]
+    k = size.bit_length() - 1
+    if operator.shape != (2**k, 2**k):
+        raise OperatorNotMatchError
+    bits = list(itertools.product([(0, 0), (0, 1), (1, 0), (1, 1)], repeat=k))
+    paulis = []
+    for pauli in bits:
+        matrix = np.array([[1]])
+        for b in pauli:
+            matrix = kron(matrix, PAULI_MATRICES[b])
+        paulis.append(matrix)
+    paulis = np.array(paulis)
+
+    table_x = np.zeros((len(bits), k), dtype=bool)
+    table_z = np.zeros((len(bits), k), dtype=bool)
+    table_s = np.zeros(len(bits), dtype=bool)
+    for code, pauli in enumerate(paulis):
+        image = np.dot(operator, np.dot(pauli, operator.T.conjugate()))
+        # the coefficients of the image in the Pauli basis
+        coef = np.einsum("qij,ji->q", paulis, image) / size
+        match = int(np.argmax(np.abs(coef)))
+        if abs(abs(coef[match]) - 1) > 1e-6 or abs(coef[match].imag) > 1e-6:
+            raise OperatorNotMatchError("the operator is not a Clifford operator")
+        table_x[code] = [b[0] for b in bits[match]]
+        table_z[code] = [b[1] for b in bits[match]]
+        table_s[code] = coef[match].real < 0
+    table = (table_x, table_z, table_s)
+    _clifford_tables[key] = table
+    return table
+
+
+class StabilizerState(QState):
+    """
+    StabilizerState is the state of one or multiple qubits in the stabilizer tableau representation
+    (the CHP algorithm by Aaronson and Gottesman). It only supports the Clifford operators,
+    e.g., X, Y, Z, H, S, CNOT and CZ, and the measurement in the Z, X and Y basis,
+    whose costs are polynomial in the number of qubits.
+    A stochastic operation, e.g., a Pauli error channel, applies one of the operators chosen by the possibilities,
+    so that the mixed state is sampled by Pauli frames over many runs.
+
+    The tableau has 2n rows of Pauli operators: the destabilizers and the stabilizers.
+    """
+
+    def __init__(self, qubits: List["Qubit"] = [], state: Optional[np.ndarray] = QUBIT_STATE_0,
+                 rho: Optional[np.ndarray] = None, name: Optional[str] = None):
+        """
+        Args:
+            qubits (List[Qubit]): a list of qubits in this quantum state
+            state: the state vector, which is a computational basis state, or a single qubit stabilizer state,
+                e.g., ``QUBIT_STATE_P``. If it is None, the state is |0...0>.
+            rho: not supported, as a mixed state can not be presented by a tableau
+            name (str): the name of this state
+        Raises:
+            QStateNotStabilizerError
+        """
+        self.num = len(qubits)
+        self.name = name
+        self.qubits = qubits
+        if rho is not None:
+            raise QStateNotStabilizerError("a stabilizer state can not be created from a density matrix")
+        # the state |0...0>: the destabilizers are X and the stabilizers are Z
+        self.x = np.zeros((2 * self.num, self.num), dtype=bool)
+        self.z = np.zeros((2 * self.num, self.num), dtype=bool)
+        self.r = np.zeros(2 * self.num, dtype=bool)
+        self.x[:self.num] = np.eye(self.num, dtype=bool)
+        self.z[self.num:] = np.eye(self.num, dtype=bool)
+        if state is not None:
+            self._init_state(np.asarray(state, dtype=complex).reshape(-1))
+
+    def _init_state(self, state: np.ndarray) -> None:
+        if len(state) != 2**self.num:
+            raise QStateNotStabilizerError("the size of the state vector does not match")
+        nonzero = np.flatnonzero(np.abs(state) > 1e-9)
+        if len(nonzero) == 1:
+            # a computational basis state
+            for j in range(self.num):
+                if nonzero[0] >> (self.num - 1 - j) & 1:
+                    self.operate(OPERATOR_PAULI_X, [self.qubits[j]])
+            return
+        if self.num == 1:
+            for prepare in [[OPERATOR_HADAMARD], [OPERATOR_PAULI_X, OPERATOR_HADAMARD],
+                            [OPERATOR_HADAMARD, OPERATOR_S], [OPERATOR_PAULI_X, OPERATOR_HADAMARD, OPERATOR_S]]:
+                vector = QUBIT_STATE_0.reshape(-1)
+                for operator in prepare:
+                    vector = np.dot(operator, vector)
+                if abs(abs(np.vdot(vector, state)) - 1) < 1e-9:
+                    for operator in prepare:
+                        self.operate(operator)
+                    return
+        raise QStateNotStabilizerError("the state vector is not a supported stabilizer state")
+
+    @property
+    def vector(self) -> np.ndarray:
+        """
+        The state vector, which is calculated from the stabilizers. It costs O(n 2^n), so it is only for small states.
+        """
+        size = 2**self.num
+        index = np.arange(size)
+        # a fixed vector that is not orthogonal to the state
+        vector = np.random.default_rng(0).random(size) + 1j * np.random.default_rng(1).random(size)
+        for row in range(self.num, 2 * self.num):
+            vector = (vector + self._apply_pauli(vector, index, row)) / 2
+        vector /= np.linalg.norm(vector)
+        # fix the global phase
+        top = vector[np.argmax(np.abs(vector))]
+        return vector * abs(top) / top
+
+    def _apply_pauli(self, vector: np.ndarray, index: np.ndarray, row: int) -> np.ndarray:
+        # X^x Z^z |b> = (-1)^(b.z) |b xor x>, and Y = iXZ
+        x_mask, parity = 0, np.zeros(len(vector), dtype=np.int64)
+        for j in range(self.num):
+            bit = self.num - 1 - j
+            if self.x[row, j]:
+                x_mask |= 1 << bit
+            if self.z[row, j]:
+                parity ^= (index >> bit) & 1
+        phase = (1j) ** int(np.sum(self.x[row] & self.z[row])) * (-1) ** int(self.r[row])
+        result = np.empty_like(vector)
+        result[index ^ x_mask] = phase * (1 - 2 * parity) * vector
+        return result
+
+    @property
+    def rho(self) -> np.ndarray:
+        """
+        The density matrix, which is calculated from the stabilizers. It is only for small states.
+        """
+        vector = self.vector
+        return np.outer(vector, vector.conjugate())
+
+    @rho.setter
+    def rho(self, rho: np.ndarray) -> None:
+        raise QStateNotStabilizerError("a stabilizer state can not be set by a density matrix")
+
+    def to_density_matrix(self) -> None:
+        raise QStateNotStabilizerError("a stabilizer state can not be turned into a density matrix")
+
+    def operate(self, operator: np.ndarray, qubits: Optional[List["Qubit"]] = None):
+        """
+        transform using the Clifford operator `operator`
+
+        Args:
+            operator (np.ndarray): the operator on all qubits, or on ``qubits`` if it is given
+            qubits (List[Qubit]): the operating qubits in the order of the operator
+        Raises:
+            OperatorNotMatchError: the operator does not match the qubits or is not a Clifford operator
+            QStateQubitNotInStateError
+        """
+        idx = self._index(qubits)
+        if idx is None:
+            idx = list(range(self.num))
+        if operator.shape != (2**len(idx), 2**len(idx)):
+            raise OperatorNotMatchError
+        table_x, table_z, table_s = clifford_table(operator)
+        code = np.zeros(2 * self.num, dtype=np.int64)
+        for j in idx:
+            code = code * 4 + 2 * self.x[:, j] + self.z[:, j]
+        self.x[:, idx] = table_x[code]
+        self.z[:, idx] = table_z[code]
+        self.r ^= table_s[code]
+
+    def stochastic_operate(self, list_operators: List[np.ndarray] = [], list_p: List[float] = [],
+                           qubits: Optional[List["Qubit"]] = None, rng: Optional[RandomStream] = None):
+        """
+        A stochastic operate progess. One of the operators is chosen by the possibilities and applied,
+        i.e., a Pauli frame of a Pauli error channel.
+
+        Args:
+            list_operators (List[np.ndarray]): a list of Clifford operators on all qubits,
+                or on ``qubits`` if it is given
+            list_p (List[float]): a list of possibility
+            qubits (List[Qubit]): the operating qubits in the order of the operators
+            rng (RandomStream): the random stream of the entity that causes the operation,
+                default is the global random stream
+        Raises:
+            OperatorNotMatchError
+            QStateQubitNotInStateError
+        """
+        if len(list_operators) != len(list_p):
+            raise OperatorNotMatchError("Not match number between operators and possibilities")
+        for p in list_p:
+            if p < 0 or p > 1:
+                raise OperatorNotMatchError("possibility not in range")
+        if abs(1 - sum(list_p)) >= 1e-6:
+            raise OperatorNotMatchError("Probabilities are not normalized")
+
+        rn = get_rand() if rng is None else rng.random()
+        for operator, p in zip(list_operators, list_p):
+            rn -= p
+            if rn < 0:
+                break
+        self.operate(operator, qubits)
+
+    def _rowsum(self, rows: np.ndarray, i: int) -> None:
+        # multiply the Pauli operators of ``rows`` by the row ``i``
+        x1, z1 = self.x[i].astype(np.int64), self.z[i].astype(np.int64)
+        x2, z2 = self.x[rows].astype(np.int64), self.z[rows].astype(np.int64)
+        # the power of i when multiplying the Pauli operators of every qubit
+        g = np.where(x1 & z1, z2 - x2, 0) + np.where(x1 & (1 - z1), z2 * (2 * x2 - 1), 0) \
+            + np.where((1 - x1) & z1, x2 * (1 - 2 * z2), 0)
+        phase = 2 * self.r[rows] + 2 * self.r[i] + np.sum(g, axis=1)
+        self.r[rows] = phase % 4 >= 2
+        self.x[rows] ^= self.x[i]
+        self.z[rows] ^= self.z[i]
+
+    def measure(self, qubit: "Qubit" = None, base: str = "Z", rng: Optional[RandomStream] = None) -> int:
+        """
+        Measure this qubit
+        Args:
+            qubit (Qubit): the measuring qubit
+            base: the measure base, "Z", "X" or "Y"
+            rng (RandomStream): the random stream of the measuring entity, default is the global random stream
+
+        Returns:
+            0: QUBIT_STATE_0, QUBIT_STATE_P or QUBIT_STATE_R state
+            1: QUBIT_STATE_1, QUBIT_STATE_N or QUBIT_STATE_L state
+        """
+        if base not in BASIS_STABILIZERS:
+            raise QStateBaseError
+        try:
+            a = self.qubits.index(qubit)
+        except ValueError:
+            raise QStateQubitNotInStateError
+        # rotate the basis to the Z basis
+        if base == "Y":
+            self.operate(OPERATOR_S_DAGGER, [qubit])
+        if base != "Z":
+            self.operate(OPERATOR_HADAMARD, [qubit])
+
+        n = self.num
+        rn = get_rand() if rng is None else rng.random()
+        anticommute = np.flatnonzero(self.x[n:, a])
+        if len(anticommute) > 0:
+            # the outcome is random
+            p = n + anticommute[0]
+            rows = np.flatnonzero(self.x[:, a])
+            self._rowsum(rows[rows != p], p)
+            self.x[p - n], self.z[p - n], self.r[p - n] = self.x[p], self.z[p], self.r[p]
+            self.x[p], self.z[p] = False, False
+            self.z[p, a] = True
+            self.r[p] = rn >= 0.5
+        else:
+            # the outcome is determined: the product of the stabilizers paired with the destabilizers
+            # that anticommute with Z is +-Z, and it replaces one of the stabilizers
+            rows = np.flatnonzero(self.x[:n, a])
+            p = n + rows[0]
+            for i in rows[1:]:
+                self._rowsum(np.array([p]), n + i)
+            self.x[rows[1:]] ^= self.x[rows[0]]
+            self.z[rows[1:]] ^= self.z[rows[0]]
+        ret = int(self.r[p])
+
+        # the stabilizer p is +-Z on the measured qubit, so the qubit is removed from the other rows
+        # by multiplying them by the stabilizer p, and the rows p-n and p are removed
+        others = np.flatnonzero(self.z[:, a])
+        others = others[(others != p) & (others != p - n)]
+        self.r[others[others >= n]] ^= self.r[p]
+        self.z[others, a] = False
+        keep = np.ones(2 * n, dtype=bool)
+        keep[[p - n, p]] = False
+        columns = np.arange(n) != a
+        self.x = self.x[keep][:, columns]
+        self.z = self.z[keep][:, columns]
+        self.r = self.r[keep]
+        self.num -= 1
+        self.qubits.remove(qubit)
+
+        ns = StabilizerState([qubit], state=None)
+        x, z, sign = BASIS_STABILIZERS[base][ret]
+        # the destabilizer is X for the Z basis, or Z for the X and Y basis
+        ns.x[0, 0], ns.z[0, 0] = not x, bool(x)
+        ns.x[1, 0], ns.z[1, 0], ns.r[1] = x, z, sign
+        qubit.state = ns
+        return ret
+
+    def merge(self, other: "QState") -> "QState":
+        """
+        The joint state of the qubits in this state and ``other``.
+        If ``other`` is not a stabilizer state, the joint state is a ``QState``.
+
+        Args:
+            other (QState): the other state
+        Returns:
+            the joint state
+        """
+        if not isinstance(other, StabilizerState):
+            return QState.merge(QState(self.qubits, state=self.vector), other)
+        ns = StabilizerState(self.qubits + other.qubits, state=None)
+        n = ns.num
+        ns.x[:], ns.z[:] = False, False
+        # the destabilizers and the stabilizers of both states on their own qubits
+        for part, offset in [(self, 0), (other, self.num)]:
+            m = part.num
+            rows = slice(offset, offset + m)
+            ns.x[rows, offset:offset + m] = part.x[:m]
+            ns.z[rows, offset:offset + m] = part.z[:m]
+            ns.r[rows] = part.r[:m]
+            stab_rows = slice(n + offset, n + offset + m)
+            ns.x[stab_rows, offset:offset + m] = part.x[m:]
+            ns.z[stab_rows, offset:offset + m] = part.z[m:]
+            ns.r[stab_rows] = part.r[m:]
+        return ns
+
+    def factorize(self, eps: float = 1e-9) -> List["QState"]:
+        """
+        The tableau is not split, since its size only grows quadratically with the number of qubits
+
+        Returns:
+            an empty list
+        """
+        return []
+
+    def basis_value(self, eps: float = 1e-9) -> Optional[int]:
+        """
+        The value of a single qubit state in the Z basis
+
+        Returns:
+            0 or 1 if this is a single qubit state stabilized by +Z or -Z, otherwise None
+        """
+        if self.num != 1 or self.x[1, 0] or not self.z[1, 0]:
+            return None
+        return int(self.r[1])
+
+    def equal(self, other_state: "QState") -> bool:
+        """
+        compare two states, return True if they are the same
+
+        Args:
+            other_state (QState): the second QState
+        """
+        return np.allclose(self.rho, other_state.rho)
+
+    def is_pure_state(self, eps: float = 0.000_001) -> bool:
+        """
+        A stabilizer state is always a pure state
+        """
+        return True
+
+    def __repr__(self) -> str:
+        if self.name is not None:
+            return "<stabilizer state "+self.name+">"
+        signs = ["-" if r else "+" for r in self.r[self.num:]]
+        paulis = ["".join("IZXY"[2 * x + z] for x, z in zip(xs, zs))
+                  for xs, zs in zip(self.x[self.num:], self.z[self.num:])]
+        return "<stabilizer state " + ", ".join(s + p for s, p in zip(signs, paulis)) + ">"
+
+
+class StabilizerQubit(Qubit):
+    """
+    A qubit whose state is a ``StabilizerState``. It supports the Clifford gates, e.g., X, Y, Z, H, S, CNOT and CZ,
+    the measurements, and the Pauli error models, e.g., ``DephaseStorageErrorModel`` and ``DepolarTransferErrorModel``.
+    """
+
+    state_class = StabilizerState
@@ -15,6 +15,7 @@
 #    You should have received a copy of the GNU General Public License
 #    along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+from typing import List, Tuple
 import numpy as np
 from qns.models.qubit.const import OPERATOR_PAULI_I
 from qns.models.qubit.errors import QGateStateJointError, OperatorError
@@ -29,6 +30,16 @@ def kron(a: np.ndarray, b: np.ndarray) -> np.ndarray:
 
 
 def single_gate_expand(qubit, operator: np.ndarray) -> np.ndarray:
+    """
+    Expand a single qubit operator to the full operator of the qubit's state.
+    The full operator has 4^n elements, so ``QState.operate`` with the target qubits is preferred.
+
+    Args:
+        qubit (Qubit): the operating qubit
+        operator (np.ndarray): the 2x2 operator
+    Returns:
+        the full operator
+    """
     state = qubit.state
     if operator.shape != (2, 2):
         raise OperatorError
@@ -47,15 +58,104 @@ def single_gate_expand(qubit, operator: np.ndarray) -> np.ndarray:
     return full_operator
 
 
+def controlled_operator(operator: np.ndarray, controls: int = 1) -> np.ndarray:
+    """
+    The operator of a controlled gate, i.e., ``operator`` is applied if all control qubits are |1>
+
+    Args:
+        operator (np.ndarray): the operator on the target qubit
+        controls (int): the number of control qubits, which are before the target qubit
+    Returns:
+        the operator on the control qubits and the target qubit
+    """
+    size = 2 ** controls * operator.shape[0]
+    full_operator = np.eye(size, dtype=np.result_type(operator, complex))
+    full_operator[size - operator.shape[0]:, size - operator.shape[1]:] = operator
+    return full_operator
+
+
+def _sort_operator(operator: np.ndarray, idx: List[int]) -> Tuple[np.ndarray, List[int]]:
+    # reorder the qubits of the operator as they are in the state
+    k = len(idx)
+    order = sorted(range(k), key=idx.__getitem__)
+    if order == list(range(k)):
+        return operator, idx
+    operator = operator.reshape([2] * (2 * k)).transpose(order + [k + i for i in order])
+    return operator.reshape(2 ** k, 2 ** k), sorted(idx)
+
+
+def apply_operator(rho: np.ndarray, operator: np.ndarray, idx: List[int]) -> np.ndarray:
+    """
+    Calculate ``U rho U^dagger``, where ``U`` is ``operator`` on the qubits ``idx`` and identity on others.
+    Only the axes of the target qubits in the density matrix are contracted, so it costs O(4^n) for a gate
+    on n qubits instead of building the full operator.
+
+    Args:
+        rho (np.ndarray): the density matrix of n qubits
+        operator (np.ndarray): the operator on k qubits, whose shape is (2^k, 2^k)
+        idx (List[int]): the indexes of the k qubits in the state, in the order of the operator
+    Returns:
+        the new density matrix
+    """
+    size = rho.shape[0]
+    num = size.bit_length() - 1
+    k = len(idx)
+    operator, idx = _sort_operator(operator, idx)
+
+    first = idx[0]
+    if num <= 4 and idx[-1] - first == k - 1:
+        # small states with adjacent target qubits: U acts on the middle axis of (left, target, right) rows,
+        # and U^dagger on the middle axis of (rows and left, target, right) columns,
+        # which has less overhead than the tensor contraction
+        dim, right = 2 ** k, 2 ** (num - first - k)
+        tensor = np.matmul(operator, rho.reshape(2 ** first, dim, right * size))
+        tensor = np.matmul(operator.conj(), tensor.reshape(size * 2 ** first, dim, right))
+        return tensor.reshape(size, size)
+
+    op = operator.reshape([2] * (2 * k))
+    in_axes = list(range(k, 2 * k))
+    # U rho: the output axes of U are moved to the target row axes
+    tensor = np.tensordot(op, rho.reshape([2] * (2 * num)), axes=(in_axes, idx))
+    tensor = np.moveaxis(tensor, list(range(k)), idx)
+    # (U rho) U^dagger: the column axes are contracted with the conjugated input axes of U
+    col = [num + i for i in idx]
+    tensor = np.tensordot(tensor, op.conj(), axes=(col, in_axes))
+    tensor = np.moveaxis(tensor, list(range(2 * num - k, 2 * num)), col)
+    return tensor.reshape(size, size)
+
+
+def apply_vector_operator(vector: np.ndarray, operator: np.ndarray, idx: List[int]) -> np.ndarray:
+    """
+    Calculate ``U psi``, where ``U`` is ``operator`` on the qubits ``idx`` and identity on others.
+    Only the axes of the target qubits in the state vector are contracted.
+
+    Args:
+        vector (np.ndarray): the state vector of n qubits
+        operator (np.ndarray): the operator on k qubits, whose shape is (2^k, 2^k)
+        idx (List[int]): the indexes of the k qubits in the state, in the order of the operator
+    Returns:
+        the new state vector
+    """
+    size = vector.shape[0]
+    num = size.bit_length() - 1
+    k = len(idx)
+    operator, idx = _sort_operator(operator, idx)
+
+    first = idx[0]
+    if num <= 8 and idx[-1] - first == k - 1:
+        return np.matmul(operator, vector.reshape(2 ** first, 2 ** k, -1)).reshape(size)
+    tensor = np.tensordot(operator.reshape([2] * (2 * k)), vector.reshape([2] * num),
+                          axes=(list(range(k, 2 * k)), idx))
+    return np.moveaxis(tensor, list(range(k)), idx).reshape(size)
+
+
 def joint(qubit1, qubit2) -> None:
     if qubit1.state == qubit2.state:
         return
     if len(set(qubit1.state.qubits) & set(qubit2.state.qubits)) > 0:
         raise QGateStateJointError
 
-    from qns.models.qubit.qubit import QState
-    nq = QState(qubit1.state.qubits+qubit2.state.qubits,
-                rho=kron(qubit1.state.rho, qubit2.state.rho))
+    nq = qubit1.state.merge(qubit2.state)
     for q in nq.qubits:
         q.state = nq
 
@@ -21,7 +21,10 @@ from qns.network.topology import Topology, LineTopology, RandomTopology, \
     GridTopology, TreeTopology, BasicTopology, WaxmanTopology
 from qns.network.route.route import RouteImpl, NetworkRouteError
 from qns.network.route.dijkstra import DijkstraRouteAlgorithm
+from qns.network.partition import GraphPartitioner
+from qns.network.parallel import ParallelSimulator
 
 __all__ = ["QuantumNetwork", "Request", "Topology", "LineTopology", "NetworkRouteError",
            "RandomTopology", "GridTopology", "TreeTopology", "BasicTopology", "WaxmanTopology",
-           "RouteImpl", "DijkstraRouteAlgorithm", "QNSNetworkError"]
+           "RouteImpl", "DijkstraRouteAlgorithm", "QNSNetworkError", "GraphPartitioner",
+           "ParallelSimulator"]
@@ -65,8 +65,10 @@ class QuantumNetwork(object):
         Args:
             simulator (qns.simulator.simulator.Simulator): the simulator
         '''
-        for n in self.nodes:
-            n.install(s)
+        s.network = self
+        with s.context():
+            for n in self.nodes:
+                n.install(s)
 
     def add_node(self, node: QNode):
         """
@@ -0,0 +1,481 @@
+#    SimQN: a discrete-event simulator for the quantum networks
+#    Copyright (C) 2021-2022 Lutong Chen, Jian Li, Kaiping Xue
+#    University of Science and Technology of China, USTC.
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Conservative parallel discrete-event simulation (PDES) of a ``QuantumNetwork``.
+
+The nodes are split into partitions, and each partition is simulated by a logical process
+in a worker process. Logical processes only interact through the quantum and classic channels
+that cross partitions, so the minimum delay of these channels (the lookahead) bounds how far
+they can run without receiving events from each other. The simulation proceeds in synchronous
+windows (YAWNS): if ``T`` is the earliest pending event among all logical processes and ``L``
+is the lookahead, every logical process invokes its events in ``[T, T + L)`` in parallel,
+and then the ``RecvQubitPacket`` and ``RecvClassicPacket`` events that cross partitions are
+exchanged before the next window.
+
+The random numbers must be drawn from the streams of the entities, e.g., ``Entity.rng`` and
+the streams of the channel directions, which are the same in all logical processes.
+Every logical process has its own copy of the global random stream, so the draws from it,
+e.g., ``get_rand``, differ from the sequential simulation, and ``ParallelSimulator`` warns about them.
+"""
+
+import io
+import math
+import multiprocessing
+import os
+import pickle
+import tempfile
+import traceback
+import warnings
+from typing import Dict, List, Optional, Tuple, Union
+
+from qns.entity.node.app import Application
+from qns.entity.node.node import QNode
+from qns.network.partition import GraphPartitioner
+from qns.simulator.event import Event
+from qns.simulator.simulator import Simulator
+from qns.utils.rnd import context_random
+
+
+class EntityTable(object):
+    """
+    Name the entities of an installed network by their positions.
+    Every logical process restores the same network, so that a name refers to
+    the same entity in all copies of the network.
+    """
+
+    def __init__(self, simulator: Simulator):
+        '''
+        Args:
+            simulator (Simulator): the simulator with an installed network
+        '''
+        self.objects = {}
+        self.keys = {}
+        net = simulator.network
+        self._add(("simulator",), simulator)
+        self._add(("network",), net)
+        for i, node in enumerate(net.nodes):
+            self._add(("node", i), node)
+            for kind, entities in (("qchannel", node.qchannels), ("cchannel", node.cchannels),
+                                   ("memory", node.memories), ("operator", node.operators),
+                                   ("app", node.apps)):
+                for j, entity in enumerate(entities):
+                    self._add((kind, i, j), entity)
+
+    def _add(self, key: tuple, obj) -> None:
+        if id(obj) not in self.keys:
+            self.keys[id(obj)] = key
+            self.objects[key] = obj
+
+    def dumps(self, events: List[Event]) -> bytes:
+        '''
+        Serialize events. The entities are replaced by their names and the other objects,
+        e.g., qubits and packets, are copied.
+
+        Args:
+            events (List[Event]): the events
+        Returns:
+            the serialized events
+        '''
+        f = io.BytesIO()
+        _EntityPickler(f, self).dump(events)
+        return f.getvalue()
+
+    def loads(self, data: bytes) -> List[Event]:
+        '''
+        Deserialize events and bind them to the entities of this network
+
+        Args:
+            data (bytes): the serialized events
+        Returns:
+            the events
+        '''
+        return _EntityUnpickler(io.BytesIO(data), self).load()
+
+
+class _EntityPickler(pickle.Pickler):
+    def __init__(self, file, table: EntityTable):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.table = table
+
+    def persistent_id(self, obj):
+        return self.table.keys.get(id(obj))
+
+
+class _EntityUnpickler(pickle.Unpickler):
+    def __init__(self, file, table: EntityTable):
+        super().__init__(file)
+        self.table = table
+
+    def persistent_load(self, pid):
+        return self.table.objects[pid]
+
+
+class _BoundarySimulator(object):
+    """
+    It replaces the simulator of the channels that cross partitions, so that
+    the events for the nodes in other partitions are sent to their logical processes.
+    """
+
+    def __init__(self, lp: "LogicalProcess", simulator: Simulator):
+        self._lp = lp
+        self._simulator = simulator
+
+    def __getattr__(self, name: str):
+        return getattr(self._simulator, name)
+
+    def add_event(self, event: Event) -> None:
+        self._lp.add_event(event)
+
+
+class _RemoteList(list):
+    """
+    It replaces the applications, memories and operators of the nodes in other partitions,
+    which can not be used by this logical process.
+    """
+
+    def __init__(self, node: QNode, attr: str, items: list):
+        super().__init__(items)
+        self._node = node
+        self._attr = attr
+
+    def _error(self, *args, **kwargs):
+        raise RuntimeError(f"the {self._attr} of {self._node} are simulated by another logical process. "
+                           "Only channels may carry events across partitions")
+
+    __getitem__ = __iter__ = __len__ = __contains__ = _error
+
+
+class LogicalProcess(object):
+    """
+    A logical process simulates the nodes in one partition
+    """
+
+    def __init__(self, index: int, path: str, partition_of: List[int]):
+        '''
+        Args:
+            index (int): the index of this logical process
+            path (str): the checkpoint of the installed simulation
+            partition_of (List[int]): the partition of each node in ``network.nodes``
+        '''
+        self.index = index
+        self.simulator = Simulator.restore(path)
+        s = self.simulator
+        net = s.network
+        self.table = EntityTable(s)
+        self.owner = {id(node): partition_of[i] for i, node in enumerate(net.nodes)}
+        self.outbox: Dict[int, List[Event]] = {}
+
+        # keep only the pending events of this partition
+        pool = s.event_pool
+        tc = pool.tc
+        new_pool = type(pool)(pool.ts, pool.te)
+        event = pool.next_event()
+        while event is not None:
+            if self.event_owner(event) == index:
+                new_pool.add_event(event)
+            event = pool.next_event()
+        new_pool.tc = tc
+        s.event_pool = new_pool
+        # every pending event is counted by the first logical process
+        if index != 0:
+            s.total_events = 0
+
+        self.boundary = {}
+        for node in net.nodes:
+            for channel in node.qchannels + node.cchannels:
+                if id(channel) in self.boundary or channel._simulator is None:
+                    continue
+                owners = {self.owner.get(id(n)) for n in channel.node_list}
+                if len(owners) > 1:
+                    self.boundary[id(channel)] = channel
+                    channel._simulator = _BoundarySimulator(self, s)
+
+        # the copies of the nodes in other partitions are never invoked here,
+        # so using their applications, memories or operators, e.g., by calling another node's application,
+        # would silently differ from the sequential simulation
+        self.remote: List[Tuple[QNode, str, list]] = []
+        for node in net.nodes:
+            if self.owner[id(node)] == index:
+                continue
+            for attr in ("apps", "memories", "operators"):
+                items = getattr(node, attr)
+                self.remote.append((node, attr, items))
+                setattr(node, attr, _RemoteList(node, attr, items))
+
+    def event_owner(self, event: Event) -> int:
+        '''
+        Get the logical process that invokes ``event``, which is decided by its destination
+        or its source node. Events that do not belong to any node are invoked by the first process.
+
+        Args:
+            event (Event): the event
+        Returns:
+            the index of the logical process
+        '''
+        node = getattr(event, "dest", None)
+        if not isinstance(node, QNode):
+            node = getattr(event, "node", None)
+        if not isinstance(node, QNode):
+            by = event.by
+            if isinstance(by, QNode):
+                node = by
+            elif isinstance(by, Application):
+                node = by.get_node()
+            else:
+                node = getattr(by, "node", None)
+        return self.owner.get(id(node), 0)
+
+    def add_event(self, event: Event) -> None:
+        '''
+        Add an event from a boundary channel
+
+        Args:
+            event (Event): the inserting event
+        '''
+        index = self.event_owner(event)
+        if index == self.index:
+            self.simulator.add_event(event)
+        elif event.t.time_slot <= self.simulator.te.time_slot:
+            self.outbox.setdefault(index, []).append(event)
+
+    def next_slot(self) -> Optional[int]:
+        '''
+        Returns:
+            the time slot of the next local event, or None if there is no pending event
+        '''
+        event = self.simulator.event_pool.peek_event()
+        return None if event is None else event.t.time_slot
+
+    def run_window(self, until_slot: int,
+                   inbox: List[bytes]) -> Tuple[Dict[int, Tuple[int, bytes]], Optional[int], bool]:
+        '''
+        Insert the received events and invoke the events until ``until_slot``
+
+        Args:
+            until_slot (int): the last time slot of this window
+            inbox (List[bytes]): the serialized events from other logical processes
+        Returns:
+            the serialized events and their earliest time slot for each destination logical process,
+            the time slot of the next local event, and whether the global random stream is used
+        '''
+        s = self.simulator
+        events = []
+        for data in inbox:
+            events.extend(self.table.loads(data))
+        # the sort is stable, so events at the same time slot keep a deterministic order
+        events.sort(key=lambda e: e.t.time_slot)
+        for event in events:
+            s.add_event(event)
+
+        stream = context_random.get().stream
+        position = stream.position()
+        s.run_until(s.time_from_slots(until_slot))
+        global_draws = context_random.get().stream is not stream or stream.position() != position
+
+        outbox = {index: (min(e.t.time_slot for e in events), self.table.dumps(events))
+                  for index, events in self.outbox.items()}
+        self.outbox = {}
+        return outbox, self.next_slot(), global_draws
+
+    def finish(self, path: str) -> None:
+        '''
+        Finish the simulation and save it to ``path``
+
+        Args:
+            path (str): the file path
+        '''
+        self.simulator.run()
+        for channel in self.boundary.values():
+            channel._simulator = self.simulator
+        for node, attr, items in self.remote:
+            setattr(node, attr, items)
+        self.simulator.checkpoint(path)
+
+
+def _run_logical_process(conn, index: int, path: str, partition_of: List[int]) -> None:
+    try:
+        lp = LogicalProcess(index, path, partition_of)
+        conn.send(("ok", lp.next_slot()))
+        while True:
+            cmd = conn.recv()
+            if cmd[0] == "window":
+                conn.send(("ok",) + lp.run_window(cmd[1], cmd[2]))
+            elif cmd[0] == "finish":
+                lp.finish(cmd[1])
+                conn.send(("ok",))
+                return
+    except Exception:
+        conn.send(("error", traceback.format_exc()))
+    finally:
+        conn.close()
+
+
+class ParallelSimulator(object):
+    """
+    ParallelSimulator runs an installed ``QuantumNetwork`` with a logical process for each partition.
+    Only channels may carry events across partitions, and their delays must be positive.
+
+    The applications, memories and operators of a node can only be used in its own partition,
+    e.g., an application can not call the application of a node in another partition,
+    otherwise ``run`` raises a ``RuntimeError``.
+    The results are the same as the sequential simulation if the events of different nodes
+    at the same time slot are independent and the random numbers are drawn from the streams of the entities,
+    e.g., ``Entity.rng``, rather than the global random stream, which is copied in every logical process.
+    A ``RuntimeWarning`` is raised if the global random stream is used during the simulation.
+    Objects sent through the channels across partitions, e.g., qubits, are copied.
+    Timers, monitors and other events that do not belong to a node run in the first logical process.
+    """
+
+    def __init__(self, simulator: Simulator, partitions: Union[int, List[List[Union[QNode, str]]]] = 2,
+                 start_method: Optional[str] = None):
+        '''
+        Args:
+            simulator (Simulator): the simulator with an installed network
+            partitions (Union[int, List[List[Union[QNode, str]]]]): the nodes or the node names of each partition,
+                or the number of partitions that are split by the ``GraphPartitioner``
+            start_method (Optional[str]): the start method of the worker processes, e.g., "fork" or "spawn"
+        Raises:
+            ValueError: the network is not installed, the partitions are invalid,
+                or a channel across partitions has no delay
+        '''
+        self.simulator = simulator
+        network = simulator.network
+        if network is None:
+            raise ValueError("the network is not installed")
+        nodes = network.nodes
+
+        if isinstance(partitions, int):
+            partitions = GraphPartitioner(k=partitions).partition(network)
+        partitions = [[network.get_node(n) if isinstance(n, str) else n for n in part] for part in partitions]
+        self.partitions = partitions
+
+        index = {id(node): i for i, node in enumerate(nodes)}
+        self.partition_of = [-1] * len(nodes)
+        for p, part in enumerate(partitions):
+            for node in part:
+                if id(node) not in index or self.partition_of[index[id(node)]] != -1:
+                    raise ValueError(f"{node} is not in the network or in more than one partitions")
+                self.partition_of[index[id(node)]] = p
+        if -1 in self.partition_of:
+            raise ValueError(f"{nodes[self.partition_of.index(-1)]} is not in any partitions")
+
+        self.lookahead = math.inf
+        for node in nodes:
+            for channel in node.qchannels + node.cchannels:
+                owners = {self.partition_of[index[id(n)]] for n in channel.node_list if id(n) in index}
+                if len(owners) < 2:
+                    continue
+                lookahead = int(channel.delay_model.lower_bound() * simulator.accuracy)
+                if lookahead <= 0:
+                    raise ValueError(f"{channel} crosses partitions but has no delay")
+                self.lookahead = min(self.lookahead, lookahead)
+
+        self.start_method = start_method
+        self.simulators: List[Simulator] = []
+        self.windows = 0
+
+    def run(self) -> None:
+        '''
+        Run the simulation until the end time.
+        The simulator and the network of each partition are ``simulators`` afterwards.
+        '''
+        ctx = multiprocessing.get_context(self.start_method)
+        k = len(self.partitions)
+        te_slot = self.simulator.te.time_slot
+        with tempfile.TemporaryDirectory() as dir:
+            path = os.path.join(dir, "network")
+            self.simulator.checkpoint(path)
+
+            conns, procs = [], []
+            for i in range(k):
+                parent_conn, child_conn = ctx.Pipe()
+                proc = ctx.Process(target=_run_logical_process,
+                                   args=(child_conn, i, path, self.partition_of), daemon=True)
+                proc.start()
+                child_conn.close()
+                conns.append(parent_conn)
+                procs.append(proc)
+
+            finished = False
+            try:
+                next_slots = [self._recv(conn)[1] for conn in conns]
+                inbox: List[List[bytes]] = [[] for _ in range(k)]
+                message_slot = None
+                global_draws = False
+                while True:
+                    slots = [slot for slot in next_slots + [message_slot] if slot is not None]
+                    if len(slots) == 0 or min(slots) > te_slot:
+                        break
+                    until_slot = te_slot if self.lookahead == math.inf else min(slots) + self.lookahead - 1
+                    for i, conn in enumerate(conns):
+                        conn.send(("window", until_slot, inbox[i]))
+                    self.windows += 1
+
+                    inbox = [[] for _ in range(k)]
+                    message_slot = None
+                    for i, conn in enumerate(conns):
+                        _, outbox, next_slots[i], drawn = self._recv(conn)
+                        global_draws = global_draws or drawn
+                        for dest, (slot, data) in sorted(outbox.items()):
+                            inbox[dest].append(data)
+                            message_slot = slot if message_slot is None else min(message_slot, slot)
+
+                if global_draws:
+                    warnings.warn("random numbers are drawn from the global random stream in logical processes, "
+                                  "so the results may differ from the sequential simulation", RuntimeWarning)
+                for i, conn in enumerate(conns):
+                    conn.send(("finish", f"{path}.{i}"))
+                for conn in conns:
+                    self._recv(conn)
+                self.simulators = [Simulator.restore(f"{path}.{i}") for i in range(k)]
+                finished = True
+            finally:
+                for conn in conns:
+                    conn.close()
+                for proc in procs:
+                    # the other logical processes still wait for commands if one of them failed
+                    if not finished:
+                        proc.terminate()
+                    proc.join()
+
+    def _recv(self, conn) -> tuple:
+        reply = conn.recv()
+        if reply[0] == "error":
+            raise RuntimeError(f"logical process failed:\n{reply[1]}")
+        return reply
+
+    @property
+    def total_events(self) -> int:
+        """
+        The number of events of all logical processes
+        """
+        return sum(s.total_events for s in self.simulators)
+
+    def get_node(self, name: str) -> QNode:
+        '''
+        Get a node after ``run`` from the logical process that simulates it
+
+        Args:
+            name (str): the node's name
+        Returns:
+            the node
+        '''
+        for i, node in enumerate(self.simulator.network.nodes):
+            if node.name == name:
+                return self.simulators[self.partition_of[i]].network.nodes[i]
+        raise KeyError(name)
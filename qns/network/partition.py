@@ -0,0 +1,292 @@
+#    SimQN: a discrete-event simulator for the quantum networks
+#    Copyright (C) 2021-2022 Lutong Chen, Jian Li, Kaiping Xue
+#    University of Science and Technology of China, USTC.
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import math
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+from qns.entity.node.node import QNode
+from qns.network.network import QuantumNetwork
+from qns.network.requests import Request
+
+
+def request_traffic(request: Request) -> float:
+    """
+    The default expected traffic of a request, which is its ``send_rate`` attribution or 1
+    """
+    return request.attr.get("send_rate", 1)
+
+
+class GraphPartitioner(object):
+    """
+    GraphPartitioner splits the nodes of a ``QuantumNetwork`` into ``k`` balanced partitions
+    for the ``ParallelSimulator``.
+
+    It first maximizes the lookahead: channels whose delays are shorter than a threshold are never cut,
+    and the threshold is the largest channel delay that still allows balanced partitions.
+    Then it minimizes the cost of the cut channels by multilevel graph partitioning: the heaviest channels
+    are contracted first, the coarsest graph is split by graph growing, and the partitions are refined
+    while the graph is expanded.
+    The cost of a channel is 1 plus the expected traffic of the requests routed through it.
+    """
+
+    def __init__(self, k: int = 2, imbalance: float = 0.1,
+                 traffic: Callable[[Request], float] = request_traffic, passes: int = 10):
+        """
+        Args:
+            k (int): the number of partitions
+            imbalance (float): the allowed fraction that the weight of a partition exceeds the average
+            traffic (Callable[[Request], float]): the function that returns the expected traffic of a request
+            passes (int): the maximum number of refinement passes
+        """
+        if k < 1:
+            raise ValueError("k should be positive")
+        self.k = k
+        self.imbalance = imbalance
+        self.traffic = traffic
+        self.passes = passes
+
+        self.cut_channels = []
+        self.cut_cost = 0
+        self.lookahead = math.inf
+
+    def partition(self, network: QuantumNetwork,
+                  node_weights: Optional[Dict[QNode, float]] = None) -> List[List[QNode]]:
+        """
+        Split the nodes of ``network``
+
+        Args:
+            network (QuantumNetwork): the built network. If ``build_route`` is called,
+                the requests follow the routing paths, otherwise the paths with the fewest hops.
+            node_weights (Optional[Dict[QNode, float]]): the load of each node to be balanced, default is 1
+        Returns:
+            the nodes of each partition, which can be passed to the ``ParallelSimulator``
+        """
+        nodes = network.nodes
+        index = {id(n): i for i, n in enumerate(nodes)}
+        weights = [1.0 if node_weights is None else node_weights.get(n, 1.0) for n in nodes]
+        max_weight = max((1 + self.imbalance) * sum(weights) / self.k, max(weights, default=0))
+
+        channels = self._channels(network, index)
+        edges: Dict[Tuple[int, int], List[float]] = {}
+        for (i, j), channel in channels:
+            edge = edges.setdefault((i, j), [0, math.inf])
+            edge[0] += 1
+            edge[1] = min(edge[1], channel.delay_model.lower_bound())
+        for request in network.requests:
+            path = self._path(network, index, edges, request)
+            for i, j in zip(path, path[1:]):
+                edge = edges.get((min(i, j), max(i, j)))
+                if edge is not None:
+                    edge[0] += self.traffic(request)
+
+        # never cut the channels shorter than the largest feasible threshold
+        for threshold in sorted({delay for _, delay in edges.values() if delay > 0}, reverse=True) + [0]:
+            group_of = self._contract(len(nodes), edges, threshold)
+            group_weights = [0.0] * (max(group_of, default=-1) + 1)
+            for i, g in enumerate(group_of):
+                group_weights[g] += weights[i]
+            if len(group_weights) >= min(self.k, len(nodes)) and max(group_weights, default=0) <= max_weight:
+                break
+
+        group_edges: Dict[int, Dict[int, float]] = {g: {} for g in range(len(group_weights))}
+        for (i, j), (cost, _) in edges.items():
+            a, b = group_of[i], group_of[j]
+            if a != b:
+                group_edges[a][b] = group_edges[a].get(b, 0) + cost
+                group_edges[b][a] = group_edges[b].get(a, 0) + cost
+
+        # coarsen the graph by contracting the heaviest edges, so that busy paths are kept together
+        levels = [(group_weights, group_edges)]
+        maps = []
+        while len(levels[-1][0]) > 2 * self.k:
+            coarse_of, coarse = self._coarsen(*levels[-1], max_weight / 2)
+            if len(coarse[0]) > 0.9 * len(levels[-1][0]):
+                break
+            maps.append(coarse_of)
+            levels.append(coarse)
+
+        assign = self._grow(*levels[-1], max_weight)
+        self._refine(assign, *levels[-1], max_weight)
+        for coarse_of, level in zip(reversed(maps), reversed(levels[:-1])):
+            assign = [assign[c] for c in coarse_of]
+            self._refine(assign, *level, max_weight)
+
+        parts = [[] for _ in range(self.k)]
+        for i, node in enumerate(nodes):
+            parts[assign[group_of[i]]].append(node)
+
+        self.cut_channels = [channel for (i, j), channel in channels
+                             if assign[group_of[i]] != assign[group_of[j]]]
+        self.cut_cost = sum(cost for (i, j), (cost, _) in edges.items()
+                            if assign[group_of[i]] != assign[group_of[j]])
+        self.lookahead = min((channel.delay_model.lower_bound() for channel in self.cut_channels),
+                             default=math.inf)
+        return parts
+
+    def _channels(self, network: QuantumNetwork, index: Dict[int, int]) -> list:
+        channels = []
+        seen = set()
+        for node in network.nodes:
+            for channel in node.qchannels + node.cchannels:
+                if id(channel) in seen:
+                    continue
+                seen.add(id(channel))
+                ends = [index[id(n)] for n in channel.node_list if id(n) in index]
+                if len(ends) == 2 and ends[0] != ends[1]:
+                    channels.append(((min(ends), max(ends)), channel))
+        return channels
+
+    def _path(self, network: QuantumNetwork, index: Dict[int, int],
+              edges: Dict[Tuple[int, int], List[float]], request: Request) -> List[int]:
+        if id(request.src) not in index or id(request.dest) not in index:
+            return []
+        route = network.query_route(request.src, request.dest)
+        if len(route) > 0:
+            return [index[id(n)] for n in route[0][2] if id(n) in index]
+
+        # the path with the fewest hops
+        neighbors: Dict[int, List[int]] = {}
+        for i, j in edges:
+            neighbors.setdefault(i, []).append(j)
+            neighbors.setdefault(j, []).append(i)
+        src, dest = index[id(request.src)], index[id(request.dest)]
+        prev = {src: None}
+        queue = deque([src])
+        while len(queue) > 0 and dest not in prev:
+            i = queue.popleft()
+            for j in neighbors.get(i, []):
+                if j not in prev:
+                    prev[j] = i
+                    queue.append(j)
+        if dest not in prev:
+            return []
+        path = [dest]
+        while prev[path[-1]] is not None:
+            path.append(prev[path[-1]])
+        return path[::-1]
+
+    def _contract(self, n: int, edges: Dict[Tuple[int, int], List[float]], threshold: float) -> List[int]:
+        parent = list(range(n))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for (i, j), (_, delay) in edges.items():
+            if delay < threshold:
+                parent[find(i)] = find(j)
+        roots = {}
+        return [roots.setdefault(find(i), len(roots)) for i in range(n)]
+
+    def _coarsen(self, weights: List[float], edges: Dict[int, Dict[int, float]],
+                 max_weight: float) -> Tuple[List[int], Tuple[List[float], Dict[int, Dict[int, float]]]]:
+        # heavy edge matching
+        coarse_of = [-1] * len(weights)
+        coarse_weights = []
+        for g in range(len(weights)):
+            if coarse_of[g] != -1:
+                continue
+            match = None
+            for h, cost in edges[g].items():
+                if coarse_of[h] == -1 and h != g and weights[g] + weights[h] <= max_weight and \
+                   (match is None or (cost, -h) > (edges[g][match], -match)):
+                    match = h
+            coarse_of[g] = len(coarse_weights)
+            coarse_weights.append(weights[g])
+            if match is not None:
+                coarse_of[match] = coarse_of[g]
+                coarse_weights[-1] += weights[match]
+
+        coarse_edges: Dict[int, Dict[int, float]] = {c: {} for c in range(len(coarse_weights))}
+        for g, neighbors in edges.items():
+            a = coarse_of[g]
+            for h, cost in neighbors.items():
+                b = coarse_of[h]
+                if a != b:
+                    coarse_edges[a][b] = coarse_edges[a].get(b, 0) + cost
+        return coarse_of, (coarse_weights, coarse_edges)
+
+    def _grow(self, weights: List[float], edges: Dict[int, Dict[int, float]], max_weight: float) -> List[int]:
+        assign = [self.k - 1] * len(weights)
+        unassigned = set(range(len(weights)))
+        remaining = sum(weights)
+        for p in range(self.k - 1):
+            target = remaining / (self.k - p)
+            limit = min(max_weight, target * (1 + self.imbalance))
+            weight = 0
+            conn: Dict[int, float] = {}
+            while weight < target and len(unassigned) > 0:
+                fits = [g for g in unassigned if weight + weights[g] <= limit]
+                if len(fits) == 0:
+                    break
+                frontier = [g for g in fits if g in conn]
+                if len(frontier) > 0:
+                    # the group that adds the least cost to the cut
+                    g = max(frontier, key=lambda g: (2 * conn[g] - sum(edges[g].values()), -g))
+                else:
+                    # start from the group with the fewest unassigned neighbors
+                    g = min(fits, key=lambda g: (sum(1 for h in edges[g] if h in unassigned), g))
+                assign[g] = p
+                unassigned.remove(g)
+                conn.pop(g, None)
+                weight += weights[g]
+                for h, cost in edges[g].items():
+                    if h in unassigned:
+                        conn[h] = conn.get(h, 0) + cost
+            remaining -= weight
+        return assign
+
+    def _refine(self, assign: List[int], weights: List[float], edges: Dict[int, Dict[int, float]],
+                max_weight: float) -> None:
+        part_weights = [0.0] * self.k
+        part_sizes = [0] * self.k
+        for g, p in enumerate(assign):
+            part_weights[p] += weights[g]
+            part_sizes[p] += 1
+
+        for _ in range(self.passes):
+            moved = False
+            for g in range(len(assign)):
+                a = assign[g]
+                if part_sizes[a] == 1:
+                    continue
+                conn: Dict[int, float] = {}
+                for h, cost in edges[g].items():
+                    conn[assign[h]] = conn.get(assign[h], 0) + cost
+                best, best_key = None, None
+                for p in range(self.k):
+                    if p == a or part_weights[p] + weights[g] > max_weight:
+                        continue
+                    gain = conn.get(p, 0) - conn.get(a, 0)
+                    balance = part_weights[a] - part_weights[p] - weights[g]
+                    # move to reduce the cut, or to balance the load without increasing the cut
+                    if gain > 0 or (gain == 0 and p in conn and balance > 0) or part_weights[a] > max_weight:
+                        key = (gain, balance)
+                        if best_key is None or key > best_key:
+                            best, best_key = p, key
+                if best is not None:
+                    assign[g] = best
+                    part_weights[a] -= weights[g]
+                    part_weights[best] += weights[g]
+                    part_sizes[a] -= 1
+                    part_sizes[best] += 1
+                    moved = True
+            if not moved:
+                break
@@ -14,6 +14,7 @@
 #
 #    You should have received a copy of the GNU General Public License
 #    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+from typing import Optional
 
 from qns.entity.cchannel.cchannel import ClassicChannel, RecvClassicPacket, ClassicPacket
 from qns.entity.node.app import Application
@@ -21,22 +22,22 @@ from qns.entity.qchannel.qchannel import QuantumChannel, RecvQubitPacket
 from qns.entity.node.node import QNode
 from qns.models.qubit.const import BASIS_X, BASIS_Z, \
     QUBIT_STATE_0, QUBIT_STATE_1, QUBIT_STATE_P, QUBIT_STATE_N
-from qns.simulator.event import Event, func_to_event
+from qns.simulator.event import Event, CallbackEvent
 from qns.simulator.simulator import Simulator
 from qns.models.qubit import Qubit
 
 import numpy as np
-import random
 import hashlib
 
-from qns.utils.rnd import get_rand, get_choice
+from qns.utils.rnd import RandomStream, get_rand
 
 
 class QubitWithError(Qubit):
     def transfer_error_model(self, length: float, decoherence_rate: float = 0, **kwargs):
         lkm = length / 1000
         standand_lkm = 50.0
-        theta = get_rand() * lkm / standand_lkm * np.pi / 4
+        rng = kwargs.get("rng")
+        theta = (get_rand() if rng is None else rng.random()) * lkm / standand_lkm * np.pi / 4
         operation = np.array([[np.cos(theta), - np.sin(theta)], [np.sin(theta), np.cos(theta)]], dtype=np.complex128)
         self.state.operate(operator=operation)
 
@@ -109,7 +110,7 @@ class BB84SendApp(Application):
         time_list.append(simulator.ts)
 
         t = simulator.ts
-        event = func_to_event(t, self.send_qubit, by=self)
+        event = CallbackEvent(t, self.send_qubit, by=self)
         self._simulator.add_event(event)
         # while t <= simulator.te:
         #     time_list.append(t)
@@ -149,8 +150,8 @@ class BB84SendApp(Application):
     def send_qubit(self):
 
         # randomly generate a qubit
-        state = get_choice([QUBIT_STATE_0, QUBIT_STATE_1,
-                            QUBIT_STATE_P, QUBIT_STATE_N])
+        state = self.rng.choice([QUBIT_STATE_0, QUBIT_STATE_1,
+                                 QUBIT_STATE_P, QUBIT_STATE_N])
         qubit = QubitWithError(state=state)
         basis = BASIS_Z if (state == QUBIT_STATE_0).all() or (
             state == QUBIT_STATE_1).all() else BASIS_X
@@ -169,9 +170,8 @@ class BB84SendApp(Application):
         #  basis: {basis_msg} , ret: {ret}")
         self.qchannel.send(qubit=qubit, next_hop=self.dest)
 
-        t = self._simulator.current_time + \
-            self._simulator.time(sec=1 / self.send_rate)
-        event = func_to_event(t, self.send_qubit, by=self)
+        t = self._simulator.current_time.add_slots(int(1 / self.send_rate * self._simulator.accuracy))
+        event = CallbackEvent(t, self.send_qubit, by=self)
         self._simulator.add_event(event)
 
     def recv_error_estimate_packet(self, event: RecvClassicPacket):
@@ -433,9 +433,9 @@ class BB84RecvApp(Application):
     def recv(self, event: RecvQubitPacket):
         qubit: Qubit = event.qubit
         # randomly choose X,Z basis
-        basis = get_choice([BASIS_Z, BASIS_X])
+        basis = self.rng.choice([BASIS_Z, BASIS_X])
         basis_msg = "Z" if (basis == BASIS_Z).all() else "X"
-        ret = qubit.measureZ() if (basis == BASIS_Z).all() else qubit.measureX()
+        ret = qubit.measureZ(rng=self.rng) if (basis == BASIS_Z).all() else qubit.measureX(rng=self.rng)
         self.qubit_list[qubit.id] = qubit
         self.basis_list[qubit.id] = basis
         self.measure_list[qubit.id] = ret
@@ -467,7 +467,7 @@ class BB84RecvApp(Application):
         # remove uesd raw key and update cascade_key && bit_for_estimate
         for i in keys:
             item_temp = self.succ_key_pool.pop(i)
-            if random.uniform(0, 1) < self.proportion_for_estimating_error:
+            if self.rng.random() < self.proportion_for_estimating_error:
                 bit_for_estimate[i] = item_temp
             else:
                 self.post_processing_key[i] = item_temp
@@ -591,7 +591,7 @@ class BB84RecvApp(Application):
                 self.cur_cascade_key_block_size = int(self.cur_cascade_key_block_size * self.cascade_beita)
                 # need shuffle
                 shuffle_index = [i for i in range(len(self.cascade_key))]
-                shuffle_index = cascade_key_shuffle(shuffle_index)
+                shuffle_index = cascade_key_shuffle(shuffle_index, rng=self.rng)
                 self.cascade_key = [self.cascade_key[i] for i in shuffle_index]
                 # divide into top blocks of size self.keysize
                 count_temp = 0
@@ -638,8 +638,8 @@ class BB84RecvApp(Application):
             # check error succeed,Bob's privacy amplification operation
             matrix_row = len(self.cascade_key)
             matrix_col = (1-self.security)*len(self.cascade_key)-self.bit_leak
-            first_row = [random.randint(0, 1) for _ in range(matrix_row)]
-            first_col = [random.randint(0, 1) for _ in range(int(matrix_col)-1)]
+            first_row = [self.rng.integers(0, 1) for _ in range(matrix_row)]
+            first_col = [self.rng.integers(0, 1) for _ in range(int(matrix_col)-1)]
             toeplitz_matrix = pa_generate_toeplitz_matrix(matrix_row, matrix_col, first_row, first_col)
             self.successful_key += list(pa_randomize_key(self.cascade_key, toeplitz_matrix))
             packet = ClassicPacket(msg={"packet_class": "privacy_amplification_ask",
@@ -689,14 +689,18 @@ def cascade_binary_divide(begin: int, end: int):
     return (begin, middle), (middle+1, end)
 
 
-def cascade_key_shuffle(index: list):
+def cascade_key_shuffle(index: list, rng: Optional[RandomStream] = None):
     """
         Shuffle the index.
 
         Args:
             index: the index list.
+            rng: the random stream of the application, default is the numpy global random state.
     """
-    np.random.shuffle(index)
+    if rng is None:
+        np.random.shuffle(index)
+    else:
+        rng.shuffle(index)
     return index
 
 
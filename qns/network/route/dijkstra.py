@@ -24,6 +24,13 @@ from qns.entity.cchannel.cchannel import ClassicChannel
 from qns.network.route.route import RouteImpl, NetworkRouteError
 
 
+def unit_metric(channel: Union[QuantumChannel, ClassicChannel]) -> float:
+    """
+    The const metric function m(l)=1
+    """
+    return 1
+
+
 class DijkstraRouteAlgorithm(RouteImpl):
     """
     This is the dijkstra route algorithm implement
@@ -42,7 +49,7 @@ class DijkstraRouteAlgorithm(RouteImpl):
         self.name = name
         self.route_table = {}
         if metric_func is None:
-            self.metric_func = lambda _: 1
+            self.metric_func = unit_metric
         else:
             self.metric_func = metric_func
 
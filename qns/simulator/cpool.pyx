@@ -0,0 +1,257 @@
+#    SimQN: a discrete-event simulator for the quantum networks
+#    Copyright (C) 2021-2022 Lutong Chen, Jian Li, Kaiping Xue
+#    University of Science and Technology of China, USTC.
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# cython: language_level=3, boundscheck=False, wraparound=False
+
+from libc.stdlib cimport malloc, realloc, free
+from qns.simulator.pool import EventPool
+
+
+cdef class EventHeap(object):
+    """
+    A binary minimum heap of events keyed by ``(time_slot, seq)``.
+    Keys are stored in C arrays, so that sifting only compares native integers.
+    """
+    cdef long long *keys
+    cdef long long *seqs
+    cdef list events
+    cdef Py_ssize_t size
+    cdef Py_ssize_t capacity
+    cdef long long seq
+
+    def __cinit__(self, Py_ssize_t capacity=1024):
+        self.size = 0
+        self.seq = 0
+        self.capacity = capacity if capacity > 0 else 1
+        self.keys = <long long *> malloc(self.capacity * sizeof(long long))
+        self.seqs = <long long *> malloc(self.capacity * sizeof(long long))
+        if self.keys == NULL or self.seqs == NULL:
+            raise MemoryError()
+        self.events = [None] * self.capacity
+
+    def __dealloc__(self):
+        free(self.keys)
+        free(self.seqs)
+
+    def __len__(self) -> int:
+        return self.size
+
+    cdef int _grow(self) except -1:
+        cdef Py_ssize_t capacity = self.capacity * 2
+        cdef long long *keys = <long long *> realloc(self.keys, capacity * sizeof(long long))
+        if keys == NULL:
+            raise MemoryError()
+        self.keys = keys
+        cdef long long *seqs = <long long *> realloc(self.seqs, capacity * sizeof(long long))
+        if seqs == NULL:
+            raise MemoryError()
+        self.seqs = seqs
+        self.events.extend([None] * self.capacity)
+        self.capacity = capacity
+        return 0
+
+    cpdef push(self, long long key, object event):
+        """
+        Insert an event with the time slot ``key``
+        """
+        cdef Py_ssize_t i, parent
+        if self.size == self.capacity:
+            self._grow()
+
+        i = self.size
+        self.size += 1
+        # the new entry has the largest seq, so only the time slot needs to be compared
+        while i > 0:
+            parent = (i - 1) >> 1
+            if key >= self.keys[parent]:
+                break
+            self.keys[i] = self.keys[parent]
+            self.seqs[i] = self.seqs[parent]
+            self.events[i] = self.events[parent]
+            i = parent
+        self.keys[i] = key
+        self.seqs[i] = self.seq
+        self.events[i] = event
+        self.seq += 1
+
+    cdef void _sift_down(self, Py_ssize_t i, long long key, long long seq, object event):
+        cdef Py_ssize_t child
+        cdef Py_ssize_t size = self.size
+        while True:
+            child = 2 * i + 1
+            if child >= size:
+                break
+            if child + 1 < size and (self.keys[child + 1] < self.keys[child] or
+                                     (self.keys[child + 1] == self.keys[child] and
+                                      self.seqs[child + 1] < self.seqs[child])):
+                child += 1
+            if self.keys[child] > key or (self.keys[child] == key and self.seqs[child] > seq):
+                break
+            self.keys[i] = self.keys[child]
+            self.seqs[i] = self.seqs[child]
+            self.events[i] = self.events[child]
+            i = child
+        self.keys[i] = key
+        self.seqs[i] = seq
+        self.events[i] = event
+
+    cpdef object pop(self):
+        """
+        Remove and return the earliest event, or ``None`` if the heap is empty
+        """
+        if self.size == 0:
+            return None
+        top = self.events[0]
+        self.size -= 1
+        last = self.events[self.size]
+        self.events[self.size] = None
+        if self.size > 0:
+            self._sift_down(0, self.keys[self.size], self.seqs[self.size], last)
+        return top
+
+    cpdef object peek(self):
+        """
+        Return the earliest event without removing it, or ``None`` if the heap is empty
+        """
+        if self.size == 0:
+            return None
+        return self.events[0]
+
+    def __reduce__(self):
+        cdef Py_ssize_t i
+        entries = [(self.keys[i], self.seqs[i], self.events[i]) for i in range(self.size)]
+        return (_rebuild_heap, (entries, self.seq))
+
+    cpdef Py_ssize_t remove_canceled(self):
+        """
+        Remove all canceled events and restore the heap
+
+        Returns:
+            the number of removed events
+        """
+        cdef Py_ssize_t i, j = 0
+        cdef Py_ssize_t size = self.size
+        for i in range(size):
+            event = self.events[i]
+            if event._is_canceled:
+                event._cancel_counted = False
+                event._pool = None
+                continue
+            self.keys[j] = self.keys[i]
+            self.seqs[j] = self.seqs[i]
+            self.events[j] = event
+            j += 1
+        for i in range(j, size):
+            self.events[i] = None
+        self.size = j
+
+        i = j // 2 - 1
+        while i >= 0:
+            self._sift_down(i, self.keys[i], self.seqs[i], self.events[i])
+            i -= 1
+        return size - j
+
+
+def _rebuild_heap(list entries, long long seq):
+    # the entries are already in the heap order
+    cdef EventHeap heap = EventHeap(len(entries) + 1)
+    cdef Py_ssize_t i
+    for i in range(len(entries)):
+        heap.keys[i] = entries[i][0]
+        heap.seqs[i] = entries[i][1]
+        heap.events[i] = entries[i][2]
+    heap.size = len(entries)
+    heap.seq = seq
+    return heap
+
+
+class CompiledEventPool(EventPool):
+    """
+    The compiled implement of the heap event pool.
+    It behaves the same as ``DefaultEventPool`` but keeps the time slot keys in C arrays.
+    """
+
+    def __init__(self, ts, te):
+        '''
+        Args:
+            ts: the start time
+            te: the end time
+        '''
+        super().__init__(ts, te)
+        self.event_list = EventHeap()
+
+    def __len__(self) -> int:
+        return len(self.event_list)
+
+    def add_event(self, event) -> bool:
+        '''
+        Insert an event into the pool
+
+        Args:
+            event (Event): The inserting event
+        Returns:
+            if the event is inserted successfully
+        '''
+        cdef long long key = event.t.time_slot
+        if key < self.tc.time_slot or key > self.te.time_slot:
+            return False
+
+        (<EventHeap> self.event_list).push(key, event)
+        event._pool = self
+        return True
+
+    def next_event(self):
+        '''
+        Get the next event to be executed
+
+        Returns:
+            The next event to be executed
+        '''
+        cdef EventHeap heap = self.event_list
+        event = heap.pop()
+        while event is not None:
+            event._pool = None
+            if not event._is_canceled:
+                self.tc = event.t
+                return event
+            self._drop_canceled(event)
+            event = heap.pop()
+        self.tc = self.te
+        return None
+
+    def peek_event(self):
+        '''
+        Get the next event to be executed without removing it from the pool
+
+        Returns:
+            The next event to be executed, or None if the pool is empty
+        '''
+        cdef EventHeap heap = self.event_list
+        event = heap.peek()
+        while event is not None and event._is_canceled:
+            heap.pop()
+            event._pool = None
+            self._drop_canceled(event)
+            event = heap.peek()
+        return event
+
+    def compact(self) -> None:
+        '''
+        Remove all canceled events from the pool
+        '''
+        (<EventHeap> self.event_list).remove_canceled()
+        self.canceled_count = 0
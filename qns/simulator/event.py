@@ -15,16 +15,35 @@
 #    You should have received a copy of the GNU General Public License
 #    along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from typing import Any, Optional
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple, Union
 
 from qns.simulator.ts import Time
 
 
+@lru_cache(maxsize=None)
+def _slot_names(cls: type) -> Tuple[str, ...]:
+    # the slots of an event class and its bases
+    names = []
+    for c in cls.__mro__:
+        slots = getattr(c, "__slots__", ())
+        names.extend([slots] if isinstance(slots, str) else slots)
+    return tuple(name for name in names if name not in ("__dict__", "__weakref__"))
+
+
 class Event(object):
     """
     Basic event class in simulator
     """
 
+    __slots__ = ("t", "name", "by", "_is_canceled", "_cancel_counted", "_pool", "_owned")
+
+    # whether the simulator may reuse this event after it is invoked, if event recycling is enabled.
+    # A recyclable event class must initialize all its slots in ``__init__``.
+    recyclable = False
+    # whether the simulator calls ``reschedule`` after the event is invoked, see ``PeriodicEvent``
+    periodic = False
+
     def __init__(self, t: Optional[Time] = None, name: Optional[str] = None, by: Optional[Any] = None):
         """
         Args:
@@ -36,6 +55,11 @@ class Event(object):
         self.name: Optional[str] = name
         self.by = by
         self._is_canceled: bool = False
+        # whether the pending event pool counts this event in ``canceled_count``
+        self._cancel_counted: bool = False
+        self._pool = None
+        # whether the simulator may reuse this event, see ``Simulator.new_event``
+        self._owned: bool = False
 
     def invoke(self) -> None:
         """
@@ -47,7 +71,30 @@ class Event(object):
         """
         Cancel this event
         """
+        if self._is_canceled:
+            return
         self._is_canceled = True
+        if self._pool is not None:
+            # notify the pending event pool
+            self._pool.cancel_event(self)
+
+    def keep(self) -> None:
+        """
+        Keep this event after it is invoked, i.e., the simulator does not reuse it even if event recycling
+        is enabled. It should be called by the code that holds an event created by ``Simulator.new_event``
+        after the event is invoked.
+        """
+        self._owned = False
+
+    def reset(self) -> None:
+        """
+        Drop the references of this event, e.g., to its payload, before it waits for being reused.
+        All slots are set to None, since ``__init__`` initializes them again.
+        """
+        for name in _slot_names(self.__class__):
+            setattr(self, name, None)
+        if hasattr(self, "__dict__"):
+            self.__dict__.clear()
 
     @property
     def is_canceled(self) -> bool:
@@ -81,7 +128,109 @@ class Event(object):
         return "Event()"
 
 
-def func_to_event(t: Time, fn, name: Optional[str] = None, by: Optional[Any] = None, *args, **kwargs):
+class CallbackEvent(Event):
+    """
+    The event that calls ``fn(*args, **kwargs)`` when it is invoked
+    """
+
+    __slots__ = ("fn", "args", "kwargs")
+
+    def __init__(self, t: Optional[Time] = None, fn: Optional[Callable] = None,
+                 args: Tuple = (), kwargs: Optional[Dict] = None,
+                 name: Optional[str] = None, by: Optional[Any] = None):
+        """
+        Args:
+            t (Time): the function will be called at `t`
+            fn (Callable): the function
+            args: the function's positional parameters
+            kwargs: the function's keyword parameters
+            name (str): the name of this event
+            by: the entity or application that causes this event
+        """
+        super().__init__(t=t, name=name, by=by)
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+
+    def invoke(self) -> None:
+        if self.kwargs:
+            self.fn(*self.args, **self.kwargs)
+        else:
+            self.fn(*self.args)
+
+
+class PeriodicEvent(Event):
+    """
+    The event that happens periodically from ``t`` until ``end``.
+
+    Only the next occurrence is kept in the event pool. When it is invoked, it calls ``trigger``.
+    After the monitors and the tracer have seen the current occurrence, the simulator calls ``reschedule``,
+    which moves ``t`` to the next occurrence and inserts the event again.
+    So the event pool does not grow with the simulation length.
+    Canceling the event stops all following occurrences.
+    """
+
+    __slots__ = ("simulator", "period", "end")
+
+    periodic = True
+
+    def __init__(self, simulator, t: Time, period: Union[Time, float], end: Optional[Time] = None,
+                 name: Optional[str] = None, by: Optional[Any] = None):
+        """
+        Args:
+            simulator (Simulator): the simulator that the event will be inserted into
+            t (Time): the time of the first occurrence
+            period (Union[Time, float]): the period, a ``Time`` or a float in second
+            end (Time): the time of the last possible occurrence. If it is None, the event repeats
+                until the end of the simulation.
+            name (str): the name of this event
+            by: the entity or application that causes this event
+        """
+        super().__init__(t=t, name=name, by=by)
+        self.simulator = simulator
+        self.end = end
+        self.set_period(period)
+
+    def set_period(self, period: Union[Time, float]) -> None:
+        """
+        Change the period. The next occurrence that is already scheduled is not moved,
+        and the new period is used from the one after it.
+
+        Args:
+            period (Union[Time, float]): the period, a ``Time`` or a float in second
+        """
+        if isinstance(period, Time):
+            slots = period.time_slot
+        else:
+            slots = int(period * self.simulator.accuracy)
+        if slots <= 0:
+            raise ValueError("period should be at least one time slot")
+        self.period = slots
+
+    def trigger(self) -> None:
+        """
+        The action on every occurrence, should be implemented
+        """
+        raise NotImplementedError
+
+    def invoke(self) -> None:
+        self.trigger()
+
+    def reschedule(self) -> None:
+        """
+        Move ``t`` to the next occurrence and insert the event into the simulator again,
+        unless it is canceled or the next occurrence is after ``end``
+        """
+        if self._is_canceled:
+            return
+        t = self.t.add_slots(self.period)
+        if self.end is not None and t.time_slot > self.end.time_slot:
+            return
+        self.t = t
+        self.simulator.add_event(self)
+
+
+def func_to_event(t: Time, fn, name: Optional[str] = None, by: Optional[Any] = None, *args, **kwargs) -> CallbackEvent:
     """
     Convert a function to an event, the function `fn` will be called at `t`.
     It is a simple method to wrap a function to an event.
@@ -93,12 +242,4 @@ def func_to_event(t: Time, fn, name: Optional[str] = None, by: Optional[Any] = N
         *args: the function's parameters
         **kwargs: the function's parameters
     """
-
-    class WrapperEvent(Event):
-        def __init__(self, t: Optional[Time] = t, name_event=name):
-            super().__init__(t=t, name=name_event, by=by)
-
-        def invoke(self) -> None:
-            fn(*args, **kwargs)
-
-    return WrapperEvent(t)
+    return CallbackEvent(t, fn, args, kwargs, name=name, by=by)
@@ -16,15 +16,23 @@
 #    along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import heapq
+from typing import List, Optional, Tuple
 from qns.simulator.ts import Time
 from qns.simulator.event import Event
 
 
-class DefaultEventPool(object):
+class EventPool(object):
     """
-    The default implement of the event pool
+    The base class of event pools.
+
+    Canceled events are removed lazily: they stay in the pool until they are popped.
+    The pool counts the pending canceled events and compacts itself once they take up more than
+    ``compact_threshold`` of all entries (and there are at least ``compact_min_size`` of them).
     """
 
+    compact_threshold = 0.5
+    compact_min_size = 1024
+
     def __init__(self, ts: Time, te: Time):
         '''
         Args:
@@ -34,7 +42,10 @@ class DefaultEventPool(object):
         self.ts = ts
         self.te = te
         self.tc = ts
-        self.event_list = []
+
+        self.canceled_count = 0
+        self.total_canceled = 0
+        self.compact_count = 0
 
     @property
     def current_time(self) -> Time:
@@ -43,6 +54,121 @@ class DefaultEventPool(object):
         '''
         return self.tc
 
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    @property
+    def live_count(self) -> int:
+        '''
+        The number of pending events that are not canceled
+        '''
+        return len(self) - self.canceled_count
+
+    def add_event(self, event: Event) -> bool:
+        '''
+        Insert an event into the pool
+
+        Args:
+            event (Event): The inserting event
+        Returns:
+            if the event is inserted successfully
+        '''
+        raise NotImplementedError
+
+    def next_event(self) -> Event:
+        '''
+        Get the next event to be executed
+
+        Returns:
+            The next event to be executed
+        '''
+        raise NotImplementedError
+
+    def peek_event(self) -> Optional[Event]:
+        '''
+        Get the next event to be executed without removing it from the pool
+
+        Returns:
+            The next event to be executed, or None if the pool is empty
+        '''
+        raise NotImplementedError
+
+    def next_slot_events(self) -> List[Event]:
+        '''
+        Get all events at the time slot of the next event, in the order they will be executed
+
+        Returns:
+            The events to be executed, or an empty list if the pool is empty
+        '''
+        event = self.next_event()
+        if event is None:
+            return []
+        events = [event]
+        slot = event.t.time_slot
+        event = self.peek_event()
+        while event is not None and event.t.time_slot == slot:
+            events.append(self.next_event())
+            event = self.peek_event()
+        return events
+
+    def compact(self) -> None:
+        '''
+        Remove all canceled events from the pool
+        '''
+        raise NotImplementedError
+
+    def cancel_event(self, event: Event) -> None:
+        '''
+        Notify the pool that a pending event is canceled. It is called by ``Event.cancel``.
+
+        Args:
+            event (Event): the canceled event
+        '''
+        event._cancel_counted = True
+        self.canceled_count += 1
+        self.total_canceled += 1
+        if self.canceled_count >= self.compact_min_size and \
+           self.canceled_count > self.compact_threshold * len(self):
+            self.compact()
+            self.compact_count += 1
+
+    @staticmethod
+    def _is_removed(event: Event) -> bool:
+        # whether ``compact`` removes the event
+        if event._is_canceled:
+            event._cancel_counted = False
+            event._pool = None
+            return True
+        return False
+
+    def _drop_canceled(self, event: Event) -> None:
+        # events that are canceled before they are inserted are not counted
+        if event._cancel_counted:
+            event._cancel_counted = False
+            self.canceled_count -= 1
+
+
+class DefaultEventPool(EventPool):
+    """
+    The default implement of the event pool
+
+    The heap stores ``(time_slot, seq, event)`` tuples, so that the events are ordered by native integers
+    and events at the same time slot are returned in the order they were inserted.
+    """
+
+    def __init__(self, ts: Time, te: Time):
+        '''
+        Args:
+            ts: the start time
+            te: the end time
+        '''
+        super().__init__(ts, te)
+        self.event_list: List[Tuple[int, int, Event]] = []
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self.event_list)
+
     def add_event(self, event: Event) -> bool:
         '''
         Insert an event into the pool
@@ -52,10 +178,13 @@ class DefaultEventPool(object):
         Returns:
             if the event is inserted successfully
         '''
-        if event.t < self.tc or event.t > self.te:
+        key = event.t.time_slot
+        if key < self.tc.time_slot or key > self.te.time_slot:
             return False
 
-        heapq.heappush(self.event_list, event)
+        heapq.heappush(self.event_list, (key, self._seq, event))
+        self._seq += 1
+        event._pool = self
         return True
 
     def next_event(self) -> Event:
@@ -65,10 +194,257 @@ class DefaultEventPool(object):
         Returns:
             The next event to be executed
         '''
-        try:
-            event: Event = heapq.heappop(self.event_list)
+        while len(self.event_list) > 0:
+            event: Event = heapq.heappop(self.event_list)[2]
+            event._pool = None
+            if event._is_canceled:
+                self._drop_canceled(event)
+                continue
             self.tc = event.t
-        except IndexError:
-            event = None
+            return event
+        self.tc = self.te
+        return None
+
+    def peek_event(self) -> Optional[Event]:
+        '''
+        Get the next event to be executed without removing it from the pool
+
+        Returns:
+            The next event to be executed, or None if the pool is empty
+        '''
+        while len(self.event_list) > 0:
+            event: Event = self.event_list[0][2]
+            if not event._is_canceled:
+                return event
+            heapq.heappop(self.event_list)
+            event._pool = None
+            self._drop_canceled(event)
+        return None
+
+    def next_slot_events(self) -> List[Event]:
+        '''
+        Get all events at the time slot of the next event, in the order they will be executed
+
+        Returns:
+            The events to be executed, or an empty list if the pool is empty
+        '''
+        event = self.next_event()
+        if event is None:
+            return []
+        events = [event]
+        slot = event.t.time_slot
+        event_list = self.event_list
+        while len(event_list) > 0 and event_list[0][0] == slot:
+            event = heapq.heappop(event_list)[2]
+            event._pool = None
+            if event._is_canceled:
+                self._drop_canceled(event)
+                continue
+            events.append(event)
+        return events
+
+    def compact(self) -> None:
+        '''
+        Remove all canceled events from the pool
+        '''
+        self.event_list = [entry for entry in self.event_list if not self._is_removed(entry[2])]
+        heapq.heapify(self.event_list)
+        self.canceled_count = 0
+
+
+class CalendarEventPool(EventPool):
+    """
+    An event pool implemented as a calendar queue (R. Brown, 1988).
+
+    Events are hashed by their time slot into an array of buckets (the "days" of a "year").
+    Each bucket is a small heap, so that inserting and getting the next event
+    cost O(1) amortized time when the bucket width matches the event density.
+    The number of buckets and the bucket width are adjusted as the pool grows or shrinks.
+    Events at the same time slot are returned in the order they were inserted.
+    """
+
+    min_buckets = 2
+
+    def __init__(self, ts: Time, te: Time):
+        '''
+        Args:
+            ts: the start time
+            te: the end time
+        '''
+        super().__init__(ts, te)
+        self._seq = 0
+        self._size = 0
+        self._last_key = ts.time_slot
+        self._width = 1
+        self._buckets: List[List[Tuple[int, int, Event]]] = []
+        self._resize(self.min_buckets, self._width)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add_event(self, event: Event) -> bool:
+        '''
+        Insert an event into the pool
+
+        Args:
+            event (Event): The inserting event
+        Returns:
+            if the event is inserted successfully
+        '''
+        key = event.t.time_slot
+        if key < self.tc.time_slot or key > self.te.time_slot:
+            return False
+
+        heapq.heappush(self._buckets[(key // self._width) % self._nbuckets], (key, self._seq, event))
+        self._seq += 1
+        self._size += 1
+        event._pool = self
+        if self._size > 2 * self._nbuckets:
+            self._resize(2 * self._nbuckets)
+        return True
+
+    def next_event(self) -> Event:
+        '''
+        Get the next event to be executed
+
+        Returns:
+            The next event to be executed
+        '''
+        entry = self._pop_live()
+        if entry is None:
             self.tc = self.te
-        return event
+            return None
+        self.tc = entry[2].t
+        return entry[2]
+
+    def peek_event(self) -> Optional[Event]:
+        '''
+        Get the next event to be executed without removing it from the pool
+
+        Returns:
+            The next event to be executed, or None if the pool is empty
+        '''
+        last_key = self._last_key
+        entry = self._pop_live()
+        if entry is None:
+            return None
+        # put it back with its original order
+        heapq.heappush(self._buckets[(entry[0] // self._width) % self._nbuckets], entry)
+        self._size += 1
+        entry[2]._pool = self
+        # move the cursor back, as events before the peeked one may still be inserted
+        self._last_key = last_key
+        self._last_bucket = (last_key // self._width) % self._nbuckets
+        self._bucket_top = (last_key // self._width + 1) * self._width
+        return entry[2]
+
+    def _pop_live(self) -> Optional[Tuple[int, int, Event]]:
+        entry = self._pop()
+        while entry is not None and entry[2]._is_canceled:
+            self._drop_canceled(entry[2])
+            entry = self._pop()
+        return entry
+
+    def compact(self) -> None:
+        '''
+        Remove all canceled events from the pool
+        '''
+        size = 0
+        for idx, bucket in enumerate(self._buckets):
+            bucket = [entry for entry in bucket if not self._is_removed(entry[2])]
+            heapq.heapify(bucket)
+            self._buckets[idx] = bucket
+            size += len(bucket)
+        self._size = size
+        self.canceled_count = 0
+
+        nbuckets = self._nbuckets
+        while nbuckets > self.min_buckets and self._size < nbuckets // 2:
+            nbuckets //= 2
+        if nbuckets != self._nbuckets:
+            self._resize(nbuckets)
+
+    def _pop(self) -> Optional[Tuple[int, int, Event]]:
+        if self._size == 0:
+            return None
+
+        buckets = self._buckets
+        nbuckets = self._nbuckets
+        idx = self._last_bucket
+        top = self._bucket_top
+        for _ in range(nbuckets):
+            bucket = buckets[idx]
+            if len(bucket) > 0 and bucket[0][0] < top:
+                self._last_bucket = idx
+                self._bucket_top = top
+                return self._take(bucket)
+            idx += 1
+            top += self._width
+            if idx == nbuckets:
+                idx = 0
+
+        # no event in this year, search the earliest event directly
+        idx = min((i for i in range(nbuckets) if len(buckets[i]) > 0), key=lambda i: buckets[i][0][:2])
+        bucket = buckets[idx]
+        self._last_bucket = idx
+        self._bucket_top = (bucket[0][0] // self._width + 1) * self._width
+        return self._take(bucket)
+
+    def _take(self, bucket: List[Tuple[int, int, Event]]) -> Tuple[int, int, Event]:
+        entry = heapq.heappop(bucket)
+        entry[2]._pool = None
+        self._last_key = entry[0]
+        self._size -= 1
+        if self._nbuckets > self.min_buckets and self._size < self._nbuckets // 2:
+            self._resize(self._nbuckets // 2)
+        return entry
+
+    def _new_width(self) -> int:
+        # sample the events at the head of the queue and use 3 times of their average separation
+        entries = heapq.nsmallest(25, (e[0] for bucket in self._buckets for e in bucket))
+        if len(entries) < 2:
+            return self._width
+        gaps = [b - a for a, b in zip(entries, entries[1:])]
+        avg = sum(gaps) / len(gaps)
+        # ignore a few large separations that makes the width too large
+        kept = [g for g in gaps if g <= 2 * avg]
+        if len(kept) > 0:
+            avg = sum(kept) / len(kept)
+        return max(1, int(3 * avg))
+
+    def _resize(self, nbuckets: int, width: Optional[int] = None) -> None:
+        if width is None:
+            width = self._new_width()
+        old_buckets = self._buckets
+
+        self._nbuckets = nbuckets
+        self._width = width
+        self._buckets = [[] for _ in range(nbuckets)]
+        self._last_bucket = (self._last_key // width) % nbuckets
+        self._bucket_top = (self._last_key // width + 1) * width
+
+        for bucket in old_buckets:
+            for entry in bucket:
+                self._buckets[(entry[0] // width) % nbuckets].append(entry)
+        for bucket in self._buckets:
+            heapq.heapify(bucket)
+
+
+try:
+    from qns.simulator.cpool import CompiledEventPool
+except ImportError:
+    # the compiled extension is not built, use the pure python implement
+    CompiledEventPool = None
+
+event_pools = {
+    "default": DefaultEventPool if CompiledEventPool is None else CompiledEventPool,
+    "heap": DefaultEventPool,
+    "calendar": CalendarEventPool,
+}
+"""
+The registered event pool implements that can be selected by name in ``Simulator``.
+The "default" pool is the compiled heap if ``qns.simulator.cpool`` is built, otherwise the pure python heap.
+"""
+
+if CompiledEventPool is not None:
+    event_pools["compiled"] = CompiledEventPool
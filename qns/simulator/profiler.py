@@ -0,0 +1,209 @@
+#    SimQN: a discrete-event simulator for the quantum networks
+#    Copyright (C) 2021-2022 Lutong Chen, Jian Li, Kaiping Xue
+#    University of Science and Technology of China, USTC.
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+def handler_name(handler: Callable) -> str:
+    """
+    The profiling name of a handler, e.g., ``"SendApp.send"`` for a bound method
+    """
+    owner = getattr(handler, "__self__", None)
+    if owner is not None:
+        return f"{owner.__class__.__name__}.{handler.__name__}"
+    return getattr(handler, "__qualname__", repr(handler))
+
+
+class ProfiledCall(object):
+    """
+    A picklable wrapper that measures every call of ``func`` as the frame ``name``
+    """
+
+    def __init__(self, profiler: "Profiler", name: str, func: Callable):
+        self.profiler = profiler
+        self.name = name
+        self.func = func
+
+    def __call__(self, *args):
+        return self.profiler.call(self.name, self.func, *args)
+
+
+class Profiler(object):
+    """
+    Profiler records the call count and the wall time of the invoked events, the application handlers
+    and the monitors during ``Simulator.run``. The time of an event class includes the entity ``handle``
+    and the handlers that it triggers.
+    The records can be printed by ``table`` and exported for flame graphs by ``export_folded``.
+    """
+
+    root = "Simulator.run"
+
+    def __init__(self):
+        # the call stack -> [calls, total time]
+        self.frames: Dict[Tuple[str, ...], List[float]] = {}
+        # the event class name -> the number of scheduled events
+        self.scheduled: Dict[str, int] = {}
+        # the total time of the running loop
+        self.run_time = 0.0
+        self._stack: List[str] = []
+
+    def reset(self) -> None:
+        """
+        Clear all records
+        """
+        self.frames.clear()
+        self.scheduled.clear()
+        self.run_time = 0.0
+
+    def schedule(self, event) -> None:
+        """
+        Count a scheduled event
+
+        Args:
+            event (Event): the event added to the simulator
+        """
+        name = event.__class__.__name__
+        self.scheduled[name] = self.scheduled.get(name, 0) + 1
+
+    def call(self, name: str, func: Callable, *args, count: int = 1) -> Any:
+        """
+        Call ``func(*args)`` and record it as the frame ``name`` under the current frames
+
+        Args:
+            name (str): the frame name, e.g., the event class or the handler
+            func (Callable): the function
+            count (int): the number of calls to record, e.g., the size of a batch
+        Returns:
+            the return value of ``func``
+        """
+        stack = self._stack
+        stack.append(name)
+        start = perf_counter()
+        try:
+            return func(*args)
+        finally:
+            elapsed = perf_counter() - start
+            key = tuple(stack)
+            stack.pop()
+            record = self.frames.get(key)
+            if record is None:
+                self.frames[key] = [count, elapsed]
+            else:
+                record[0] += count
+                record[1] += elapsed
+
+    def invoke(self, name: str, func: Callable, args: tuple, monitors: Optional[list], events: Sequence) -> None:
+        """
+        Invoke the events of a class, i.e., ``func(*args)``, and the monitors that watch them, as the frame ``name``
+
+        Args:
+            name (str): the event class name
+            func (Callable): the ``invoke`` of an event or the batch handler
+            args (tuple): the parameters of ``func``
+            monitors (Optional[list]): the monitors that watch the events
+            events (Sequence): the invoked events
+        """
+        self.call(name, self._invoke, func, args, monitors, events, count=len(events))
+
+    def _invoke(self, func: Callable, args: tuple, monitors: Optional[list], events: Sequence) -> None:
+        func(*args)
+        if monitors is not None:
+            for event in events:
+                for m in monitors:
+                    self.call(f"{m.__class__.__name__}.handle", m.handle, event)
+
+    def wrap(self, func: Callable, name: str = None) -> ProfiledCall:
+        """
+        Wrap a handler so that its calls are recorded
+
+        Args:
+            func (Callable): the handler
+            name (str): the frame name, default is the class and the method name
+        """
+        return ProfiledCall(self, handler_name(func) if name is None else name, func)
+
+    def stats(self) -> List[Tuple[str, str, int, float, int]]:
+        """
+        Summarize the records
+
+        Returns:
+            a list of ``(kind, name, calls, total time, scheduled)``, where kind is "event" or "handler",
+            sorted by the total time. The time of a handler is summed over all events that trigger it.
+        """
+        events: Dict[str, List[float]] = {}
+        handlers: Dict[str, List[float]] = {}
+        for stack, (count, total) in self.frames.items():
+            if len(stack) == 1:
+                record = events.setdefault(stack[0], [0, 0.0])
+            elif stack[-1] in stack[:-1]:
+                # recursive calls are already included in the outer call
+                continue
+            else:
+                record = handlers.setdefault(stack[-1], [0, 0.0])
+            record[0] += count
+            record[1] += total
+        result = [("event", name, count, total, self.scheduled.get(name, 0))
+                  for name, (count, total) in events.items()]
+        result += [("handler", name, count, total, 0) for name, (count, total) in handlers.items()]
+        result.sort(key=lambda r: -r[3])
+        return result
+
+    def table(self) -> str:
+        """
+        Format the records as a table of the calls, the total and the mean time of every event class and handler
+
+        Returns:
+            the table
+        """
+        lines = [f"{'kind':<8} {'name':<40} {'calls':>10} {'total(s)':>10} {'mean(us)':>10} {'scheduled':>10}"]
+        for kind, name, count, total, scheduled in self.stats():
+            mean = total / count * 1e6 if count > 0 else 0
+            lines.append(f"{kind:<8} {name:<40} {count:>10} {total:>10.4f} {mean:>10.2f} "
+                         f"{scheduled if kind == 'event' else '':>10}")
+        events_time = sum(total for stack, (_, total) in self.frames.items() if len(stack) == 1)
+        lines.append(f"{'loop':<8} {'event pool and dispatch':<40} {'':>10} "
+                     f"{max(self.run_time - events_time, 0):>10.4f}")
+        return "\n".join(lines)
+
+    def folded(self) -> List[str]:
+        """
+        The records in the folded stack format, i.e., a line of ``"frame;frame;frame microseconds"``
+        for every call stack with its self time, which is accepted by ``flamegraph.pl`` and speedscope.
+
+        Returns:
+            the lines
+        """
+        self_time = {stack: total for stack, (_, total) in self.frames.items()}
+        for stack, (_, total) in self.frames.items():
+            if len(stack) > 1 and stack[:-1] in self_time:
+                self_time[stack[:-1]] -= total
+        children_time = sum(total for stack, (_, total) in self.frames.items() if len(stack) == 1)
+        lines = [f"{self.root} {max(int((self.run_time - children_time) * 1e6), 0)}"]
+        for stack, t in self_time.items():
+            lines.append(f"{';'.join((self.root,) + stack)} {max(int(t * 1e6), 0)}")
+        return lines
+
+    def export_folded(self, path: str) -> None:
+        """
+        Write the records in the folded stack format for flame graphs, e.g., ``flamegraph.pl out.folded > out.svg``
+
+        Args:
+            path (str): the file path
+        """
+        with open(path, "w") as f:
+            f.write("\n".join(self.folded()) + "\n")
@@ -15,16 +15,26 @@
 #    You should have received a copy of the GNU General Public License
 #    along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import gzip
+import pickle
+import sys
 import time
-from typing import Optional
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Union
 from qns.simulator.ts import Time, default_accuracy
 from qns.simulator.event import Event
-from qns.simulator.pool import DefaultEventPool
+from qns.simulator.pool import event_pools
+from qns.simulator.profiler import Profiler
+from qns.simulator.trace import TraceRecorder
 import qns.utils.log as log
+import qns.utils.rnd as rnd
 from . import ts
 
 default_start_second = 0.0
 default_end_second = 60.0
+checkpoint_version = 2
+# pickling a long chain of nodes and channels recurses deeply
+checkpoint_recursion_limit = 50000
 
 
 class Simulator(object):
@@ -32,27 +42,85 @@ class Simulator(object):
     The discrete-event driven simulator core
     """
 
+    max_free_events = 1024
+
     def __init__(self, start_second: float = default_start_second,
                  end_second: float = default_end_second,
-                 accuracy: int = default_accuracy):
+                 accuracy: int = default_accuracy, event_pool: Union[str, type] = "default",
+                 recycle_events: bool = False, profile: bool = False, seed: Optional[int] = None):
         """
         Args:
             start_second (float): the start second of the simulation
             end_second (float): the end second of the simulation
             accuracy (int): the number of time slots per second
+            event_pool (Union[str, type]): the event pool implement, either a name in
+                ``qns.simulator.pool.event_pools`` (e.g., "default" or "calendar") or a subclass of ``EventPool``
+            recycle_events (bool): reuse the recyclable events (e.g., ``RecvQubitPacket``) that are created by
+                ``new_event`` after they are invoked, unless they are watched by monitors or kept by ``Event.keep``.
+            profile (bool): record the calls and the time of every event class and handler in ``profiler``
+            seed (Optional[int]): the seed of the own random state of this simulator.
+                If it is None, the simulator shares the random state seeded by ``set_seed``.
         """
         self.accuracy = accuracy
-        ts.default_accuracy = accuracy
+        # for backward compatibility, the ``Time`` objects created outside the context of any simulator
+        # use the accuracy of the last created simulator
+        ts.set_default_accuracy(accuracy)
+        self.log_installed = False
+        self.random_context = None if seed is None else rnd.RandomContext(seed)
 
         self.ts: Time = self.time(sec=start_second)
         self.te: Time = self.time(sec=end_second)
         self.time_spend: float = 0
+        self._paused = False
 
-        self.event_pool = DefaultEventPool(self.ts, self.te)
+        if isinstance(event_pool, str):
+            if event_pool not in event_pools:
+                raise ValueError(f"unknown event pool {event_pool}")
+            event_pool = event_pools[event_pool]
+        self.event_pool = event_pool(self.ts, self.te)
         self.status = {}
         self.total_events = 0
 
         self.watch_event = {}
+        self.batch_handlers = {}
+        self.network = None
+
+        self.recycle_events = recycle_events
+        self.free_events: Dict[type, List[Event]] = {}
+        self.recycled_events = 0
+
+        self.profiler: Optional[Profiler] = Profiler() if profile else None
+        self.tracer: Optional[TraceRecorder] = None
+
+    def __getstate__(self) -> dict:
+        # the trace recorder holds an open file, so it is not saved in checkpoints
+        state = self.__dict__.copy()
+        state["tracer"] = None
+        return state
+
+    @contextmanager
+    def context(self) -> Iterator["Simulator"]:
+        '''
+        Activate the context of this simulator, i.e., the default accuracy of ``Time``, the logger binding
+        and the random state, in the current thread. ``run``, ``run_until`` and ``step`` run in this context,
+        so that many simulators can run in one process, e.g., in different threads.
+        It can also be used to build and install a network:
+
+        .. code-block:: python
+
+            with s.context():
+                net = QuantumNetwork(topo=...)
+                net.install(s)
+        '''
+        tokens = [(ts.context_accuracy, ts.context_accuracy.set(self.accuracy)),
+                  (log.context_simulator, log.context_simulator.set(self if self.log_installed else None))]
+        if self.random_context is not None:
+            tokens.append((rnd.context_random, rnd.context_random.set(self.random_context)))
+        try:
+            yield self
+        finally:
+            for var, token in reversed(tokens):
+                var.reset(token)
 
     @property
     def current_time(self) -> Time:
@@ -71,6 +139,20 @@ class Simulator(object):
         """
         return self.current_time
 
+    @property
+    def canceled_events(self) -> int:
+        """
+        The number of pending events that have been canceled during the simulation
+        """
+        return self.event_pool.total_canceled
+
+    @property
+    def compactions(self) -> int:
+        """
+        The number of times that the event pool removed canceled events
+        """
+        return self.event_pool.compact_count
+
     def time(self, time_slot: Optional[int] = None, sec: Optional[float] = None) -> Time:
         """
         Produce a ``Time`` using ``time_slot`` or ``sec``
@@ -85,6 +167,52 @@ class Simulator(object):
             return Time(time_slot=time_slot, accuracy=self.accuracy)
         return Time(sec=sec, accuracy=self.accuracy)
 
+    def time_from_slots(self, time_slot: int) -> Time:
+        """
+        Produce a ``Time`` from an integer ``time_slot``, without converting through seconds
+
+        Args:
+            time_slot (int): the time slot
+        Returns:
+            the produced ``Time`` object
+        """
+        return self.ts.add_slots(time_slot - self.ts.time_slot)
+
+    def new_event(self, event_type: type, *args, **kwargs) -> Event:
+        '''
+        Create an event of ``event_type`` with the arguments of its constructor.
+        If event recycling is enabled, an invoked event of the same type is reused and initialized again.
+
+        The simulator owns the recyclable events created here: after such an event is invoked,
+        it is reused unless a monitor watches its type, it is added to the event pool again,
+        or ``Event.keep`` has been called, e.g., by an application that holds the event.
+
+        Args:
+            event_type (type): the event class
+            *args: the positional parameters of the constructor
+            **kwargs: the keyword parameters of the constructor
+        Returns:
+            the event
+        '''
+        free = self.free_events.get(event_type)
+        if free:
+            event = free.pop()
+            event.__init__(*args, **kwargs)
+        else:
+            event = event_type(*args, **kwargs)
+        event._owned = self.recycle_events and event_type.recyclable
+        return event
+
+    def _recycle(self, event: Event) -> None:
+        free = self.free_events.get(event.__class__)
+        if free is None:
+            free = self.free_events[event.__class__] = []
+        if len(free) < self.max_free_events:
+            # the free events do not keep their payloads (e.g., qubits) alive
+            event.reset()
+            free.append(event)
+            self.recycled_events += 1
+
     def add_event(self, event: Event) -> None:
         '''
         Add an ``event`` into simulator event pool.
@@ -92,30 +220,282 @@ class Simulator(object):
         '''
         if self.event_pool.add_event(event):
             self.total_events += 1
+            if self.profiler is not None:
+                self.profiler.schedule(event)
+
+    def add_batch_handler(self, event_type: type, handler: Callable[[List[Event]], None]) -> None:
+        '''
+        Register a batch handler for ``event_type``. Afterwards, the simulator takes all events
+        of a time slot at once, and the events of ``event_type`` in this time slot are passed together
+        to ``handler`` instead of calling their ``invoke`` one by one, e.g., to generate qubits
+        for all nodes in a vectorized way. The batch is handled at the position of its first event,
+        and the events of other types are still invoked one by one in order.
+
+        With batch handlers, ``pause`` takes effect after the current time slot,
+        while ``step`` still invokes events one by one.
+
+        Args:
+            event_type (type): the class of the batched events (subclasses are not included)
+            handler (Callable[[List[Event]], None]): the function that handles a list of events
+        '''
+        self.batch_handlers[event_type] = handler
+
+    def remove_batch_handler(self, event_type: type) -> None:
+        '''
+        Remove the batch handler of ``event_type``, so that these events are invoked one by one again
+
+        Args:
+            event_type (type): the class of the batched events
+        '''
+        self.batch_handlers.pop(event_type, None)
+
+    def start_trace(self, path: str) -> TraceRecorder:
+        '''
+        Record every invoked event to a binary trace file, which can be read by ``qns.simulator.trace.TraceReader``
+
+        Args:
+            path (str): the trace file path
+        Returns:
+            the trace recorder, e.g., to add payloads by ``add_payload``
+        '''
+        self.stop_trace()
+        self.tracer = TraceRecorder(path)
+        return self.tracer
+
+    def stop_trace(self) -> None:
+        '''
+        Stop recording and close the trace file
+        '''
+        if self.tracer is not None:
+            self.tracer.close()
+            self.tracer = None
 
     def run(self) -> None:
         '''
-        Run the simulate
+        Run the simulate until the end time.
+        If the simulation has been advanced by ``run_until`` or ``step``, or it was paused,
+        it continues from the current time.
+        '''
+        with self.context():
+            log.debug("simulation started.")
+
+            self._run()
+            if self._paused:
+                log.debug("simulation paused.")
+                return
+
+            log.debug("simulation finished.")
+            log.debug("%s events canceled, %s compactions", self.canceled_events, self.compactions)
+
+            sim_time = self.te.sec - self.ts.sec
+            log.debug("runtime %s, %s events, sim_time %s, x%s", self.time_spend, self.total_events, sim_time,
+                      "INF" if self.time_spend == 0 else sim_time / self.time_spend)
+
+    def run_until(self, t: Union[Time, float]) -> None:
+        '''
+        Run the simulate until ``t``. Events at ``t`` are invoked,
+        and the current time is ``t`` afterwards unless the simulation is paused.
+        The simulation can be continued by ``run``, ``run_until`` or ``step``.
+
+        Args:
+            t (Union[Time, float]): a Time object or a float indicating time in second
+        '''
+        if not isinstance(t, Time):
+            t = self.time(sec=t)
+        if t.time_slot >= self.te.time_slot:
+            with self.context():
+                self._run()
+            return
+        with self.context():
+            self._run(until=t)
+        if not self._paused and t.time_slot > self.tc.time_slot:
+            self.event_pool.tc = t
+
+    def step(self, max_events: int = 1) -> int:
+        '''
+        Invoke at most ``max_events`` events and then stop.
+        The simulation can be continued by ``run``, ``run_until`` or ``step``.
+
+        Args:
+            max_events (int): the maximum number of invoked events
+        Returns:
+            the number of events that are taken from the event pool
+        '''
+        with self.context():
+            return self._run(max_events=max_events)
+
+    def pause(self) -> None:
+        '''
+        Pause the simulation after the current event.
+        It is usually called by an event or a handler, and the simulation can be resumed by ``run``.
         '''
-        log.debug("simulation started.")
+        self._paused = True
+
+    def checkpoint(self, path: str) -> None:
+        '''
+        Save the simulation into a gzip compressed pickle file, including the event pool,
+        the current time, the states of the random generators, the monitors and the installed network.
+        It can be called between ``run_until`` or ``step``, or after ``pause``.
+
+        All objects that are reachable from the pending events and the network,
+        e.g., applications and the functions of timers and ``CallbackEvent``, must be picklable.
+        Lambdas and local functions are not picklable, so use module level functions
+        or methods instead.
+
+        An active trace is flushed but not saved, i.e., this simulator keeps recording,
+        and the restored simulator does not record until ``start_trace`` is called.
+
+        Args:
+            path (str): the file path
+        '''
+        if self.tracer is not None:
+            self.tracer.flush()
+        with self.context():
+            state = {"version": checkpoint_version, "simulator": self, "rnd": rnd.get_state()}
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(limit, checkpoint_recursion_limit))
+        try:
+            with gzip.open(path, "wb", compresslevel=6) as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        finally:
+            sys.setrecursionlimit(limit)
+
+    @staticmethod
+    def restore(path: str) -> "Simulator":
+        '''
+        Load a simulation saved by ``checkpoint`` and restore the random generators.
+        The same file can be restored many times to fork independent simulations.
+        The network is available as ``network`` of the returned simulator.
+
+        Args:
+            path (str): the file path
+        Returns:
+            the restored simulator, which can be continued by ``run``, ``run_until`` or ``step``
+        '''
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(limit, checkpoint_recursion_limit))
+        try:
+            with gzip.open(path, "rb") as f:
+                state = pickle.load(f)
+        finally:
+            sys.setrecursionlimit(limit)
+        if state.get("version") != checkpoint_version:
+            raise ValueError(f"unsupported checkpoint version {state.get('version')}")
+        s: Simulator = state["simulator"]
+        with s.context():
+            rnd.set_state(state["rnd"])
+        return s
+
+    @property
+    def is_finished(self) -> bool:
+        '''
+        Whether all events in the event pool have been invoked
+        '''
+        return self.event_pool.peek_event() is None
+
+    def _run(self, until: Optional[Time] = None, max_events: Optional[int] = None) -> int:
+        if len(self.batch_handlers) > 0 and max_events is None:
+            return self._run_batch(until)
+        self._paused = False
+        pool = self.event_pool
+        recycle = self.recycle_events
+        profiler = self.profiler
+        tracer = self.tracer
+        until_slot = None if until is None else until.time_slot
+        count = 0
 
         trs = time.time()
-        event = self.event_pool.next_event()
-        while event is not None:
+        while not self._paused and (max_events is None or count < max_events):
+            if until_slot is not None:
+                event = pool.peek_event()
+                if event is None or event.t.time_slot > until_slot:
+                    break
+            event = pool.next_event()
+            if event is None:
+                break
             if not event.is_canceled:
-                event.invoke()
-                monitor_list = self.watch_event.get(event.__class__, [])
-                for m in monitor_list:
-                    m.handle(event)
-            event = self.event_pool.next_event()
-
-        tre = time.time()
-        self.time_spend = tre - trs
-        log.debug("simulation finished.")
-
-        if tre - trs == 0:
-            log.debug(f"runtime {tre - trs}, {self.total_events} events,\
-                sim_time {self.te.sec - self.ts.sec}, xINF")
-        else:
-            log.debug(f"runtime {tre - trs}, {self.total_events} events,\
-                sim_time {self.te.sec - self.ts.sec}, x{(self.te.sec - self.ts.sec)/(tre-trs)}")
+                slot = event.t.time_slot
+                monitor_list = self.watch_event.get(event.__class__)
+                if profiler is not None:
+                    profiler.invoke(event.__class__.__name__, event.invoke, (), monitor_list, (event,))
+                else:
+                    event.invoke()
+                    if monitor_list is not None:
+                        for m in monitor_list:
+                            m.handle(event)
+                if tracer is not None:
+                    tracer.record(event, slot)
+                if event.periodic:
+                    event.reschedule()
+                # recycle the owned event unless it is watched or pending again
+                if recycle and event._owned and monitor_list is None and event._pool is None:
+                    self._recycle(event)
+            count += 1
+        self.time_spend += time.time() - trs
+        if profiler is not None:
+            profiler.run_time += time.time() - trs
+        return count
+
+    def _run_batch(self, until: Optional[Time] = None) -> int:
+        self._paused = False
+        pool = self.event_pool
+        batch_handlers = self.batch_handlers
+        profiler = self.profiler
+        tracer = self.tracer
+        until_slot = None if until is None else until.time_slot
+        count = 0
+
+        trs = time.time()
+        while not self._paused:
+            if until_slot is not None:
+                event = pool.peek_event()
+                if event is None or event.t.time_slot > until_slot:
+                    break
+            events = pool.next_slot_events()
+            if len(events) == 0:
+                break
+            count += len(events)
+            slot = events[0].t.time_slot
+
+            batches = {}
+            for event in events:
+                if event.__class__ in batch_handlers:
+                    batches.setdefault(event.__class__, []).append(event)
+            for event in events:
+                handler = batch_handlers.get(event.__class__)
+                monitor_list = self.watch_event.get(event.__class__)
+                if handler is None:
+                    if event.is_canceled:
+                        continue
+                    if profiler is not None:
+                        profiler.invoke(event.__class__.__name__, event.invoke, (), monitor_list, (event,))
+                    else:
+                        event.invoke()
+                    handled = (event,)
+                else:
+                    batch = batches.pop(event.__class__, None)
+                    if batch is None:
+                        # handled together with the first event of its batch
+                        continue
+                    # events may be canceled by the previous events in this time slot
+                    handled = [e for e in batch if not e.is_canceled]
+                    if len(handled) == 0:
+                        continue
+                    if profiler is not None:
+                        profiler.invoke(event.__class__.__name__, handler, (handled,), monitor_list, handled)
+                    else:
+                        handler(handled)
+                if monitor_list is not None and profiler is None:
+                    for e in handled:
+                        for m in monitor_list:
+                            m.handle(e)
+                if tracer is not None:
+                    for e in handled:
+                        tracer.record(e, slot)
+                for e in handled:
+                    if e.periodic:
+                        e.reschedule()
+        self.time_spend += time.time() - trs
+        if profiler is not None:
+            profiler.run_time += time.time() - trs
+        return count
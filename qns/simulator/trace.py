@@ -0,0 +1,281 @@
+#    SimQN: a discrete-event simulator for the quantum networks
+#    Copyright (C) 2021-2022 Lutong Chen, Jian Li, Kaiping Xue
+#    University of Science and Technology of China, USTC.
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import json
+import mmap
+import os
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+import numpy as np
+
+from qns.simulator.event import Event
+
+trace_magic = b"QNSTRACE"
+trace_version = 1
+header_size = 16
+
+record_dtype = np.dtype([("time_slot", "<i8"), ("event", "<u2"), ("src", "<i4"),
+                         ("dest", "<i4"), ("payload", "<f8")])
+"""
+The binary record of a dispatched event. ``event`` is the index in the event class table, ``src`` and ``dest``
+are the indexes in the entity table, or -1 if the event has no source or destination.
+"""
+
+# the attributions that point to the destination of an event, in the order of priority
+dest_attributions = ("dest", "node", "memory", "operator")
+
+
+def meta_path(path: str) -> str:
+    """
+    The path of the metadata file of a trace, which saves the event class and entity tables
+    """
+    return f"{path}.json"
+
+
+def entity_name(obj: Any) -> str:
+    """
+    The name of a source or destination in the entity table, e.g., the entity name
+    or ``"n1.SendApp"`` for an application on node ``n1``
+    """
+    name = getattr(obj, "name", None)
+    if name is not None:
+        return str(name)
+    get_node = getattr(obj, "get_node", None)
+    if get_node is not None and get_node() is not None:
+        return f"{get_node().name}.{obj.__class__.__name__}"
+    return obj.__class__.__name__
+
+
+class TraceRecorder(object):
+    """
+    TraceRecorder records every dispatched event to an append-only memory mapped file.
+    The records are buffered and copied to the mapping in blocks, and the file grows by ``block_size`` records.
+    The event class and entity tables are saved to the metadata file when the trace is flushed or closed.
+    """
+
+    block_size = 65536
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): the trace file path
+        """
+        self.path = str(path)
+        self.count = 0
+        self.event_names: List[str] = []
+        self.entity_names: List[str] = []
+        self._event_ids: Dict[type, int] = {}
+        self._entity_ids: Dict[int, int] = {}
+        # keep the entities alive, so that their ids are not reused
+        self._entities: List[Any] = []
+        self._dest_attributions: Dict[type, Optional[str]] = {}
+        self._payloads: Dict[type, Callable[[Event], float]] = {}
+        self._buffer: List[tuple] = []
+
+        self._file = open(self.path, "w+b")
+        self._file.write(trace_magic + trace_version.to_bytes(4, "little")
+                         + record_dtype.itemsize.to_bytes(4, "little"))
+        self._capacity = 0
+        self._mmap = None
+        self._grow()
+
+    def __getstate__(self):
+        raise TypeError("a trace recorder can not be pickled")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def add_payload(self, event_type: type, func: Callable[[Event], float]) -> None:
+        """
+        Record a payload for the events of ``event_type``, e.g., the fidelity of the transmitted qubit
+
+        Args:
+            event_type (type): the event class (subclasses are not included)
+            func (Callable[[Event], float]): the function that returns the payload of an event
+        """
+        self._payloads[event_type] = func
+
+    def _entity_id(self, obj: Any) -> int:
+        if obj is None:
+            return -1
+        eid = self._entity_ids.get(id(obj))
+        if eid is None:
+            eid = self._entity_ids[id(obj)] = len(self.entity_names)
+            self.entity_names.append(entity_name(obj))
+            self._entities.append(obj)
+        return eid
+
+    def _new_event_type(self, event: Event) -> int:
+        cls = event.__class__
+        self._event_ids[cls] = len(self.event_names)
+        self.event_names.append(cls.__name__)
+        self._dest_attributions[cls] = next((attr for attr in dest_attributions if hasattr(event, attr)), None)
+        return self._event_ids[cls]
+
+    def record(self, event: Event, time_slot: Optional[int] = None) -> None:
+        """
+        Record a dispatched event
+
+        Args:
+            event (Event): the event
+            time_slot (Optional[int]): the time slot when the event is invoked, default is ``event.t``.
+                The simulator takes it before the invocation, which may change ``event.t``.
+        """
+        cls = event.__class__
+        event_id = self._event_ids.get(cls)
+        if event_id is None:
+            event_id = self._new_event_type(event)
+        attr = self._dest_attributions[cls]
+        dest = -1 if attr is None else self._entity_id(getattr(event, attr, None))
+        payload = self._payloads.get(cls)
+        if time_slot is None:
+            time_slot = event.t.time_slot
+        self._buffer.append((time_slot, event_id, self._entity_id(event.by), dest,
+                             0.0 if payload is None else payload(event)))
+        if len(self._buffer) >= self.block_size:
+            self._write_buffer()
+
+    def _grow(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+        self._capacity += self.block_size
+        self._file.truncate(header_size + self._capacity * record_dtype.itemsize)
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+
+    def _write_buffer(self) -> None:
+        if len(self._buffer) == 0:
+            return
+        records = np.array(self._buffer, dtype=record_dtype)
+        self._buffer = []
+        while self.count + len(records) > self._capacity:
+            self._grow()
+        start = header_size + self.count * record_dtype.itemsize
+        self._mmap[start:start + records.nbytes] = records.tobytes()
+        self.count += len(records)
+
+    def flush(self) -> None:
+        """
+        Write the buffered records and the metadata, so that the trace can be read
+        """
+        self._write_buffer()
+        self._mmap.flush()
+        with open(meta_path(self.path), "w") as f:
+            json.dump({"version": trace_version, "count": self.count,
+                       "events": self.event_names, "entities": self.entity_names}, f)
+
+    def close(self) -> None:
+        """
+        Flush the trace and truncate the file to the recorded events
+        """
+        if self._file.closed:
+            return
+        self.flush()
+        self._mmap.close()
+        self._file.truncate(header_size + self.count * record_dtype.itemsize)
+        self._file.close()
+        self._entities = []
+
+
+class TraceReader(object):
+    """
+    TraceReader reads a trace written by ``TraceRecorder`` as numpy arrays of ``record_dtype``
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): the trace file path
+        """
+        self.path = str(path)
+        with open(meta_path(self.path)) as f:
+            meta = json.load(f)
+        with open(self.path, "rb") as f:
+            header = f.read(header_size)
+        if header[:8] != trace_magic or int.from_bytes(header[8:12], "little") != trace_version:
+            raise ValueError(f"{self.path} is not a trace of version {trace_version}")
+        self.count: int = meta["count"]
+        self.event_names: List[str] = meta["events"]
+        self.entity_names: List[str] = meta["entities"]
+        if self.count == 0 or os.path.getsize(self.path) == header_size:
+            self.records = np.zeros(0, dtype=record_dtype)
+        else:
+            self.records = np.memmap(self.path, dtype=record_dtype, mode="r", offset=header_size, shape=(self.count,))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def chunks(self, size: int = 1000000) -> Iterator[np.ndarray]:
+        """
+        Stream the records in chunks
+
+        Args:
+            size (int): the number of records in a chunk
+        Returns:
+            an iterator of the record arrays
+        """
+        for start in range(0, self.count, size):
+            yield self.records[start:start + size]
+
+    def event_ids(self, event_type: Union[str, type, List[Union[str, type]]]) -> List[int]:
+        """
+        The ids of event classes in the trace
+
+        Args:
+            event_type: an event class, a class name, or a list of them
+        """
+        types = event_type if isinstance(event_type, (list, tuple)) else [event_type]
+        names = {t if isinstance(t, str) else t.__name__ for t in types}
+        return [i for i, name in enumerate(self.event_names) if name in names]
+
+    def entity_ids(self, entity: Union[str, Any, List[Union[str, Any]]]) -> List[int]:
+        """
+        The ids of entities in the trace, including the applications on the nodes
+
+        Args:
+            entity: an entity, an entity name, or a list of them
+        """
+        entities = entity if isinstance(entity, (list, tuple)) else [entity]
+        names = {e if isinstance(e, str) else entity_name(e) for e in entities}
+        return [i for i, name in enumerate(self.entity_names)
+                if name in names or name.split(".", 1)[0] in names]
+
+    def filter(self, event_type=None, node=None, src=None, dest=None) -> np.ndarray:
+        """
+        Select the records
+
+        Args:
+            event_type: the event classes or their names
+            node: the entities or their names that are either the source or the destination.
+                The applications on a node belong to the node.
+            src: the source entities or their names
+            dest: the destination entities or their names
+        Returns:
+            the selected records
+        """
+        mask = np.ones(self.count, dtype=bool)
+        if event_type is not None:
+            mask &= np.isin(self.records["event"], self.event_ids(event_type))
+        if node is not None:
+            ids = self.entity_ids(node)
+            mask &= np.isin(self.records["src"], ids) | np.isin(self.records["dest"], ids)
+        if src is not None:
+            mask &= np.isin(self.records["src"], self.entity_ids(src))
+        if dest is not None:
+            mask &= np.isin(self.records["dest"], self.entity_ids(dest))
+        return np.asarray(self.records[mask])
@@ -15,15 +15,33 @@
 #    You should have received a copy of the GNU General Public License
 #    along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from typing import Union
+from contextvars import ContextVar
+from typing import Optional, Union
 
 
 default_accuracy = 1000000  # {default_accuracy} time slots per second
 
+context_accuracy: ContextVar = ContextVar("qns_accuracy")
+"""
+The accuracy of the current simulator, which is only set in ``Simulator.context``
+"""
+
+
+def get_accuracy() -> int:
+    """
+    Get the accuracy of the current simulator, or the default accuracy if no simulator is running
+
+    Returns:
+        the time slots per second
+    """
+    return context_accuracy.get(default_accuracy)
+
 
 def set_default_accuracy(time_slots: int):
     """
-    set the default simulation accuracy
+    set the default simulation accuracy of the ``Time`` objects that are created outside the simulators.
+    Creating a ``Simulator`` also sets it to the simulator's accuracy for backward compatibility,
+    while inside ``Simulator.context`` the simulator's own accuracy is always used.
 
     Args:
         time_slots (int): the time slots per second.
@@ -33,16 +51,18 @@ def set_default_accuracy(time_slots: int):
 
 
 class Time(object):
-    def __init__(self, time_slot: int = 0, sec: float = 0.0, accuracy: int = default_accuracy):
+    __slots__ = ("accuracy", "time_slot")
+
+    def __init__(self, time_slot: int = 0, sec: float = 0.0, accuracy: Optional[int] = None):
         '''
         Time: the time slot used in the simulator
 
         Args:
             time_slot (int): the time slot
             sec (float): the timestamp in second
-            accuracy: time slots per second
+            accuracy: time slots per second, default is the accuracy of the current simulator
         '''
-        self.accuracy = default_accuracy
+        self.accuracy = context_accuracy.get(default_accuracy) if accuracy is None else accuracy
         if time_slot != 0:
             self.time_slot = time_slot
         else:
@@ -61,39 +81,52 @@ class Time(object):
     def __eq__(self, other: object) -> bool:
         if isinstance(other, Time):
             return self.time_slot == other.time_slot
-        other_time = Time(src=other)
+        other_time = Time(sec=other, accuracy=self.accuracy)
         return self.time_slot == other_time.time_slot
 
     def __lt__(self, other: object) -> bool:
         if isinstance(other, Time):
             return self.time_slot < other.time_slot
-        other_time = Time(src=other)
+        other_time = Time(sec=other, accuracy=self.accuracy)
         return self.time_slot < other_time.time_slot
 
     def __le__(self, other: object) -> bool:
         if isinstance(other, Time):
             return self.time_slot <= other.time_slot
-        other_time = Time(src=other)
+        other_time = Time(sec=other, accuracy=self.accuracy)
         return self.time_slot <= other_time.time_slot
 
     def __gt__(self, other: object) -> bool:
         if isinstance(other, Time):
             return self.time_slot > other.time_slot
-        other_time = Time(src=other)
+        other_time = Time(sec=other, accuracy=self.accuracy)
         return self.time_slot > other_time.time_slot
 
     def __ge__(self, other: object) -> bool:
         if isinstance(other, Time):
             return self.time_slot >= other.time_slot
-        other_time = Time(src=other)
+        other_time = Time(sec=other, accuracy=self.accuracy)
         return self.time_slot >= other_time.time_slot
 
     def __ne__(self, other: object) -> bool:
         if isinstance(other, Time):
             return self.time_slot != other.time_slot
-        other_time = Time(src=other)
+        other_time = Time(sec=other, accuracy=self.accuracy)
         return self.time_slot != other_time.time_slot
 
+    def add_slots(self, slots: int) -> "Time":
+        """
+        Get a new Time object that is ``slots`` time slots later than this one.
+        It is the fast path of ``__add__`` that avoids converting through seconds.
+
+        Args:
+            slots (int): the number of time slots
+        """
+        tn = Time.__new__(Time)
+        tn.accuracy = self.accuracy
+        tn.time_slot = self.time_slot + slots
+        return tn
+
     def __add__(self, ts: Union["Time", float]) -> "Time":
         """
         Add an offset to the Time object
@@ -101,11 +134,9 @@ class Time(object):
         Args:
             ts (Union["Time", float]): a Time object or a float indicating time in second
         """
-        tn = Time(time_slot=self.time_slot, accuracy=self.accuracy)
         if isinstance(ts, float):
-            ts = Time(sec=ts, accuracy=self.accuracy)
-        tn.time_slot += ts.time_slot
-        return tn
+            return self.add_slots(int(ts * self.accuracy))
+        return self.add_slots(ts.time_slot)
 
     def __sub__(self, ts: Union["Time", float]) -> "Time":
         """
@@ -114,11 +145,9 @@ class Time(object):
         Args:
             ts (Union["Time", float]): a Time object or a float indicating time in second
         """
-        tn = Time(time_slot=self.time_slot, accuracy=self.accuracy)
         if isinstance(ts, float):
-            ts = Time(sec=ts, accuracy=self.accuracy)
-        tn.time_slot = tn.time_slot - ts.time_slot
-        return tn
+            return self.add_slots(-int(ts * self.accuracy))
+        return self.add_slots(-ts.time_slot)
 
     def __repr__(self) -> str:
         return str(self.sec)
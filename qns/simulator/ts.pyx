@@ -15,26 +15,42 @@
 #    You should have received a copy of the GNU General Public License
 #    along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+from contextvars import ContextVar
 from typing import Union
 
 
 default_accuracy = 1000000  # {default_accuracy} time slots per second
 
+context_accuracy: ContextVar = ContextVar("qns_accuracy")
+"""
+The accuracy of the current simulator, which is set by the simulator while it is running
+"""
+
+
+def get_accuracy() -> int:
+    """
+    Get the accuracy of the current simulator, or the default accuracy if no simulator is running
+
+    Returns:
+        the time slots per second
+    """
+    return context_accuracy.get(default_accuracy)
+
 
 cdef class Time(object):
-    cdef public int accuracy
-    cdef public int time_slot
+    cdef public long long accuracy
+    cdef public long long time_slot
 
-    def __cinit__(self, int time_slot = 0, double sec = 0.0, int accuracy = default_accuracy):
+    def __cinit__(self, long long time_slot = 0, double sec = 0.0, accuracy = None):
         '''
         Time: the time slot used in the simulator
 
         Args:
             time_slot (int): the time slot
             sec (float): the timestamp in second
-            accuracy: time slots per second
+            accuracy: time slots per second, default is the accuracy of the current simulator
         '''
-        self.accuracy = default_accuracy
+        self.accuracy = context_accuracy.get(default_accuracy) if accuracy is None else accuracy
         if time_slot != 0:
             self.time_slot = time_slot
         elif sec != 0:
@@ -68,6 +84,19 @@ cdef class Time(object):
     def __ne__(self, other: object) -> bool:
         return not self == other
 
+    cpdef Time add_slots(self, long long slots):
+        """
+        Get a new Time object that is ``slots`` time slots later than this one.
+        It is the fast path of ``__add__`` that avoids converting through seconds.
+
+        Args:
+            slots (int): the number of time slots
+        """
+        cdef Time tn = Time.__new__(Time)
+        tn.accuracy = self.accuracy
+        tn.time_slot = self.time_slot + slots
+        return tn
+
     def __add__(self, ts: Union["Time", float]) -> "Time":
         """
         Add an offset to the Time object
@@ -75,11 +104,20 @@ cdef class Time(object):
         Args:
             ts (Union["Time", float]): a Time object or a float indicating time in second
         """
-        tn = Time(time_slot=self.time_slot, accuracy=self.accuracy)
         if isinstance(ts, float):
-            ts = Time(sec=ts, accuracy=self.accuracy)
-        tn.time_slot += ts.time_slot
-        return tn
+            return self.add_slots(int(ts * self.accuracy))
+        return self.add_slots(ts.time_slot)
+
+    def __sub__(self, ts: Union["Time", float]) -> "Time":
+        """
+        Minus an offset to the Time object
+
+        Args:
+            ts (Union["Time", float]): a Time object or a float indicating time in second
+        """
+        if isinstance(ts, float):
+            return self.add_slots(-int(ts * self.accuracy))
+        return self.add_slots(-ts.time_slot)
 
     def __repr__(self) -> str:
         return str(self.sec)
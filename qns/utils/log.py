@@ -17,6 +17,7 @@
 
 import logging
 import sys
+from contextvars import ContextVar
 
 logger = logging.getLogger("qns")
 """
@@ -28,55 +29,106 @@ handle = logging.StreamHandler(sys.stdout)
 logger.addHandler(handle)
 
 
+context_simulator: ContextVar = ContextVar("qns_log_simulator", default=None)
+"""
+The simulator whose time is added to the log messages, which is set by the simulator while it is running
+"""
+
+
 def install(s):
     """
-    Install the logger to the simulator
+    Install the logger to the simulator, so that the messages logged in its simulation begin with its current time.
+    Every simulator has its own binding, so simulators in different threads do not interfere with each other.
 
     Args:
         s (Simulator): the simulator
     """
-    logger._simulator = s
+    s.log_installed = True
+    context_simulator.set(s)
 
 
-def debug(msg, *args):
-    if hasattr(logger, "_simulator"):
-        logger.debug(f"[{logger._simulator.tc}] " + msg, *args)
+class lazy(object):
+    """
+    A lazy logging argument. ``func`` is only called if the message is actually formatted, e.g.,
+
+    .. code-block:: python
+
+        log.debug("%s: transmit %s", node, log.lazy(lambda: self.state[transmit_id]))
+    """
+
+    __slots__ = ("func",)
+
+    def __init__(self, func):
+        self.func = func
+
+    def __str__(self) -> str:
+        return str(self.func())
+
+    def __repr__(self) -> str:
+        return repr(self.func())
+
+
+def _log(level: int, msg, args: tuple):
+    # the time prefix and the %-style arguments are formatted by ``logging`` only if the record is emitted
+    s = context_simulator.get()
+    if s is not None:
+        if len(args) == 0:
+            msg = str(msg).replace("%", "%%")
+        logger.log(level, "[%s] " + str(msg), s.tc, *args)
     else:
-        logger.debug(msg, *args)
+        logger.log(level, msg, *args)
+
+
+_debug_enabled = True
+
+
+def debug(msg, *args):
+    """
+    Log a debug message. The message is formatted with ``args`` in the %-style only if the DEBUG level is enabled,
+    e.g., ``log.debug("%s: send epr %s", node, epr.name)``.
+    """
+    if _debug_enabled and logger.isEnabledFor(logging.DEBUG):
+        _log(logging.DEBUG, msg, args)
+
+
+def set_debug(enabled: bool) -> None:
+    """
+    Turn the debug logging on or off globally. If it is off, ``debug`` returns before checking the level.
+    It also affects the imported ``debug``, e.g., ``qns.utils.debug``.
+
+    Args:
+        enabled (bool): whether the debug messages are logged
+    """
+    global _debug_enabled
+    _debug_enabled = enabled
 
 
 def info(msg, *args):
-    if hasattr(logger, "_simulator"):
-        logger.info(f"[{logger._simulator.tc}] " + msg, *args)
-    else:
-        logger.info(msg, *args)
+    if logger.isEnabledFor(logging.INFO):
+        _log(logging.INFO, msg, args)
 
 
 def error(msg, *args):
-    if hasattr(logger, "_simulator"):
-        logger.error(f"[{logger._simulator.tc}] " + msg, *args)
-    else:
-        logger.error(msg, *args)
+    if logger.isEnabledFor(logging.ERROR):
+        _log(logging.ERROR, msg, args)
 
 
 def warn(msg, *args):
-    if hasattr(logger, "_simulator"):
-        logger.warn(f"[{logger._simulator.tc}] " + msg, *args)
-    else:
-        logger.warn(msg, *args)
+    if logger.isEnabledFor(logging.WARNING):
+        _log(logging.WARNING, msg, args)
 
 
 def critical(msg, *args):
-    if hasattr(logger, "_simulator"):
-        logger.critical(f"[{logger._simulator.tc}] " + msg, *args)
-    else:
-        logger.critical(msg, *args)
+    if logger.isEnabledFor(logging.CRITICAL):
+        _log(logging.CRITICAL, msg, args)
 
 
 def monitor(*args, sep: str = ",", with_time: bool = False):
+    if not logger.isEnabledFor(logging.INFO):
+        return
     attrs = list(args)
     if with_time:
-        attrs.insert(0, logger._simulator.tc)
+        attrs.insert(0, context_simulator.get().tc)
     attrs_s = [str(a) for a in attrs]
     msg = sep.join(attrs_s)
     logger.info(msg)
@@ -70,11 +70,11 @@ class MPSimulations():
 
     def _single_run(self, setting: Dict = {}):
         raw = {}
-        log.info(f"start simulation [{setting['_id']+1}/{self._total_simulation_count}] {setting}")
+        log.info("start simulation [%s/%s] %s", setting['_id']+1, self._total_simulation_count, setting)
         result = self.run(setting=setting)
         raw.update(setting)
         raw.update(result)
-        log.info(f"finish simulation [{setting['_id']+1}/{self._total_simulation_count}] {result}")
+        log.info("finish simulation [%s/%s] %s", setting['_id']+1, self._total_simulation_count, result)
         return raw
 
     def _init_worker(self):
@@ -15,14 +15,182 @@
 #    You should have received a copy of the GNU General Public License
 #    along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import hashlib
 import random
+from contextvars import ContextVar
 from typing import Optional
 import numpy as np
 
 
+class RandomStream(object):
+    """
+    An independent random stream based on ``numpy.random.Generator``.
+    The uniform and the standard normal random numbers are drawn in blocks and handed out one by one,
+    so that a single draw does not call numpy. Random integers and choices are derived from the uniform block.
+    """
+
+    block_size = 1024
+
+    def __init__(self, seed: Optional[np.random.SeedSequence] = None):
+        """
+        Args:
+            seed (SeedSequence): the seed sequence of the generator
+        """
+        self.generator = np.random.Generator(np.random.PCG64(seed))
+        self._uniforms = []
+        self._index = 0
+        self._normals = []
+        self._normal_index = 0
+
+    def random(self) -> float:
+        """
+        Get a random number from [0, 1)
+        """
+        i = self._index
+        if i >= len(self._uniforms):
+            self._uniforms = self.generator.random(self.block_size).tolist()
+            i = 0
+        self._index = i + 1
+        return self._uniforms[i]
+
+    def uniform(self, low: float = 0, high: float = 1) -> float:
+        """
+        Get a random number from [low, high)
+
+        Args:
+            low (float): the low bound
+            high (float): the high bound
+        """
+        return low + self.random() * (high - low)
+
+    def integers(self, low: int, high: int) -> int:
+        """
+        Get a random integer from [low, high]
+
+        Args:
+            low (int): the low bound
+            high (int): the high bound
+        """
+        if low > high:
+            raise ValueError("low should smaller than high")
+        return min(low + int(self.random() * (high - low + 1)), high)
+
+    def choice(self, a):
+        """
+        return an random element from a list
+
+        Args:
+            a: a iterable object
+        """
+        return a[self.integers(0, len(a) - 1)]
+
+    def shuffle(self, a: list) -> None:
+        """
+        Shuffle a list in place
+
+        Args:
+            a (list): the list
+        """
+        for i in range(len(a) - 1, 0, -1):
+            j = self.integers(0, i)
+            a[i], a[j] = a[j], a[i]
+
+    def normal(self, mean: float = 0, std: float = 1) -> float:
+        """
+        Get a random number from the normal distribution N(mean, std^2)
+
+        Args:
+            mean (float): the mean
+            std (float): the standard deviation
+        """
+        i = self._normal_index
+        if i >= len(self._normals):
+            self._normals = self.generator.standard_normal(self.block_size).tolist()
+            i = 0
+        self._normal_index = i + 1
+        return mean + std * self._normals[i]
+
+    def position(self) -> tuple:
+        """
+        Get the position of this stream, which changes whenever a random number is drawn
+        """
+        return self._index, self._normal_index, self.generator.bit_generator.state["state"]["state"]
+
+    def random_array(self, n: int, low: float = 0, high: float = 1) -> np.ndarray:
+        """
+        Get ``n`` random numbers from [low, high) at once
+
+        Args:
+            n (int): the number of random numbers
+            low (float): the low bound
+            high (float): the high bound
+        Returns:
+            the random numbers in a numpy array
+        """
+        return low + self.generator.random(n) * (high - low)
+
+
+class RandomContext(object):
+    """
+    The random state of a simulation: the root seed of the per-entity streams
+    and the stream of the global random functions, e.g., ``get_rand``
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        """
+        Args:
+            seed (int): the seed, or None for a random seed
+        """
+        self.seed(seed)
+
+    def seed(self, seed: Optional[int] = None) -> None:
+        """
+        Reset the random state with ``seed``
+
+        Args:
+            seed (int): the seed, or None for a random seed
+        """
+        self.root = np.random.SeedSequence(seed)
+        self.stream = RandomStream(np.random.SeedSequence(self.root.entropy))
+
+
+context_random: ContextVar = ContextVar("qns_random", default=RandomContext())
+"""
+The random state of the current simulator. It is shared by the simulators without their own seeds.
+"""
+
+
+def get_stream(key: str) -> RandomStream:
+    """
+    Get the random stream of ``key``, e.g., the name of an entity.
+    The stream only depends on the seed and the key,
+    so that adding or removing other entities does not change its random numbers.
+
+    Args:
+        key (str): the unique key of the stream
+    Returns:
+        a new ``RandomStream``
+    """
+    digest = hashlib.sha256(key.encode()).digest()
+    spawn_key = tuple(int.from_bytes(digest[i:i + 4], "little") for i in range(0, 16, 4))
+    return RandomStream(np.random.SeedSequence(context_random.get().root.entropy, spawn_key=spawn_key))
+
+
+def spawn_stream() -> RandomStream:
+    """
+    Get a new random stream for an object without a key. The stream depends on the number of spawned streams.
+
+    Returns:
+        a new ``RandomStream``
+    """
+    return RandomStream(context_random.get().root.spawn(1)[0])
+
+
 def set_seed(seed: Optional[int] = None):
     """
-    Set a seed for random generator
+    Set a seed for random generator.
+    The random state of the current simulator, i.e., the streams created by ``get_stream`` and ``spawn_stream``
+    afterwards and the global random functions, is also seeded.
 
     Args:
         seed (int): the seed
@@ -31,6 +199,33 @@ def set_seed(seed: Optional[int] = None):
         return
     random.seed(seed)
     np.random.seed(seed)
+    context_random.get().seed(seed)
+
+
+def get_state() -> dict:
+    """
+    Get the states of the random generators, e.g., for saving a checkpoint
+
+    Returns:
+        the states that can be restored by ``set_state``
+    """
+    context = context_random.get()
+    return {"random": random.getstate(), "numpy": np.random.get_state(), "root": context.root,
+            "default": context.stream}
+
+
+def set_state(state: dict):
+    """
+    Restore the states of the random generators
+
+    Args:
+        state (dict): the states returned by ``get_state``
+    """
+    random.setstate(state["random"])
+    np.random.set_state(state["numpy"])
+    context = context_random.get()
+    context.root = state["root"]
+    context.stream = state["default"]
 
 
 def get_rand(low: float = 0, high: float = 1) -> float:
@@ -41,10 +236,24 @@ def get_rand(low: float = 0, high: float = 1) -> float:
         low (int): the low bound
         high (int): the high bound
     """
-    return low + np.random.random() * (high - low)
+    return low + context_random.get().stream.random() * (high - low)
+
+
+def get_rand_array(n: int, low: float = 0, high: float = 1) -> np.ndarray:
+    """
+    Get ``n`` random numbers from [low, high) at once, e.g., for batched callers
+
+    Args:
+        n (int): the number of random numbers
+        low (float): the low bound
+        high (float): the high bound
+    Returns:
+        the random numbers in a numpy array
+    """
+    return context_random.get().stream.random_array(n, low, high)
 
 
-def get_randint(low: int, high: int) -> float:
+def get_randint(low: int, high: int) -> int:
     """
     Get a random integer from [low, high]
 
@@ -56,7 +265,7 @@ def get_randint(low: int, high: int) -> float:
         raise ValueError("input low")
     if low > high:
         raise ValueError("low should smaller than high")
-    return np.random.randint(low, high+1)
+    return context_random.get().stream.integers(int(low), int(high))
 
 
 def get_choice(a):
@@ -70,4 +279,4 @@ def get_choice(a):
 
 
 def get_normal(mean: float = 0, std: float = 1):
-    return np.random.normal(loc=mean, scale=std)
+    return context_random.get().stream.normal(mean, std)
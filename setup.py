@@ -15,11 +15,18 @@
 #    You should have received a copy of the GNU General Public License
 #    along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from setuptools import setup, find_packages
+from setuptools import setup, find_packages, Extension
 
 with open("README.md", "r", encoding="utf-8") as fh:
     long_description = fh.read()
 
+# the compiled event pool is optional, SimQN falls back to the pure python event pool without it
+try:
+    from Cython.Build import cythonize
+    ext_modules = cythonize([Extension('qns.simulator.cpool', ['qns/simulator/cpool.pyx'], optional=True)])
+except ImportError:
+    ext_modules = []
+
 setup(
     name='qns',
     author='elliot',
@@ -31,6 +38,7 @@ setup(
     include_package_data=True,
     url="https://github.com/ertuil/SimQN",
     exclude_package_data={'docs': ['.gitkeep']},
+    ext_modules=ext_modules,
     setup_requires=["numpy", "pandas", "twine", "wheel"],
     install_requires=["numpy", "pandas"],
     classifiers=[
@@ -1,5 +1,5 @@
 from typing import Optional
-from qns.entity.monitor.monitor import Monitor
+from qns.entity.monitor.monitor import Monitor, MonitorPeriodEvent
 from qns.entity.node.app import Application
 from qns.entity.node.node import QNode
 from qns.entity.qchannel.qchannel import QuantumChannel, RecvQubitPacket
@@ -77,5 +77,21 @@ def test_monitor_1():
     print(m.get_date())
 
 
+def test_monitor_period_time():
+    s = Simulator(0, 3, 1000)
+    m = Monitor()
+    m.add_attribution(name="tc", calculate_func=lambda s, n, e: s.tc.sec)
+    m.at_period(period_time=1)
+    m.install(s)
+    # another monitor watches the periodic events and sees the time of every occurrence
+    m2 = Monitor()
+    m2.add_attribution(name="event_time", calculate_func=lambda s, n, e: e.t.sec)
+    m2.at_event(MonitorPeriodEvent)
+    m2.install(s)
+    s.run()
+    assert list(m.get_date()["time"]) == [1, 2, 3]
+    assert list(m2.get_date()["event_time"]) == list(m2.get_date()["time"]) == [1, 2, 3]
+
+
 if __name__ == "__main__":
     test_monitor_1()
@@ -0,0 +1,60 @@
+from qns.entity.node.app import Application
+from qns.entity.node.node import QNode
+from qns.simulator.event import Event
+from qns.simulator.simulator import Simulator
+from qns.simulator.ts import Time
+
+
+class BaseEvent(Event):
+    def invoke(self) -> None:
+        pass
+
+
+class SubEvent(BaseEvent):
+    pass
+
+
+class RecordApp(Application):
+    def __init__(self, record, name):
+        super().__init__()
+        self.record = record
+        self.name = name
+
+    def handle_base(self, node, event):
+        self.record.append((self.name, "base", event.__class__.__name__))
+
+    def handle_all(self, node, event):
+        self.record.append((self.name, "all", event.__class__.__name__))
+
+    def handle_skip(self, node, event):
+        self.record.append((self.name, "skip", event.__class__.__name__))
+        return True
+
+
+def test_app_dispatch():
+    record = []
+    n1 = QNode("n1")
+    a1 = RecordApp(record, "a1")
+    a2 = RecordApp(record, "a2")
+    a1.add_handler(a1.handle_base, [BaseEvent])
+    a1.add_handler(a1.handle_all, [], [n1])
+    a2.add_handler(a2.handle_all)
+    n1.add_apps(a1)
+    n1.add_apps(a2)
+    s = Simulator(0, 10, 1000)
+    n1.install(s)
+
+    n1.handle(SubEvent(t=Time(1), by=n1))
+    n1.handle(BaseEvent(t=Time(1)))
+    n1.handle(Event(t=Time(1)))
+    assert record == [("a1", "base", "SubEvent"), ("a1", "all", "SubEvent"), ("a2", "all", "SubEvent"),
+                      ("a1", "base", "BaseEvent"), ("a2", "all", "BaseEvent"),
+                      ("a2", "all", "Event")]
+
+    # adding a handler invalidates the cached dispatching table
+    record.clear()
+    a1.add_handler(a1.handle_skip, [SubEvent])
+    n1.handle(SubEvent(t=Time(1)))
+    n1.handle(BaseEvent(t=Time(1)))
+    assert record == [("a1", "base", "SubEvent"), ("a1", "skip", "SubEvent"),
+                      ("a1", "base", "BaseEvent"), ("a2", "all", "BaseEvent")]
@@ -7,6 +7,8 @@ from qns.models.qubit.qubit import Qubit
 from qns.entity.node.node import QNode
 from qns.entity.qchannel.qchannel import QuantumChannel, RecvQubitPacket
 from qns.entity.node.app import Application
+from qns.models.delay.uniformdelay import UniformDelayModel
+from qns.utils.rnd import get_rand, set_seed
 
 
 class QuantumRecvNode(QNode):
@@ -120,3 +122,73 @@ def test_qubit_loss_channel():
     n1.install(s)
     n2.install(s)
     s.run()
+
+
+class RecordApp(Application):
+    def __init__(self):
+        super().__init__()
+        self.record = []
+        self.add_handler(self.recv, [RecvQubitPacket])
+
+    def recv(self, node, event: RecvQubitPacket) -> Optional[bool]:
+        self.record.append((event.qchannel.name, event.t.time_slot))
+
+
+def run_random_channels(channels_number: int, shared: bool = False):
+    set_seed(1)
+    s = Simulator(0, 10, 1000)
+    delay_model = UniformDelayModel(0.1, 0.2)
+    n0 = QNode(name="n0")
+    n0.add_apps(RecordApp())
+    nodes = [n0]
+    for i in range(1, channels_number + 1):
+        n = QNode(name=f"n{i}")
+        link = QuantumChannel(name=f"l{i}", delay=delay_model if shared else UniformDelayModel(0.1, 0.2),
+                              drop_rate=0.5)
+        n.add_qchannel(link)
+        n0.add_qchannel(link)
+        n.add_apps(SendApp(dest=n0, qchannel=link, send_rate=5))
+        nodes.append(n)
+    for n in nodes:
+        n.install(s)
+    s.run()
+    return [r for r in n0.apps[0].record if r[0] == "l1"]
+
+
+def test_qchannel_random_stream():
+    record = run_random_channels(1)
+    assert 0 < len(record) < 50
+    # more channels do not change the random drops and delays of l1
+    assert run_random_channels(3) == record
+    # neither does a delay model that is shared by all channels
+    assert run_random_channels(3, shared=True) == record
+
+
+def test_qchannel_random_stream_reseed():
+    l1 = QuantumChannel(name="l1")
+    set_seed(1)
+    first = [l1.rng.random() for _ in range(3)]
+    # the cached stream is created again from the new random state
+    set_seed(1)
+    assert [l1.rng.random() for _ in range(3)] == first
+    fresh = QuantumChannel(name="l1")
+    assert [fresh.rng.random() for _ in range(3)] == first
+    # a simulator with its own random state gets new streams
+    with Simulator(seed=1).context():
+        assert [l1.rng.random() for _ in range(3)] == first
+    with Simulator(seed=2).context():
+        assert [l1.rng.random() for _ in range(3)] != first
+
+
+def test_delay_model_random_stream():
+    model = UniformDelayModel(0.1, 0.2)
+    l1 = QuantumChannel(name="l1", delay=model)
+    set_seed(1)
+    expected = [l1.rng.uniform(0.1, 0.2) for _ in range(3)]
+    set_seed(1)
+    assert [model.calculate(rng=l1.rng) for _ in range(3)] == expected
+    # the stream is not kept by the shared model, which uses the global random generator by default
+    set_seed(1)
+    global_draws = [get_rand(0.1, 0.2) for _ in range(3)]
+    set_seed(1)
+    assert [model.calculate() for _ in range(3)] == global_draws
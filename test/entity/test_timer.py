@@ -1,5 +1,6 @@
 from qns.simulator.simulator import Simulator
-from qns.entity.timer.timer import Timer
+from qns.entity.monitor.monitor import Monitor
+from qns.entity.timer.timer import Timer, TimerEvent
 
 
 def test_timer():
@@ -11,3 +12,53 @@ def test_timer():
     t1 = Timer("t1", 0, 10, 0.5, trigger_func)
     t1.install(s)
     s.run()
+
+
+def test_timer_periodic():
+    s = Simulator(0, 3600, 1000)
+    record = []
+    t1 = Timer("t1", 0, 3600, 0.001, lambda: record.append(s.tc.time_slot))
+    t1.install(s)
+    # only the next trigger event is in the event pool
+    assert len(s.event_pool) == 1
+
+    t2 = Timer("t2", 1, 0, trigger_func=lambda: record.append(-1))
+    t2.install(s)
+
+    def stop():
+        if len(record) >= 100:
+            t1.cancel()
+    t3 = Timer("t3", 0, 3600, 0.01, stop)
+    t3.install(s)
+    s.run()
+    assert record[:100] == list(range(100))
+    assert record[100:] == [-1]
+
+
+def test_timer_set_step_time():
+    s = Simulator(0, 10, 1000)
+    record = []
+
+    def trigger_func():
+        record.append(s.tc.sec)
+        if len(record) == 3:
+            t1.set_step_time(2)
+    t1 = Timer("t1", 0, 10, 0.5, trigger_func)
+    t1.install(s)
+    s.run()
+    assert record == [0, 0.5, 1, 3, 5, 7, 9]
+
+
+def test_timer_monitor_time():
+    s = Simulator(0, 1, 1000)
+    record = []
+    t1 = Timer("t1", 0, 0.5, 0.1, lambda: record.append(s.tc.time_slot))
+    t1.install(s)
+    m = Monitor()
+    m.add_attribution(name="slot", calculate_func=lambda s, n, e: e.t.time_slot)
+    m.at_event(TimerEvent)
+    m.install(s)
+    s.run()
+    # the monitor sees the time of the current trigger, not the next one
+    assert record == [0, 100, 200, 300, 400, 500]
+    assert list(m.get_date()["slot"]) == record
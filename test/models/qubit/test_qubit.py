@@ -86,3 +86,143 @@ def test_state():
     from qns.models.qubit.const import QUBIT_STATE_N
     q0 = Qubit(state=QUBIT_STATE_N, name='q0')
     q0.state.state()
+
+
+def test_apply_operator():
+    import itertools
+    from qns.models.qubit.qubit import QState
+    from qns.models.qubit.utils import kron
+    from qns.models.qubit.gate import CNOT, H
+    from qns.models.qubit.const import OPERATOR_HADAMARD, OPERATOR_PAULI_I, OPERATOR_PAULI_X
+
+    # the gates agree with the full operators built by Kronecker products
+    for n in [3, 5]:
+        qubits = [Qubit(name=f"q{i}") for i in range(n)]
+        a = np.random.default_rng(n).random((2 ** n, 2 ** n))
+        rho = np.dot(a, a.T)
+        state = QState(qubits, rho=rho / rho.trace())
+        for q in qubits:
+            q.state = state
+        for i, j in itertools.permutations(range(n), 2):
+            expected = np.array([[1]])
+            part_0, part_1 = np.array([[1]]), np.array([[1]])
+            for m in range(n):
+                part_0 = kron(part_0, np.diag([1, 0]) if m == i else OPERATOR_PAULI_I)
+                part_1 = kron(part_1, np.diag([0, 1]) if m == i else OPERATOR_PAULI_X if m == j else OPERATOR_PAULI_I)
+                expected = kron(expected, OPERATOR_HADAMARD if m == j else OPERATOR_PAULI_I)
+            expected = np.dot(part_0 + part_1, expected)
+            rho = state.rho
+            H(qubits[j])
+            CNOT(qubits[i], qubits[j])
+            assert np.allclose(state.rho, np.dot(expected, np.dot(rho, expected.T.conjugate())))
+
+
+def test_measure_basis():
+    # |Phi+> is correlated in the Z and X bases and anti-correlated in the Y basis
+    for measure, correlated in [("measureZ", True), ("measureX", True), ("measureY", False)]:
+        for _ in range(10):
+            q0 = Qubit(state=QUBIT_STATE_0, name="q0")
+            q1 = Qubit(state=QUBIT_STATE_0, name="q1")
+            q2 = Qubit(state=QUBIT_STATE_1, name="q2")
+            H(q0)
+            CNOT(q0, q1)
+            Swap(q1, q2)
+            assert q1.measure() == 1
+            c0, c2 = getattr(q0, measure)(), getattr(q2, measure)()
+            assert (c0 == c2) == correlated
+            assert q0.state.num == 1 and q2.state.num == 1
+
+
+def test_state_vector():
+    from qns.models.qubit.gate import X, T
+    from qns.utils.rnd import set_seed
+
+    def teleport(density_matrix):
+        set_seed(1)
+        q0, q1, q2 = Qubit(name="q0"), Qubit(name="q1"), Qubit(name="q2")
+        if density_matrix:
+            for q in [q0, q1, q2]:
+                q.state.to_density_matrix()
+        RX(q0, theta=0.3)
+        T(q0)
+        H(q1)
+        CNOT(q1, q2)
+        CNOT(q0, q1)
+        H(q0)
+        c0, c1 = q0.measure(), q1.measure()
+        if c1 == 1:
+            X(q2)
+        if c0 == 1:
+            CZ(q0, q2)
+        return (c0, c1), q2
+
+    outcome, q2 = teleport(False)
+    assert q2.state.vector is not None and q2.state.is_pure_state()
+    expected_outcome, expected = teleport(True)
+    assert outcome == expected_outcome and expected.state.vector is None
+    assert np.allclose(q2.state.rho, expected.state.rho)
+
+    # a stochastic operation turns the state vector into a density matrix
+    q2.stochastic_operate([np.eye(2), np.array([[0, 1], [1, 0]])], [0.5, 0.5])
+    assert q2.state.vector is None and not q2.state.is_pure_state()
+
+
+def test_stochastic_operate_trivial():
+    from qns.models.qubit.decoherence import DephaseError, DepolarError
+
+    def run(density_matrix):
+        q0, q1 = Qubit(name="q0"), Qubit(name="q1")
+        if density_matrix:
+            for q in [q0, q1]:
+                q.state.to_density_matrix()
+        H(q0)
+        CNOT(q0, q1)
+        # the noise models without noise and the mixtures with a single branch
+        DephaseError(q0, p=0)
+        DepolarError(q1, p=0)
+        q1.stochastic_operate([np.eye(2), np.array([[0, 1], [1, 0]])], [0, 1])
+        return q0
+
+    q0 = run(False)
+    assert q0.state.vector is not None
+    expected = run(True)
+    assert np.allclose(q0.state.rho, expected.state.rho)
+
+
+def test_factorize():
+    from qns.models.qubit.decoherence import DephaseStorageErrorModel
+    from qns.models.qubit.gate import X
+
+    for density_matrix in [False, True]:
+        qubits = [Qubit(name=f"q{i}") for i in range(6)]
+        H(qubits[0])
+        for q in qubits[1:]:
+            CNOT(qubits[0], q)
+        if density_matrix:
+            qubits[0].state.to_density_matrix()
+            DephaseStorageErrorModel(qubits[5], t=0.1, decoherence_rate=1)
+        assert qubits[0].state.num == 6
+        c = qubits[0].measure()
+        # the GHZ state collapses into a product state
+        assert all(q.state.num == 1 and q.state.basis_value() == c for q in qubits)
+
+    # an entangled pair stays in the joint state
+    q0, q1, q2 = Qubit(name="q0"), Qubit(name="q1"), Qubit(name="q2")
+    H(q0)
+    CNOT(q0, q1)
+    H(q2)
+    CNOT(q2, q1)
+    q2.measure()
+    assert q0.state is q1.state and q0.state.num == 2
+    assert len(q0.state.factorize()) == 0
+
+    # the controls in |0> or |1> and the swap do not merge the states
+    q0, q1, q2 = Qubit(name="q0"), Qubit(name="q1"), Qubit(name="q2")
+    H(q2)
+    CNOT(q0, q2)
+    X(q0)
+    CZ(q0, q2)
+    Toffoli(q0, q1, q2)
+    Swap(q0, q2)
+    assert all(q.state.num == 1 for q in [q0, q1, q2])
+    assert np.allclose(q0.state.vector, [1 / np.sqrt(2), -1 / np.sqrt(2)]) and q2.state.basis_value() == 1
@@ -130,3 +130,35 @@ def test_qubit_memory_2():
     s.add_event(write_request)
     s.add_event(read_request)
     s.run()
+
+
+def test_qubit_memory_random_stream():
+    from qns.models.qubit.decoherence import DissipationStorageErrorModel
+    from qns.simulator.event import CallbackEvent
+    from qns.utils.rnd import set_seed
+
+    Qubit = QubitFactory(store_error_model=DissipationStorageErrorModel)
+
+    def run(memories: int):
+        set_seed(3)
+        s = Simulator(0, 10, 1000)
+        n1 = QNode("n1")
+        for i in range(memories):
+            n1.add_memory(QuantumMemory(f"m{i}", decoherence_rate=0.5))
+        n1.install(s)
+        for m in reversed(n1.memories):
+            for j in range(30):
+                m.write(Qubit(state=QUBIT_STATE_1, name=f"{m.name}-{j}"))
+        result = []
+
+        def read():
+            for m in reversed(n1.memories):
+                result.append([m.read(f"{m.name}-{j}").state.basis_value() for j in range(30)])
+        s.add_event(CallbackEvent(s.time(sec=1), read))
+        s.run()
+        return result[-1]
+
+    # the dissipation of m0 is drawn from its own stream, so another memory does not change it
+    values = run(1)
+    assert 0 in values and 1 in values
+    assert run(2) == values
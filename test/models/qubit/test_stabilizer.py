@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+from qns.models.qubit.const import QUBIT_STATE_P
+from qns.models.qubit.decoherence import DephaseStorageErrorModel
+from qns.models.qubit.errors import OperatorNotMatchError
+from qns.models.qubit.factory import QubitFactory
+from qns.models.qubit.gate import CNOT, CY, CZ, H, S, Swap, T, X, Y, Z
+from qns.models.qubit.qubit import Qubit
+from qns.models.qubit.stabilizer import StabilizerQubit, StabilizerState
+from qns.utils.rnd import set_seed
+
+
+def random_circuit(qubit_class, seed, n=5):
+    set_seed(seed)
+    qubits = [qubit_class(name=f"q{i}") for i in range(n)]
+    rng = np.random.default_rng(seed)
+    gates = [H, S, X, Y, Z, CNOT, CZ, CY, Swap]
+    results = []
+    for _ in range(40):
+        a, b = rng.choice(n, 2, replace=False)
+        g = rng.integers(len(gates) + 1)
+        if g == len(gates):
+            results.append(qubits[a].state.measure(qubits[a], "ZXY"[rng.integers(3)]))
+        elif g >= 5:
+            gates[g](qubits[a], qubits[b])
+        else:
+            gates[g](qubits[a])
+    # the state of all qubits in order, as the states may be factorized differently
+    states = list({id(q.state): q.state for q in qubits}.values())
+    rho = np.ones((1, 1))
+    for s in states:
+        rho = np.kron(rho, s.rho)
+    order = [qubits.index(q) for s in states for q in s.qubits]
+    perm = [order.index(i) for i in range(n)]
+    rho = rho.reshape([2] * 2 * n).transpose(perm + [n + i for i in perm]).reshape(2 ** n, 2 ** n)
+    return results, rho
+
+
+def test_stabilizer_random_circuits():
+    # the same outcomes and states as the density matrix backend
+    for seed in range(30):
+        results, rho = random_circuit(Qubit, seed)
+        expected_results, expected_rho = random_circuit(StabilizerQubit, seed)
+        assert results == expected_results
+        assert np.allclose(rho, expected_rho)
+
+
+def test_stabilizer_ghz():
+    qubits = [StabilizerQubit(name=f"q{i}") for i in range(200)]
+    H(qubits[0])
+    for q in qubits[1:]:
+        CNOT(qubits[0], q)
+    assert isinstance(qubits[0].state, StabilizerState) and qubits[0].state.num == 200
+    results = [q.measure() for q in qubits]
+    assert results == [results[0]] * 200
+
+
+def test_stabilizer_pauli_channel():
+    set_seed(0)
+    Qubit = QubitFactory(store_error_model=DephaseStorageErrorModel, qubit_class=StabilizerQubit)
+    errors = 0
+    for _ in range(2000):
+        q = Qubit(state=QUBIT_STATE_P)
+        q.store_error_model(t=1, decoherence_rate=np.log(5 / 4))  # p = 0.2
+        errors += q.measureX()
+    assert 300 < errors < 500
+
+    q = Qubit()
+    with pytest.raises(OperatorNotMatchError):
+        T(q)
@@ -0,0 +1,169 @@
+import warnings
+
+import pytest
+
+from qns.entity.cchannel.cchannel import ClassicChannel, ClassicPacket, RecvClassicPacket
+from qns.entity.node.app import Application
+from qns.entity.node.node import QNode
+from qns.entity.qchannel.qchannel import QuantumChannel, RecvQubitPacket
+from qns.models.delay.uniformdelay import UniformDelayModel
+from qns.models.qubit.qubit import Qubit
+from qns.network.network import QuantumNetwork
+from qns.network.parallel import ParallelSimulator
+from qns.network.protocol.bb84 import BB84RecvApp, BB84SendApp
+from qns.network.protocol.entanglement_distribution import EntanglementDistributionApp
+from qns.network.route.dijkstra import DijkstraRouteAlgorithm
+from qns.network.topology import LineTopology
+from qns.network.topology.topo import ClassicTopology
+from qns.simulator.event import CallbackEvent
+from qns.simulator.simulator import Simulator
+from qns.utils.rnd import get_rand, set_seed
+
+
+class PingApp(Application):
+    """
+    Every node sends packets and qubits to its neighbors, and replies to the received packets
+    """
+    def __init__(self):
+        super().__init__()
+        self.record = []
+        self.add_handler(self.recv_packet, [RecvClassicPacket])
+        self.add_handler(self.recv_qubit, [RecvQubitPacket])
+
+    def install(self, node, simulator: Simulator):
+        super().install(node, simulator)
+        t = simulator.ts.add_slots(int(node.name[1:]))
+        simulator.add_event(CallbackEvent(t, self.send, by=self))
+
+    def send(self):
+        node = self.get_node()
+        s = self._simulator
+        for cchannel in node.cchannels:
+            dest = [n for n in cchannel.node_list if n != node][0]
+            cchannel.send(ClassicPacket({"hop": 0, "t": s.tc.time_slot}, src=node, dest=dest), next_hop=dest)
+        for qchannel in node.qchannels:
+            dest = [n for n in qchannel.node_list if n != node][0]
+            qchannel.send(Qubit(name=f"{node.name}-{s.tc.time_slot}"), next_hop=dest)
+        s.add_event(CallbackEvent(s.tc.add_slots(37), self.send, by=self))
+
+    def recv_packet(self, node, event: RecvClassicPacket):
+        msg = event.packet.get()
+        self.record.append((event.t.time_slot, event.packet.src.name, msg["hop"], msg["t"]))
+        if msg["hop"] < 2:
+            packet = ClassicPacket({"hop": msg["hop"] + 1, "t": msg["t"]}, src=node, dest=event.packet.src)
+            event.cchannel.send(packet, next_hop=event.packet.src)
+
+    def recv_qubit(self, node, event: RecvQubitPacket):
+        self.record.append((event.t.time_slot, event.qubit.name))
+
+
+def build_network(qchannel_args={"delay": 0.011}):
+    set_seed(0)
+    s = Simulator(0, 2, 1000)
+    topo = LineTopology(nodes_number=6, nodes_apps=[PingApp()],
+                        qchannel_args=qchannel_args, cchannel_args={"delay": 0.005})
+    net = QuantumNetwork(topo=topo, classic_topo=ClassicTopology.Follow)
+    net.install(s)
+    return s, net
+
+
+@pytest.mark.parametrize("partitions", [1, 2, 3])
+@pytest.mark.parametrize("qchannel_args", [{"delay": 0.011},
+                                           {"delay": UniformDelayModel(0.011, 0.02), "drop_rate": 0.3}])
+def test_parallel_simulator(partitions, qchannel_args):
+    # the random drops and delays are drawn from the streams of the sending directions,
+    # so they are the same in all partitions
+    s, net = build_network(qchannel_args)
+    s.run()
+    # the order of the events from different nodes at the same time slot may differ
+    expected = {n.name: sorted(n.apps[0].record) for n in net.nodes}
+    assert all(len(r) > 0 for r in expected.values())
+    total_events = s.total_events
+
+    s, net = build_network(qchannel_args)
+    ps = ParallelSimulator(s, partitions=partitions)
+    ps.run()
+    assert ps.lookahead == (5 if partitions > 1 else float("inf"))
+    assert {n.name: sorted(ps.get_node(n.name).apps[0].record) for n in net.nodes} == expected
+    assert ps.total_events == total_events
+
+
+def test_parallel_simulator_no_lookahead():
+    s = Simulator(0, 1, 1000)
+    net = QuantumNetwork(topo=LineTopology(nodes_number=4), classic_topo=ClassicTopology.Follow)
+    net.install(s)
+    with pytest.raises(ValueError):
+        ParallelSimulator(s, partitions=2)
+
+
+def build_bb84_network():
+    set_seed(7)
+    s = Simulator(0, 2, accuracy=10000000000)
+    net = QuantumNetwork()
+    n1, n2 = QNode(name="n1"), QNode(name="n2")
+    qlink = QuantumChannel(name="l1", delay=0.0003, drop_rate=0.1, length=2000000)
+    clink = ClassicChannel(name="c1", delay=0.0003)
+    for n in [n1, n2]:
+        net.add_node(n)
+        n.add_cchannel(clink)
+        n.add_qchannel(qlink)
+    net.add_qchannel(qlink)
+    net.add_cchannel(clink)
+    n1.add_apps(BB84SendApp(n2, qlink, clink, send_rate=1000, min_length_for_post_processing=500))
+    n2.add_apps(BB84RecvApp(n1, qlink, clink, min_length_for_post_processing=500))
+    net.install(s)
+    return s, net
+
+
+def bb84_keys(get_node):
+    sp, rp = get_node("n1").apps[0], get_node("n2").apps[0]
+    return dict(sp.succ_key_pool), dict(rp.succ_key_pool), sp.successful_key, rp.successful_key
+
+
+def test_parallel_simulator_bb84():
+    # the bases, the measurements and the channel errors are drawn from the streams of the entities,
+    # so the keys are the same as the sequential simulation
+    s, net = build_bb84_network()
+    s.run()
+    expected = bb84_keys(net.get_node)
+    assert len(expected[0]) > 0
+
+    s, net = build_bb84_network()
+    ps = ParallelSimulator(s, partitions=[["n1"], ["n2"]])
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", RuntimeWarning)
+        ps.run()
+    assert bb84_keys(ps.get_node) == expected
+
+
+def test_parallel_simulator_global_random():
+    s, net = build_network()
+    s.add_event(CallbackEvent(s.time(sec=0.5), get_rand))
+    ps = ParallelSimulator(s, partitions=2)
+    with pytest.warns(RuntimeWarning):
+        ps.run()
+
+
+def build_distribution_network():
+    set_seed(0)
+    s = Simulator(0, 2, 10000000)
+    topo = LineTopology(nodes_number=4, qchannel_args={"delay": 0.05}, cchannel_args={"delay": 0.05},
+                        memory_args={"capacity": 50}, nodes_apps=[EntanglementDistributionApp()])
+    net = QuantumNetwork(topo=topo, classic_topo=ClassicTopology.All, route=DijkstraRouteAlgorithm())
+    net.build_route()
+    net.add_request(src=net.get_node("n1"), dest=net.get_node("n4"), attr={"send_rate": 10})
+    net.install(s)
+    return s, net
+
+
+def test_parallel_simulator_remote_calls():
+    # the applications of the entanglement distribution call the applications of other nodes directly,
+    # which can not be simulated in other partitions
+    s, net = build_distribution_network()
+    s.run()
+    assert net.get_node("n1").apps[0].success_count > 0
+
+    s, net = build_distribution_network()
+    ps = ParallelSimulator(s, partitions=[["n1", "n2"], ["n3", "n4"]])
+    with pytest.raises(RuntimeError, match="simulated by another logical process"):
+        ps.run()
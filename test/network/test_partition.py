@@ -0,0 +1,50 @@
+from qns.models.delay.constdelay import ConstantDelayModel
+from qns.network.network import QuantumNetwork
+from qns.network.partition import GraphPartitioner
+from qns.network.topology import GridTopology, LineTopology, RandomTopology
+
+
+def names(parts):
+    return [sorted(n.name for n in part) for part in parts]
+
+
+def test_partition_balance():
+    net = QuantumNetwork(topo=RandomTopology(nodes_number=200, lines_number=600))
+    gp = GraphPartitioner(k=4, imbalance=0.1)
+    parts = gp.partition(net)
+    assert sorted(n.name for part in parts for n in part) == sorted(n.name for n in net.nodes)
+    assert all(0 < len(part) <= 55 for part in parts)
+    assert len(gp.cut_channels) == gp.cut_cost
+
+
+def test_partition_min_cut():
+    net = QuantumNetwork(topo=GridTopology(nodes_number=16))
+    gp = GraphPartitioner(k=2)
+    parts = gp.partition(net)
+    assert [len(part) for part in parts] == [8, 8]
+    assert gp.cut_cost == 4
+
+
+def test_partition_traffic():
+    # the grid is split between the 2nd and 3rd rows without requests
+    net = QuantumNetwork(topo=GridTopology(nodes_number=16))
+    net.add_request(net.get_node("n1"), net.get_node("n13"), attr={"send_rate": 100})
+    gp = GraphPartitioner(k=2)
+    parts = gp.partition(net)
+    # the busy path n1-n5-n9-n13 is not cut
+    assert any({"n1", "n5", "n9", "n13"} <= set(part) for part in names(parts))
+    assert gp.cut_cost < 100
+
+
+def test_partition_lookahead():
+    net = QuantumNetwork(topo=LineTopology(nodes_number=6, qchannel_args={"delay": 0.001}))
+    net.get_qchannel("l3").delay_model = ConstantDelayModel(0.01)
+    gp = GraphPartitioner(k=2)
+    assert names(gp.partition(net)) == [["n1", "n2", "n3"], ["n4", "n5", "n6"]]
+    assert gp.lookahead == 0.01
+    assert gp.cut_channels == [net.get_qchannel("l3")]
+
+    # the long channel can not balance 3 partitions
+    gp = GraphPartitioner(k=3)
+    assert names(gp.partition(net)) == [["n1", "n2"], ["n3", "n4"], ["n5", "n6"]]
+    assert gp.lookahead == 0.001
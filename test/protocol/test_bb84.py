@@ -3,6 +3,7 @@ from qns.entity.qchannel.qchannel import QuantumChannel
 from qns.entity import QNode
 from qns.simulator.simulator import Simulator
 from qns.network.protocol.bb84 import BB84RecvApp, BB84SendApp
+from qns.utils.rnd import set_seed
 import numpy as np
 
 light_speed = 299791458
@@ -39,3 +40,34 @@ def test_bb84_protocol():
 
     s.run()
     print(sp.fail_number)
+
+
+def run_bb84(pairs: int):
+    set_seed(7)
+    s = Simulator(0, 2, accuracy=10000000000)
+    result = []
+    for i in range(pairs):
+        n1, n2 = QNode(name=f"n{2 * i + 1}"), QNode(name=f"n{2 * i + 2}")
+        qlink = QuantumChannel(name=f"l{i}", delay=length / light_speed, drop_rate=0.1, length=length * 20)
+        clink = ClassicChannel(name=f"c{i}", delay=length / light_speed)
+        for n in [n1, n2]:
+            n.add_cchannel(clink)
+            n.add_qchannel(qlink)
+        sp = BB84SendApp(n2, qlink, clink, send_rate=1000, min_length_for_post_processing=500)
+        rp = BB84RecvApp(n1, qlink, clink, min_length_for_post_processing=500)
+        n1.add_apps(sp)
+        n2.add_apps(rp)
+        n1.install(s)
+        n2.install(s)
+        result.append((sp, rp))
+    s.run()
+    sp, rp = result[0]
+    return dict(sp.succ_key_pool), dict(rp.succ_key_pool), sp.successful_key, rp.successful_key
+
+
+def test_bb84_random_streams():
+    # the bases, the measurements and the post processing use the streams of the applications,
+    # so another pair of nodes does not change the keys of the first pair
+    keys = run_bb84(1)
+    assert len(keys[0]) > 0 or len(keys[2]) > 0
+    assert run_bb84(2) == keys
@@ -1,4 +1,4 @@
-from qns.simulator.event import Event, func_to_event
+from qns.simulator.event import CallbackEvent, Event, func_to_event
 from qns.simulator.ts import Time
 
 
@@ -26,3 +26,27 @@ def test_event_simple():
     print(te)
 
     te.invoke()
+
+
+def test_event_slots():
+    from qns.entity.qchannel.qchannel import RecvQubitPacket
+    from qns.entity.cchannel.cchannel import RecvClassicPacket
+    e1 = RecvQubitPacket(t=Time(sec=1))
+    e2 = RecvClassicPacket(t=Time(sec=1))
+    assert not hasattr(e1, "__dict__") and not hasattr(e2, "__dict__")
+
+
+def test_callback_event():
+    result = []
+
+    def record(a, b=0):
+        result.append((a, b))
+
+    e1 = func_to_event(Time(sec=1), record, None, None, 1, b=2)
+    e2 = func_to_event(Time(sec=2), record, None, None, 3)
+    assert isinstance(e1, CallbackEvent) and type(e1) is type(e2)
+    e1.invoke()
+    e2.invoke()
+    CallbackEvent(Time(sec=3), record, (4, 5)).invoke()
+    assert result == [(1, 2), (3, 0), (4, 5)]
+    assert not hasattr(e1, "__dict__")
@@ -0,0 +1,205 @@
+import random
+import pytest
+
+from qns.simulator.event import Event
+from qns.simulator.pool import CalendarEventPool, DefaultEventPool, event_pools
+from qns.simulator.simulator import Simulator
+from qns.simulator.ts import Time
+
+
+class RecordEvent(Event):
+    def __init__(self, t: Time, record: list, name=None):
+        super().__init__(t=t, name=name)
+        self.record = record
+
+    def invoke(self) -> None:
+        self.record.append(self)
+
+
+# the registered pools without duplicates, in a stable order
+pool_classes = sorted(set(event_pools.values()), key=lambda c: c.__name__)
+
+
+def drain(pool):
+    result = []
+    event = pool.next_event()
+    while event is not None:
+        result.append(event)
+        event = pool.next_event()
+    return result
+
+
+@pytest.mark.parametrize("pool_class", pool_classes)
+def test_pool_fifo_order(pool_class):
+    pool = pool_class(Time(0), Time(1000))
+    for i in range(100):
+        assert pool.add_event(RecordEvent(Time(1000 - (i // 10) * 10), [], name=str(i)))
+    assert len(pool) == 100
+
+    result = drain(pool)
+    assert [e.t.time_slot for e in result] == sorted(e.t.time_slot for e in result)
+    # events at the same time slot keep the inserting order
+    for slot in set(e.t.time_slot for e in result):
+        same = [int(e.name) for e in result if e.t.time_slot == slot]
+        assert same == sorted(same)
+
+
+def test_calendar_pool_order():
+    random.seed(0)
+    pool = CalendarEventPool(Time(0), Time(10000000))
+    slots = [random.randint(0, 10000000) for _ in range(5000)] + [500] * 100
+    for i, slot in enumerate(slots):
+        assert pool.add_event(RecordEvent(Time(slot), [], name=str(i)))
+    assert len(pool) == len(slots)
+
+    result = drain(pool)
+    assert [e.t.time_slot for e in result] == sorted(slots)
+    # events at the same time slot keep the inserting order
+    same = [int(e.name) for e in result if e.t.time_slot == 500]
+    assert same == sorted(same)
+    assert pool.current_time == pool.te
+
+
+@pytest.mark.parametrize("pool_class", [c for c in pool_classes if c is not DefaultEventPool])
+def test_pool_hold(pool_class):
+    random.seed(1)
+    heap = DefaultEventPool(Time(0), Time(2 ** 30))
+    pool = pool_class(Time(0), Time(2 ** 30))
+    for i in range(1000):
+        slot = random.randint(0, 1000)
+        heap.add_event(RecordEvent(Time(slot), [], name=str(i)))
+        pool.add_event(RecordEvent(Time(slot), [], name=str(i)))
+
+    for i in range(20000):
+        e1 = heap.next_event()
+        e2 = pool.next_event()
+        assert e1.t == e2.t and e1.name == e2.name
+        inc = random.choice([random.randint(0, 10), random.randint(10000, 20000)])
+        heap.add_event(RecordEvent(e1.t + Time(inc), [], name=str(i)))
+        pool.add_event(RecordEvent(e2.t + Time(inc), [], name=str(i)))
+    assert [(e.t, e.name) for e in drain(heap)] == [(e.t, e.name) for e in drain(pool)]
+
+
+@pytest.mark.parametrize("pool_class", pool_classes)
+def test_pool_reject(pool_class):
+    pool = pool_class(Time(sec=1), Time(sec=2))
+    assert not pool.add_event(RecordEvent(Time(sec=0.5), []))
+    assert not pool.add_event(RecordEvent(Time(sec=3), []))
+    assert pool.next_event() is None
+
+
+def test_simulator_calendar_pool():
+    record = []
+    s = Simulator(0, 10, 1000, event_pool="calendar")
+    assert isinstance(s.event_pool, CalendarEventPool)
+    for t in [5, 1, 3, 2, 4]:
+        s.add_event(RecordEvent(s.time(sec=t), record))
+    s.run()
+    assert [e.t.sec for e in record] == [1, 2, 3, 4, 5]
+
+    try:
+        Simulator(0, 10, 1000, event_pool="unknown")
+        assert False
+    except ValueError:
+        pass
+
+
+@pytest.mark.parametrize("pool_class", pool_classes)
+def test_pool_compaction(pool_class):
+    pool = pool_class(Time(0), Time(100000))
+    pool.compact_min_size = 10
+    events = [RecordEvent(Time(i), [], name=str(i)) for i in range(100)]
+    random.shuffle(events)
+    for e in events:
+        pool.add_event(e)
+    events.sort(key=lambda e: int(e.name))
+    for e in events[:50]:
+        e.cancel()
+    assert pool.canceled_count == 50 and pool.live_count == 50
+    assert pool.compact_count == 0
+    events[50].cancel()
+    # more than half of the entries are canceled
+    assert pool.compact_count == 1
+    assert len(pool) == 49 and pool.canceled_count == 0
+    events[51].cancel()
+    assert pool.total_canceled == 52
+
+    result = drain(pool)
+    assert [int(e.name) for e in result] == list(range(52, 100))
+    assert pool.canceled_count == 0
+    # canceling a finished event does not affect the pool
+    result[0].cancel()
+    assert pool.total_canceled == 52
+
+
+@pytest.mark.parametrize("pool_class", pool_classes)
+def test_pool_canceled_before_added(pool_class):
+    pool = pool_class(Time(0), Time(1000))
+    pending = [RecordEvent(Time(100 + i), []) for i in range(5)]
+    for e in pending:
+        pool.add_event(e)
+    pending[0].cancel()
+    pending[1].cancel()
+    assert pool.canceled_count == 2
+    # the events canceled before they are added are not counted
+    early = [RecordEvent(Time(i), []) for i in range(3)]
+    for e in early:
+        e.cancel()
+        pool.add_event(e)
+    live = RecordEvent(Time(5), [])
+    pool.add_event(live)
+    assert pool.canceled_count == 2
+
+    assert pool.next_event() is live
+    assert pool.canceled_count == 2 and pool.live_count == 3
+    assert drain(pool) == pending[2:]
+    assert pool.canceled_count == 0
+
+
+def test_simulator_cancel_counter():
+    record = []
+    s = Simulator(0, 10, 1000)
+    events = [RecordEvent(s.time(sec=t), record) for t in range(10)]
+    for e in events:
+        s.add_event(e)
+    for e in events[::2]:
+        e.cancel()
+    s.run()
+    assert [e.t.sec for e in record] == [1, 3, 5, 7, 9]
+    assert s.canceled_events == 5
+    assert s.compactions == 0
+
+
+@pytest.mark.parametrize("pool_class", pool_classes)
+def test_pool_next_slot_events(pool_class):
+    pool = pool_class(Time(0), Time(1000))
+    events = [RecordEvent(Time(slot), [], name=str(i)) for i, slot in enumerate([5, 3, 5, 3, 5, 9])]
+    for e in events:
+        pool.add_event(e)
+    events[2].cancel()
+    assert [e.name for e in pool.next_slot_events()] == ["1", "3"]
+    assert pool.current_time == Time(3)
+    assert [e.name for e in pool.next_slot_events()] == ["0", "4"]
+    assert [e.name for e in pool.next_slot_events()] == ["5"]
+    assert pool.next_slot_events() == []
+    assert pool.current_time == pool.te
+
+
+@pytest.mark.parametrize("pool_class", [c for c in pool_classes if c is not DefaultEventPool])
+def test_pool_insert_after_peek(pool_class):
+    random.seed(2)
+    heap = DefaultEventPool(Time(0), Time(2 ** 30))
+    pool = pool_class(Time(0), Time(2 ** 30))
+    for i in range(20000):
+        # keep some pending events, as the current time jumps to the end time if the pool is empty
+        if len(heap) < 10 or random.random() < 0.5:
+            # peek a later event, then insert events at the current time slot
+            e1, e2 = heap.peek_event(), pool.peek_event()
+            assert (e1 is None and e2 is None) or e1.name == e2.name
+            slot = heap.current_time.time_slot + random.choice([0, 0, 1, random.randint(0, 3000)])
+            heap.add_event(RecordEvent(Time(slot), [], name=str(i)))
+            pool.add_event(RecordEvent(Time(slot), [], name=str(i)))
+        else:
+            e1, e2 = heap.next_event(), pool.next_event()
+            assert (e1 is None and e2 is None) or e1.name == e2.name
+    assert [e.name for e in drain(heap)] == [e.name for e in drain(pool)]
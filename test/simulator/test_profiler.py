@@ -0,0 +1,57 @@
+from qns.entity.cchannel.cchannel import ClassicPacket, RecvClassicPacket
+from qns.entity.monitor.monitor import Monitor
+from qns.entity.node.app import Application
+from qns.network.network import QuantumNetwork
+from qns.network.topology import LineTopology
+from qns.network.topology.topo import ClassicTopology
+from qns.simulator.event import CallbackEvent
+from qns.simulator.simulator import Simulator
+
+
+class EchoApp(Application):
+    def __init__(self):
+        super().__init__()
+        self.add_handler(self.recv, [RecvClassicPacket])
+
+    def install(self, node, simulator: Simulator):
+        super().install(node, simulator)
+        if node.name == "n1":
+            for i in range(10):
+                simulator.add_event(CallbackEvent(simulator.time(sec=i), self.send, by=self))
+
+    def send(self):
+        node = self.get_node()
+        dest = self._simulator.network.get_node("n2")
+        node.cchannels[0].send(ClassicPacket("ping", src=node, dest=dest), next_hop=dest)
+
+    def recv(self, node, event: RecvClassicPacket):
+        pass
+
+
+def test_profiler(tmp_path):
+    s = Simulator(0, 20, 1000, profile=True)
+    net = QuantumNetwork(topo=LineTopology(nodes_number=2, nodes_apps=[EchoApp()]),
+                         classic_topo=ClassicTopology.Follow)
+    net.install(s)
+    m = Monitor(network=net)
+    m.add_attribution("count", lambda s, n, e: 1)
+    m.at_event(RecvClassicPacket)
+    m.install(s)
+    s.run()
+
+    stats = {(kind, name): (count, scheduled) for kind, name, count, _, scheduled in s.profiler.stats()}
+    assert stats[("event", "CallbackEvent")] == (10, 10)
+    assert stats[("event", "RecvClassicPacket")] == (10, 10)
+    assert stats[("handler", "EchoApp.recv")] == (10, 0)
+    assert stats[("handler", "Monitor.handle")] == (10, 0)
+    assert "EchoApp.recv" in s.profiler.table()
+
+    s.profiler.export_folded(tmp_path / "run.folded")
+    lines = (tmp_path / "run.folded").read_text().splitlines()
+    assert any(line.startswith("Simulator.run;RecvClassicPacket;EchoApp.recv ") for line in lines)
+    assert all(int(line.rsplit(" ", 1)[1]) >= 0 for line in lines)
+
+
+def test_profiler_disabled():
+    s = Simulator(0, 20, 1000)
+    assert s.profiler is None
@@ -1,7 +1,17 @@
 import logging
+import threading
+import pytest
+from qns.simulator.pool import event_pools
 from qns.simulator.simulator import Simulator
-from qns.simulator.event import Event
+from qns.simulator.event import CallbackEvent, Event
+from qns.simulator.ts import Time, get_accuracy, set_default_accuracy
+from qns.entity.node.app import Application
+from qns.network.network import QuantumNetwork
+from qns.network.topology import LineTopology
+from qns.utils.rnd import get_rand, set_seed
+import qns.utils as utils
 import qns.utils.log as log
+from qns.utils.log import debug
 
 log.logger.setLevel(logging.DEBUG)
 
@@ -29,3 +39,369 @@ def test_simulator_with_log():
         t += 1
     log.install(s)
     s.run()
+
+
+class Formatted(object):
+    def __init__(self):
+        self.count = 0
+
+    def __str__(self) -> str:
+        self.count += 1
+        return "formatted"
+
+
+def test_log_lazy(caplog):
+    s = Simulator(0, 15, 1000)
+    log.install(s)
+    arg = Formatted()
+    try:
+        log.logger.setLevel(logging.INFO)
+        log.debug("skipped %s", arg)
+        log.debug("skipped %s", log.lazy(lambda: arg))
+        assert arg.count == 0
+
+        log.logger.setLevel(logging.DEBUG)
+        with caplog.at_level(logging.DEBUG, logger="qns"):
+            log.debug("100%% %s", log.lazy(lambda: arg))
+            log.debug("100%")
+        assert arg.count > 0
+        assert caplog.messages[-2:] == [f"[{s.tc}] 100% formatted", f"[{s.tc}] 100%"]
+
+        log.set_debug(False)
+        arg = Formatted()
+        log.debug("skipped %s", arg)
+        debug("skipped %s", arg)
+        utils.debug("skipped %s", arg)
+        assert arg.count == 0
+
+        log.set_debug(True)
+        with caplog.at_level(logging.DEBUG, logger="qns"):
+            debug("imported %s", arg)
+            utils.debug("re-exported %s", arg)
+        assert caplog.messages[-2:] == [f"[{s.tc}] imported formatted", f"[{s.tc}] re-exported formatted"]
+    finally:
+        log.set_debug(True)
+        log.logger.setLevel(logging.DEBUG)
+
+
+class RecordEvent(Event):
+    def __init__(self, t, record, simulator=None):
+        super().__init__(t=t)
+        self.record = record
+        self.simulator = simulator
+
+    def invoke(self) -> None:
+        self.record.append(self.t.sec)
+        if self.simulator is not None:
+            self.simulator.pause()
+
+
+@pytest.mark.parametrize("pool", list(event_pools.keys()))
+def test_simulator_incremental_run(pool):
+    record = []
+    s = Simulator(0, 10, 1000, event_pool=pool)
+    for t in range(10):
+        s.add_event(RecordEvent(s.time(sec=t), record))
+    s.add_event(RecordEvent(s.time(sec=4.5), record, simulator=s))
+
+    s.run_until(2)
+    assert record == [0, 1, 2] and s.tc.sec == 2
+    s.run_until(3.5)
+    assert record == [0, 1, 2, 3] and s.tc.sec == 3.5
+    # events can be inserted between chunks
+    s.add_event(RecordEvent(s.time(sec=3.7), record))
+    assert s.step(2) == 2
+    assert record == [0, 1, 2, 3, 3.7, 4]
+
+    # paused by the event at 4.5
+    s.run()
+    assert record[-1] == 4.5 and s.tc.sec == 4.5 and not s.is_finished
+    s.run()
+    assert record == [0, 1, 2, 3, 3.7, 4, 4.5, 5, 6, 7, 8, 9]
+    assert s.is_finished and s.tc == s.te
+
+
+class RandomApp(Application):
+    def __init__(self):
+        super().__init__()
+        self.record = []
+
+    def install(self, node, simulator: Simulator):
+        super().install(node, simulator)
+        simulator.add_event(CallbackEvent(simulator.ts, self.send, by=self))
+
+    def send(self):
+        self.record.append((self._simulator.tc.time_slot, get_rand()))
+        t = self._simulator.tc.add_slots(int(get_rand(1, 100)))
+        self._simulator.add_event(CallbackEvent(t, self.send, by=self))
+
+
+def build_random_network(pool):
+    set_seed(0)
+    s = Simulator(0, 10, 1000, event_pool=pool)
+    net = QuantumNetwork(topo=LineTopology(nodes_number=3, nodes_apps=[RandomApp()]))
+    net.install(s)
+    return s, net
+
+
+@pytest.mark.parametrize("pool", list(event_pools.keys()))
+def test_simulator_checkpoint(pool, tmp_path):
+    s, net = build_random_network(pool)
+    s.run()
+    expected = [n.apps[0].record for n in net.nodes]
+    total_events = s.total_events
+
+    s, net = build_random_network(pool)
+    s.run_until(4)
+    s.checkpoint(tmp_path / "checkpoint")
+    # every restoring forks an independent simulation from the checkpoint
+    for _ in range(2):
+        s2 = Simulator.restore(tmp_path / "checkpoint")
+        assert s2.tc.sec == 4 and s2.network is not net
+        s2.run()
+        assert [n.apps[0].record for n in s2.network.nodes] == expected
+        assert s2.total_events == total_events
+    assert s.tc.sec == 4
+
+
+def build_seeded_network(seed, accuracy):
+    s = Simulator(0, 10, accuracy, seed=seed)
+    log.install(s)
+    net = QuantumNetwork(topo=LineTopology(nodes_number=3, nodes_apps=[RandomApp()]))
+    net.install(s)
+    return s, net
+
+
+def first_draws(net):
+    return [[r for _, r in n.apps[0].record[:50]] for n in net.nodes]
+
+
+def test_simulator_independent(caplog):
+    s1, net1 = build_seeded_network(1, 1000)
+    s2, net2 = build_seeded_network(1, 10000)
+    s3, net3 = build_seeded_network(2, 1000)
+    default = get_accuracy()
+    # interleaved simulators do not share the accuracy, the random state and the logger
+    with caplog.at_level(logging.DEBUG, logger="qns"):
+        for t in range(1, 11):
+            for s in (s1, s2, s3):
+                s.run_until(t)
+                assert get_accuracy() == default
+                with s.context():
+                    assert Time(sec=1).accuracy == s.accuracy
+                    log.info("at %s", t)
+                    assert caplog.messages[-1] == f"[{s.tc}] at {t}"
+    # the same seed draws the same random numbers at any accuracy
+    draws = first_draws(net1)
+    assert draws == first_draws(net2)
+    assert draws != first_draws(net3)
+
+    # simulators in threads
+    results = {}
+
+    def run(seed, accuracy):
+        s, net = build_seeded_network(seed, accuracy)
+        s.run()
+        results[accuracy] = first_draws(net)
+
+    threads = [threading.Thread(target=run, args=(1, accuracy)) for accuracy in (1000, 10000)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == {1000: draws, 10000: draws}
+
+
+def test_simulator_time_accuracy(tmp_path):
+    s = Simulator(0, 10, 1000)
+    assert Time(sec=1, accuracy=10).time_slot == 10
+    assert s.time(sec=1).accuracy == 1000
+    # outside any context, ``Time`` uses the accuracy of the last created simulator
+    assert Time(sec=1).accuracy == 1000
+    s2 = Simulator(0, 10, 10)
+    assert Time(sec=1).accuracy == 10
+    # a context always uses the accuracy of its simulator, and it does not leak to the caller
+    with s.context():
+        assert Time(sec=1).accuracy == 1000
+        with s2.context():
+            assert Time(sec=1).accuracy == 10
+        assert Time(sec=1).accuracy == 1000
+    assert Time(sec=1).accuracy == 10
+    s.checkpoint(tmp_path / "checkpoint")
+    Simulator.restore(tmp_path / "checkpoint")
+    assert Time(sec=1).accuracy == 10
+
+    set_default_accuracy(500)
+    assert Time(sec=1).accuracy == 500
+    with s.context():
+        assert Time(sec=1).accuracy == 1000
+
+
+class GenEvent(Event):
+    def __init__(self, t, record, name=None, simulator=None):
+        super().__init__(t=t, name=name)
+        self.record = record
+        self.simulator = simulator
+
+    def invoke(self) -> None:
+        self.record.append(("single", self.name))
+
+
+class CancelEvent(RecordEvent):
+    def __init__(self, t, record, target):
+        super().__init__(t, record)
+        self.target = target
+
+    def invoke(self) -> None:
+        self.record.append(("cancel", self.target.name))
+        self.target.cancel()
+
+
+class BatchRecorder(object):
+    def __init__(self, record):
+        self.record = record
+
+    def handle(self, events):
+        self.record.append(("batch", [e.name for e in events]))
+        for e in events:
+            if e.simulator is not None:
+                # events at the current time slot are handled in the next batch
+                e.simulator.add_event(GenEvent(e.t, self.record, name=e.name + "'"))
+
+
+@pytest.mark.parametrize("pool", list(event_pools.keys()))
+def test_simulator_batch_handler(pool):
+    record = []
+    s = Simulator(0, 10, 1000, event_pool=pool)
+    gens = [GenEvent(s.time(sec=1), record, name=f"g{i}") for i in range(4)]
+    gens[0].simulator = s
+    s.add_event(GenEvent(s.time(sec=0.5), record, name="g"))
+    s.add_event(CancelEvent(s.time(sec=1), record, gens[3]))
+    s.add_event(RecordEvent(s.time(sec=1), record))
+    for e in gens:
+        s.add_event(e)
+    s.add_event(GenEvent(s.time(sec=2), record, name="g4"))
+    s.add_event(GenEvent(s.time(sec=2), record, name="g5"))
+    s.add_batch_handler(GenEvent, BatchRecorder(record).handle)
+
+    s.run_until(1)
+    # the batch is handled at the position of its first event
+    assert record == [("batch", ["g"]), ("cancel", "g3"), 1, ("batch", ["g0", "g1", "g2"]), ("batch", ["g0'"])]
+
+    # without the batch handler, the events are invoked one by one
+    s.remove_batch_handler(GenEvent)
+    s.run()
+    assert record[-2:] == [("single", "g4"), ("single", "g5")]
+    assert s.tc == s.te
+
+
+class ChainEvent(Event):
+    __slots__ = ("record", "payload", "kept", "simulator")
+    recyclable = True
+
+    def __init__(self, t=None, record=None, payload=None, simulator=None, kept=None, name=None, by=None):
+        super().__init__(t=t, name=name, by=by)
+        self.record = record
+        self.payload = payload
+        self.kept = kept
+        self.simulator = simulator
+
+    def invoke(self) -> None:
+        self.record.append((self.t.time_slot, self.payload))
+        if self.payload % 3 == 0:
+            # held by the user, so it is never reused
+            self.keep()
+            self.kept.append(self)
+        if self.payload < 20:
+            event = self.simulator.new_event(ChainEvent, self.t.add_slots(1), self.record, self.payload + 1,
+                                             self.simulator, kept=self.kept)
+            self.simulator.add_event(event)
+
+
+@pytest.mark.parametrize("recycle", [False, True])
+def test_simulator_recycle_events(recycle):
+    record, kept = [], []
+    s = Simulator(0, 10, 1000, recycle_events=recycle)
+    s.add_event(ChainEvent(s.time(sec=1), record, 0, s, kept))
+    s.run()
+    assert record == [(1000 + i, i) for i in range(21)]
+    assert [e.payload for e in kept] == [0, 3, 6, 9, 12, 15, 18]
+    assert len({id(e) for e in kept}) == len(kept)
+    assert all(not e._is_canceled for e in kept)
+    if recycle:
+        # the next event is created before the current one is freed, so two objects are reused in turn
+        assert s.recycled_events == 14
+        assert len(s.free_events[ChainEvent]) == 2
+        # the free events do not keep their payloads
+        assert all(e.payload is None and e.record is None for e in s.free_events[ChainEvent])
+    else:
+        assert s.recycled_events == 0 and len(s.free_events) == 0
+
+
+def test_simulator_recycle_network_events():
+    from qns.entity.cchannel.cchannel import ClassicChannel, ClassicPacket, RecvClassicPacket
+    from qns.entity.memory.event import MemoryReadRequestEvent, MemoryReadResponseEvent
+    from qns.entity.memory.memory import QuantumMemory
+    from qns.entity.monitor.monitor import Monitor
+    from qns.entity.node.node import QNode
+    from qns.entity.qchannel.qchannel import QuantumChannel, RecvQubitPacket
+    from qns.models.qubit.qubit import Qubit
+
+    class HoldMonitor(Monitor):
+        def handle(self, event: Event) -> None:
+            self.held.append(event)
+
+    class RecvApp(Application):
+        def __init__(self):
+            super().__init__()
+            self.held = []
+            self.add_handler(self.recv_qubit, [RecvQubitPacket], [])
+            self.add_handler(self.read_response, [MemoryReadResponseEvent], [])
+
+        def recv_qubit(self, node, event):
+            node.memories[0].write(event.qubit)
+            if event.qubit.name.endswith("0"):
+                event.keep()
+                self.held.append(event)
+            request = MemoryReadRequestEvent(memory=node.memories[0], key=event.qubit.name,
+                                             t=self._simulator.tc, by=node)
+            self._simulator.add_event(request)
+
+        def read_response(self, node, event):
+            if event.result.name.endswith("5"):
+                event.keep()
+                self.held.append(event)
+
+    n1, n2 = QNode("n1"), QNode("n2")
+    app = RecvApp()
+    n2.add_apps(app)
+    n2.add_memory(QuantumMemory("m2"))
+    qc, cc = QuantumChannel("qc", delay=0.1), ClassicChannel("cc", delay=0.1)
+    for n in [n1, n2]:
+        n.add_qchannel(qc)
+        n.add_cchannel(cc)
+    monitor = HoldMonitor("monitor")
+    monitor.held = []
+    monitor.at_event(RecvClassicPacket)
+
+    s = Simulator(0, 10, 1000, recycle_events=True)
+    n1.install(s)
+    n2.install(s)
+    monitor.install(s)
+    for i in range(40):
+        s.add_event(CallbackEvent(s.time(sec=i * 0.2), qc.send, (Qubit(name=f"q{i}"), n2)))
+        s.add_event(CallbackEvent(s.time(sec=i * 0.2), cc.send, (ClassicPacket(f"c{i}", n1, n2), n2)))
+    s.run()
+
+    # the held and the watched events are not reused
+    qubits = [e.qubit.name for e in app.held if isinstance(e, RecvQubitPacket)]
+    results = [e.result.name for e in app.held if isinstance(e, MemoryReadResponseEvent)]
+    assert qubits == [f"q{i}" for i in range(0, 40, 10)]
+    assert results == [f"q{i}" for i in range(5, 40, 10)]
+    assert [e.packet.get() for e in monitor.held] == [f"c{i}" for i in range(40)]
+    held = app.held + monitor.held
+    assert len({id(e) for e in held}) == len(held)
+    assert RecvClassicPacket not in s.free_events
+    assert s.recycled_events > 0
+    assert all(e.qubit is None for e in s.free_events[RecvQubitPacket])
+    assert all(e.result is None for e in s.free_events[MemoryReadResponseEvent])
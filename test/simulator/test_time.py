@@ -34,3 +34,15 @@ def test_simulator_time():
     print_event = func_to_event(Time(sec=1), print_msg, "hello world")
     print(print_event.t.accuracy)
     assert (print_event.t.accuracy == 1000)
+
+
+def test_time_add_slots():
+    from qns.simulator.simulator import Simulator
+    s = Simulator(0, 10, 1000)
+    t1 = s.time(sec=1)
+    t2 = t1.add_slots(500)
+    assert t2.time_slot == 1500 and t1.time_slot == 1000
+    assert t2 == t1 + 0.5 == t1 + s.time(sec=0.5)
+    assert t2 - t1 == s.time_from_slots(500)
+    assert s.time_from_slots(1500) == t2
+    assert not hasattr(t2, "__dict__")
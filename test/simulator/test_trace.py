@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from qns.entity.cchannel.cchannel import ClassicPacket, RecvClassicPacket
+from qns.entity.monitor.monitor import Monitor, MonitorPeriodEvent
+from qns.entity.node.app import Application
+from qns.entity.timer.timer import Timer, TimerEvent
+from qns.network.network import QuantumNetwork
+from qns.network.topology import LineTopology
+from qns.network.topology.topo import ClassicTopology
+from qns.simulator.event import CallbackEvent
+from qns.simulator.simulator import Simulator
+from qns.simulator.trace import TraceReader, TraceRecorder
+
+
+class SendApp(Application):
+    def __init__(self):
+        super().__init__()
+        self.sent = 0
+        self.add_handler(self.recv, [RecvClassicPacket])
+
+    def install(self, node, simulator: Simulator):
+        super().install(node, simulator)
+        if node.name == "n1":
+            simulator.add_event(CallbackEvent(simulator.ts, self.send, by=self))
+
+    def send(self):
+        node = self.get_node()
+        dest = self._simulator.network.get_node("n2")
+        node.cchannels[0].send(ClassicPacket({"seq": self.sent}, src=node, dest=dest), next_hop=dest)
+        self.sent += 1
+        self._simulator.add_event(CallbackEvent(self._simulator.tc.add_slots(10), self.send, by=self))
+
+    def recv(self, node, event: RecvClassicPacket):
+        pass
+
+
+def test_trace(tmp_path, monkeypatch):
+    # grow the file several times
+    monkeypatch.setattr(TraceRecorder, "block_size", 64)
+    s = Simulator(0, 1, 1000)
+    net = QuantumNetwork(topo=LineTopology(nodes_number=2, nodes_apps=[SendApp()]),
+                         classic_topo=ClassicTopology.Follow)
+    net.install(s)
+    tracer = s.start_trace(tmp_path / "run.trace")
+    tracer.add_payload(RecvClassicPacket, lambda e: e.packet.get()["seq"])
+    s.run()
+    s.stop_trace()
+
+    sent = net.get_node("n1").apps[0].sent
+    reader = TraceReader(tmp_path / "run.trace")
+    assert len(reader) == s.total_events == 2 * sent
+    assert np.all(np.diff(reader.records["time_slot"]) >= 0)
+    assert sum(len(chunk) for chunk in reader.chunks(100)) == len(reader)
+
+    packets = reader.filter(event_type=RecvClassicPacket)
+    assert len(packets) == sent
+    assert packets["payload"].tolist() == list(range(sent))
+    assert {reader.entity_names[i] for i in packets["src"]} == {"c-l1"}
+    assert {reader.entity_names[i] for i in packets["dest"]} == {"n2"}
+
+    callbacks = reader.filter(event_type="CallbackEvent")
+    assert {reader.entity_names[i] for i in callbacks["src"]} == {"n1.SendApp"}
+    assert np.all(callbacks["dest"] == -1)
+
+    assert len(reader.filter(node="n1")) == sent
+    assert len(reader.filter(node=net.get_node("n2"))) == sent
+    assert len(reader.filter(event_type=RecvClassicPacket, src="n1")) == 0
+
+
+@pytest.mark.parametrize("batch", [False, True])
+def test_trace_periodic_events(tmp_path, batch):
+    s = Simulator(0, 1, 1000)
+    timer = Timer("t1", 0, 0.5, 0.1, lambda: None)
+    timer.install(s)
+    m = Monitor()
+    m.add_attribution(name="time", calculate_func=lambda s, n, e: s.tc.sec)
+    m.at_period(period_time=0.25)
+    m.install(s)
+    if batch:
+        s.add_batch_handler(TimerEvent, lambda events: [e.invoke() for e in events])
+    s.start_trace(tmp_path / "run.trace")
+    s.run()
+    s.stop_trace()
+
+    # every occurrence is recorded at the time slot when it is invoked
+    reader = TraceReader(tmp_path / "run.trace")
+    assert reader.filter(event_type=TimerEvent)["time_slot"].tolist() == [0, 100, 200, 300, 400, 500]
+    assert reader.filter(event_type=MonitorPeriodEvent)["time_slot"].tolist() == [250, 500, 750, 1000]
+
+
+def test_trace_checkpoint(tmp_path):
+    s = Simulator(0, 1, 1000)
+    net = QuantumNetwork(topo=LineTopology(nodes_number=2, nodes_apps=[SendApp()]),
+                         classic_topo=ClassicTopology.Follow)
+    net.install(s)
+    tracer = s.start_trace(tmp_path / "run.trace")
+    s.run_until(0.5)
+    s.checkpoint(tmp_path / "checkpoint")
+    # the trace is flushed by the checkpoint, and the recording goes on
+    assert len(TraceReader(tmp_path / "run.trace")) == tracer.count > 0
+    s.run()
+    s.stop_trace()
+    sent = net.get_node("n1").apps[0].sent
+    assert len(TraceReader(tmp_path / "run.trace")) == 2 * sent
+
+    # the restored simulator does not record the trace
+    s2 = Simulator.restore(tmp_path / "checkpoint")
+    assert s2.tracer is None
+    s2.run()
+    assert s2.network.get_node("n1").apps[0].sent == sent
+    assert len(TraceReader(tmp_path / "run.trace")) == 2 * sent